@@ -11,6 +11,8 @@ are :
 
 The BatchEstimator.solve() function can also be used to construct a batch problem given an initial estimate 
 (x0, P0), a list of input data and a corresponding process model, and a list of measurements.
+Given a `RelativeMotionIncrement`, the inputs between keyframes are instead
+preintegrated, and states are only created at the keyframes and measurements.
 """
 
 from dataclasses import dataclass
@@ -27,6 +29,10 @@ from pynav.types import (
     StateWithCovariance,
 )
 from pynav.utils import find_nearest_stamp_idx
+from pynav.lib.preintegration import (
+    RelativeMotionIncrement,
+    preintegrate_between_stamps,
+)
 from pysquares.problem import Problem
 from pysquares.types import Residual
 
@@ -200,6 +206,8 @@ class BatchEstimator:
         meas_data: List[Measurement],
         process_model: ProcessModel,
         return_opt_results: bool = False,
+        rmi: RelativeMotionIncrement = None,
+        keyframe_stamps: List[float] = None,
     ) -> List[StateWithCovariance]:
         """Creates and solves a batch problem using pysquares.
 
@@ -227,6 +235,21 @@ class BatchEstimator:
         return_opt_results : bool, optional
             Flag to optionally return the results dictionary
             from the batch problem, by default False
+        rmi : RelativeMotionIncrement, optional
+            If provided, the problem is built in keyframe mode. The inputs
+            between consecutive keyframes are preintegrated into a copy of
+            this RMI, obtained with `rmi.new()`, and a single ProcessResidual
+            connects the two keyframes. The process model must then be the
+            corresponding preintegrated model, such as
+            `PreintegratedIMUKinematics`, which corrects the RMI to first
+            order for the bias of the state. By default None, where a state is
+            created at every input stamp.
+        keyframe_stamps : List[float], optional
+            Additional stamps of the states in keyframe mode. States are
+            always created at the measurement stamps, so that measurements
+            are applied at their own time, and the inputs are preintegrated
+            between consecutive states. By default, states are only created
+            at the measurement stamps.
 
         Returns
         -------
@@ -253,7 +276,16 @@ class BatchEstimator:
         # each input and measurement timestamp
         input_stamps = [round(u.stamp, 12) for u in input_data]
         meas_stamps = [round(meas.stamp, 12) for meas in meas_data]
-        stamps = input_stamps + meas_stamps
+        if rmi is None:
+            stamps = input_stamps + meas_stamps
+        elif keyframe_stamps is None:
+            stamps = [round(x0.stamp, 12)] + meas_stamps
+        else:
+            stamps = (
+                [round(x0.stamp, 12)]
+                + [round(t, 12) for t in keyframe_stamps if t >= x0.stamp]
+                + meas_stamps
+            )
 
         # Get unique stamps
         stamps = list(np.unique(np.array(stamps)))
@@ -262,24 +294,32 @@ class BatchEstimator:
         # initial estimate
         state_list: List[State] = [None] * len(stamps)
         state_list[0] = x0.copy()
-        input_idx = 0
-        x = x0.copy()
-        for k in range(len(stamps) - 1):
-            u = input_data[input_idx]
-
-            dt = stamps[k + 1] - x.stamp
-            if dt < 0:
-                raise RuntimeError("dt is negative!")
-
-            x = state_list[k].copy()
-            x = process_model.evaluate(x, u, dt)
-            x.stamp = x.stamp + dt
-            state_list[k + 1] = x
-
-            if stamps[k + 1] < input_stamps[input_idx + 1]:
-                continue
-            else:
-                input_idx += 1
+        if rmi is None:
+            input_idx = 0
+            x = x0.copy()
+            for k in range(len(stamps) - 1):
+                u = input_data[input_idx]
+
+                dt = stamps[k + 1] - x.stamp
+                if dt < 0:
+                    raise RuntimeError("dt is negative!")
+
+                x = state_list[k].copy()
+                x = process_model.evaluate(x, u, dt)
+                x.stamp = x.stamp + dt
+                state_list[k + 1] = x
+
+                if stamps[k + 1] < input_stamps[input_idx + 1]:
+                    continue
+                else:
+                    input_idx += 1
+        else:
+            rmi_list = preintegrate_between_stamps(input_data, stamps, rmi)
+            for k in range(len(stamps) - 1):
+                dt = stamps[k + 1] - stamps[k]
+                x = process_model.evaluate(state_list[k].copy(), rmi_list[k], dt)
+                x.stamp = stamps[k + 1]
+                state_list[k + 1] = x
 
         # Create problem and add all variables to the problem.
         problem = Problem(
@@ -299,17 +339,24 @@ class BatchEstimator:
         problem.add_residual(prior_residual)
 
         # Add process residuals
-        for k in range(len(input_data) - 1):
-            # Get current input and next input to compute
-            u_k = input_data[k]
-            u_kp1 = input_data[k + 1]
-
-            # Find the states that are connected by this measurement
-            keys = [None] * 2
-            keys[0] = find_nearest_stamp_idx(stamps, u_k.stamp)
-            keys[1] = find_nearest_stamp_idx(stamps, u_kp1.stamp)
-            process_residual = ProcessResidual(keys, process_model, u_k)
-            problem.add_residual(process_residual)
+        if rmi is not None:
+            for k, rmi_k in enumerate(rmi_list):
+                process_residual = ProcessResidual(
+                    [k, k + 1], process_model, rmi_k
+                )
+                problem.add_residual(process_residual)
+        else:
+            for k in range(len(input_data) - 1):
+                # Get current input and next input to compute
+                u_k = input_data[k]
+                u_kp1 = input_data[k + 1]
+
+                # Find the states that are connected by this measurement
+                keys = [None] * 2
+                keys[0] = find_nearest_stamp_idx(stamps, u_k.stamp)
+                keys[1] = find_nearest_stamp_idx(stamps, u_kp1.stamp)
+                process_residual = ProcessResidual(keys, process_model, u_k)
+                problem.add_residual(process_residual)
 
         # Add measurement residuals
         for meas in meas_data:
@@ -1,6 +1,6 @@
-from typing import Callable, List, Union
+from typing import Callable, Dict, List, Union
 import numpy as np
-from .utils import randvec
+from .utils import randvec, NoiseSource
 from .types import (
     State,
     ProcessModel,
@@ -34,6 +34,12 @@ class DataGenerator:
         If a measurement model list is provided, also provide a list of
         frequencies associated with each measurement. If a single frequency
         is provided as a float, it will be used for all measurements.
+    vectorized_input : bool, optional
+        If True, `input_func` is called only once, with the array of all input
+        times and `None` in place of the state, and must return either a list
+        of `Input` objects or an array whose first axis indexes time. The
+        input then cannot depend on the state. Only used when generating with
+        `fast=True`. By default False.
     """
 
     def __init__(
@@ -44,14 +50,17 @@ class DataGenerator:
         input_freq: float,
         meas_model_list: List[MeasurementModel] = [],
         meas_freq_list: Union[float, List[float]] = None,
+        vectorized_input: bool = False,
     ):
 
 
         # Make input covariance a callable if it isnt
         if callable(input_covariance):
             self.input_covariance = input_covariance
+            self._constant_input_covariance = None
         elif isinstance(input_covariance, np.ndarray):
             self.input_covariance = lambda t: input_covariance
+            self._constant_input_covariance = np.atleast_2d(input_covariance)
         else:
             raise ValueError("Input covariance must be a function or a matrix.")
 
@@ -69,13 +78,22 @@ class DataGenerator:
         self.process_model = process_model
         self.input_func = input_func
         self.input_freq = input_freq
+        self.vectorized_input = vectorized_input
         self._meas_model_and_freq = list(zip(meas_model_list, meas_freq_list))
 
 
     def add_measurement_model(self, model: MeasurementModel, freq: float):
         self._meas_model_and_freq.append((model, freq))
 
-    def generate(self, x0: State, start: float, stop: float, noise=False):
+    def generate(
+        self,
+        x0: State,
+        start: float,
+        stop: float,
+        noise=False,
+        fast=False,
+        noise_source: NoiseSource = None,
+    ):
         """
         Generates data by integrating the process model using noiseless input
         values, and using the states computed to generate measuements.
@@ -90,6 +108,21 @@ class DataGenerator:
             Ending timestamp
         noise : bool, optional
             Whether to add noise to inputs/measurements, by default False
+        fast : bool, optional
+            Whether to use the fast generation mode, by default False. The
+            ground truth trajectory is first integrated, with each input step
+            split at the measurement stamps exactly as in the default mode.
+            Measurements are then evaluated against it with each model's
+            `evaluate_batch`, and all noise is drawn in bulk with one
+            Cholesky factorization per distinct covariance. The truth states
+            and noiseless data are therefore the same as in the default
+            mode, and only the random draws differ. It is much faster for
+            long, high-rate simulations. The process model is still evaluated
+            one step at a time.
+        noise_source : NoiseSource, optional
+            Source of the random noise, for example one of the independent
+            streams spawned for a Monte Carlo trial. By default, the global
+            `np.random` state is used.
 
         Returns
         -------
@@ -105,6 +138,9 @@ class DataGenerator:
         times = np.arange(start, stop, 1 / self.input_freq)
         times = np.round(times,12)
 
+        if fast:
+            return self._generate_fast(x0, times, noise, noise_source)
+
         # Build large list of Measurement objects with the correct stamps,
         # but empty values, which we will fill later.
         meas_list: List[Measurement] = []
@@ -152,7 +188,10 @@ class DataGenerator:
 
                     # Generate measurement
                     meas.value = generate_measurement(
-                        state=x, model=meas.model, noise=noise
+                        state=x,
+                        model=meas.model,
+                        noise=noise,
+                        noise_source=noise_source,
                     ).value
 
                     # Load next measurement
@@ -170,7 +209,7 @@ class DataGenerator:
             # Add noise to input if requested.
             if noise:
                 Q = np.atleast_2d(self.input_covariance(times[k]))
-                u = u.plus(randvec(Q))
+                u = u.plus(randvec(Q, noise_source=noise_source))
 
             state_list.append(x.copy())
             input_list.append(u)
@@ -180,9 +219,149 @@ class DataGenerator:
         meas_list.sort(key=lambda x: x.stamp)
         return state_list, input_list, meas_list
 
+    def _generate_fast(
+        self,
+        x0: State,
+        times: np.ndarray,
+        noise: bool,
+        noise_source: NoiseSource = None,
+    ):
+        """
+        Fast version of `generate`, see its documentation.
+        """
+        n_steps = len(times) - 1
+
+        # Measurement stamps of each model, and all the distinct stamps at
+        # which the truth state is required.
+        model_stamps = []
+        for model, freq in self._meas_model_and_freq:
+            stamps = np.arange(times[0], times[-1], 1 / freq)
+            model_stamps.append((model, np.round(stamps, 12)))
+        if model_stamps:
+            split_stamps = np.unique(np.concatenate([s for _, s in model_stamps]))
+        else:
+            split_stamps = np.zeros((0,))
+        split_states: List[State] = [None] * split_stamps.size
+        split_idx = np.searchsorted(split_stamps, times)
+
+        def propagate(x: State, u: Input, k: int) -> State:
+            # As in `generate`, the step is split at the measurement stamps,
+            # and the truth states at those stamps are kept.
+            for i in range(split_idx[k], split_idx[k + 1]):
+                if split_stamps[i] == times[k]:
+                    split_states[i] = x
+                    continue
+                x = self.process_model.evaluate(
+                    x.copy(), u, split_stamps[i] - x.stamp
+                )
+                x.stamp = split_stamps[i]
+                split_states[i] = x
+            x = self.process_model.evaluate(x.copy(), u, times[k + 1] - x.stamp)
+            x.stamp = times[k + 1]
+            return x
+
+        # Noiseless inputs, evaluated once per step.
+        x = x0.copy()
+        x.stamp = times[0]
+        state_list = [x]
+        if self.vectorized_input:
+            input_list = self._make_inputs(
+                self.input_func(times[:-1], None), times[:-1]
+            )
+            for k in range(n_steps):
+                x = propagate(x, input_list[k], k)
+                state_list.append(x)
+        else:
+            input_list: List[Input] = []
+            for k in range(n_steps):
+                u = self.input_func(times[k], x)
+                if not hasattr(u, "stamp"):
+                    u = StampedValue(u, times[k])
+                input_list.append(u)
+                x = propagate(x, u, k)
+                state_list.append(x)
+
+        # Measurements, evaluated against the truth states at their stamps.
+        meas_list: List[Measurement] = []
+        for model, stamps in model_stamps:
+            x_meas = [
+                split_states[i] for i in np.searchsorted(split_stamps, stamps)
+            ]
+            y_list = [np.asarray(y) for y in model.evaluate_batch(x_meas)]
+            if noise:
+                R_list = [np.atleast_2d(model.covariance(x_k)) for x_k in x_meas]
+                v_list = _draw_noise(R_list, noise_source)
+                y_list = [
+                    (y.reshape((-1, 1)) + v).reshape(y.shape)
+                    for y, v in zip(y_list, v_list)
+                ]
+
+            meas_list.extend(
+                Measurement(y, stamp, model) for y, stamp in zip(y_list, stamps)
+            )
+
+        # Input noise, drawn in bulk.
+        if noise and n_steps > 0:
+            if self._constant_input_covariance is not None:
+                W = randvec(
+                    self._constant_input_covariance, n_steps, noise_source
+                )
+                w_list = W.T
+            else:
+                Q_list = [
+                    np.atleast_2d(self.input_covariance(t)) for t in times[:-1]
+                ]
+                w_list = _draw_noise(Q_list, noise_source)
+            input_list = [u.plus(w) for u, w in zip(input_list, w_list)]
+
+        # Python's sort is stable, so this keeps measurements with equal
+        # stamps in the order of the models, as in `generate`.
+        meas_list.sort(key=lambda meas: meas.stamp)
+        return state_list, input_list, meas_list
+
+    @staticmethod
+    def _make_inputs(values, stamps: np.ndarray) -> List[Input]:
+        """
+        Wraps the output of a vectorized input function into a list of
+        inputs.
+        """
+        if isinstance(values, np.ndarray):
+            return [
+                StampedValue(value, stamp) for value, stamp in zip(values, stamps)
+            ]
+
+        return [
+            u if hasattr(u, "stamp") else StampedValue(u, stamp)
+            for u, stamp in zip(values, stamps)
+        ]
+
+
+def _draw_noise(
+    covariances: List[np.ndarray], noise_source: NoiseSource = None
+) -> List[np.ndarray]:
+    """
+    Draws one zero-mean column vector per covariance, computing a single
+    Cholesky factorization per distinct covariance and drawing the samples
+    for each distinct covariance in bulk.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for i, cov in enumerate(covariances):
+        groups.setdefault(cov.shape + (cov.tobytes(),), []).append(i)
+
+    samples = [None] * len(covariances)
+    for idx in groups.values():
+        cov = covariances[idx[0]]
+        V = randvec(cov, len(idx), noise_source)
+        for j, i in enumerate(idx):
+            samples[i] = V[:, j : j + 1]
+    return samples
+
 
 def generate_measurement(
-    state: Union[State, List[State]], model: MeasurementModel, noise=True
+    state: Union[State, List[State]],
+    model: MeasurementModel,
+    noise=True,
+    noise_source: NoiseSource = None,
 ) -> Union[Measurement, List[Measurement]]:
     """
     Generates a `Measurement` object given a measurement model and corresponding
@@ -196,6 +375,8 @@ def generate_measurement(
         measurement model that will be evaluated to generate the measurement
     noise : bool, optional
         flag whether to add noise to measurement, by default True
+    noise_source : NoiseSource, optional
+        Source of the random noise, by default the global `np.random` state.
 
     Returns
     -------
@@ -218,7 +399,7 @@ def generate_measurement(
         y = model.evaluate(x)
         og_shape = y.shape
         if noise:
-            y = y.reshape((-1, 1)) + randvec(R)
+            y = y.reshape((-1, 1)) + randvec(R, noise_source=noise_source)
 
         meas_list.append(Measurement(y.reshape(og_shape), x.stamp, model))
 
@@ -1,10 +1,13 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union
 from .types import (
     Input,
     State,
     ProcessModel,
     Measurement,
     StateWithCovariance,
+    BlockSparseJacobian,
+    BlockDiagonalMatrix,
+    BlockIdentityMatrix,
 )
 import numpy as np
 from scipy.stats.distributions import chi2
@@ -64,6 +67,40 @@ def mean_state(x_array: List[State], weights: np.ndarray) -> State:
     return x_mean
 
 
+def _propagate_covariance(
+    P: np.ndarray,
+    A: Union[np.ndarray, BlockDiagonalMatrix, BlockIdentityMatrix],
+    Q: Union[np.ndarray, BlockDiagonalMatrix],
+    inplace: bool = False,
+) -> np.ndarray:
+    """
+    Computes A P A^T + Q, applying block-diagonal Jacobians and covariances
+    block by block. If `inplace` is True and `A` is a `BlockIdentityMatrix`,
+    only the affected rows and columns of `P` are overwritten.
+    """
+    if isinstance(A, BlockIdentityMatrix):
+        P_new = A.congruence(P, out=P if inplace else None)
+    elif isinstance(A, BlockDiagonalMatrix):
+        P_new = A.congruence(P)
+    else:
+        P_new = A @ P @ A.T
+
+    if isinstance(Q, BlockDiagonalMatrix):
+        return Q.add_to(P_new)
+    return P_new + Q
+
+
+def _as_array(
+    M: Union[np.ndarray, BlockDiagonalMatrix, BlockIdentityMatrix]
+) -> np.ndarray:
+    """
+    Returns structured Jacobians and covariances as dense arrays.
+    """
+    if isinstance(M, (BlockDiagonalMatrix, BlockIdentityMatrix)):
+        return M.toarray()
+    return M
+
+
 class ExtendedKalmanFilter:
     """
     On-manifold nonlinear Kalman filter.
@@ -90,6 +127,7 @@ class ExtendedKalmanFilter:
         dt: float = None,
         x_jac: State = None,
         output_details: bool = False,
+        inplace: bool = False,
     ) -> StateWithCovariance:
         """
         Propagates the state forward in time using a process model. The user
@@ -111,6 +149,12 @@ class ExtendedKalmanFilter:
         x_jac : State, optional
             Evaluation point for the process model Jacobian. If not provided, the
             current state estimate will be used.
+        inplace : bool, optional
+            If True, `x` is updated in place and returned instead of a copy.
+            When the process model only propagates some substates, such as a
+            `CompositeProcessModel` receiving an input for a single substate,
+            only the corresponding rows and columns of the covariance are then
+            touched. By default False.
 
         Returns
         -------
@@ -119,7 +163,7 @@ class ExtendedKalmanFilter:
         """
 
         # Make a copy so we dont modify the input
-        x_new = x.copy()
+        x_new = x if inplace else x.copy()
 
         # If state has no time stamp, load from measurement.
         # usually only happens on estimator start-up
@@ -137,15 +181,25 @@ class ExtendedKalmanFilter:
             x_jac = x.state
 
         if u is not None:
-            A = self.process_model.jacobian(x_jac, u, dt)
-            Q = self.process_model.covariance(x_jac, u, dt)
-            x_new.state = self.process_model.evaluate(x.state, u, dt)
-            x_new.covariance = A @ x.covariance @ A.T + Q
-            x_new.symmetrize()
-            x_new.state.stamp = x.state.stamp + dt
-
-        details_dict = {"A": A, "Q": Q}
+            stamp = x.state.stamp + dt
+            if x_jac is x.state:
+                x_new.state, A, Q = self.process_model.evaluate_with_jacobians(
+                    x.state, u, dt
+                )
+            else:
+                A = self.process_model.jacobian(x_jac, u, dt)
+                Q = self.process_model.covariance(x_jac, u, dt)
+                x_new.state = self.process_model.evaluate(x.state, u, dt)
+            x_new.covariance = _propagate_covariance(
+                x.covariance, A, Q, inplace
+            )
+            # Block-identity congruences are symmetric by construction.
+            if not isinstance(A, BlockIdentityMatrix):
+                x_new.symmetrize()
+            x_new.state.stamp = stamp
+
         if output_details:
+            details_dict = {"A": _as_array(A), "Q": _as_array(Q)}
             return x_new, details_dict
         else:
             return x_new
@@ -214,9 +268,14 @@ class ExtendedKalmanFilter:
         if y_check is not None:
             P = x.covariance
             R = np.atleast_2d(y.model.covariance(x_jac))
-            G = np.atleast_2d(y.model.jacobian(x_jac))
+            G = y.model.jacobian_sparse(x_jac)
             z = y.value.reshape((-1, 1)) - y_check.reshape((-1, 1))
-            S = G @ P @ G.T + R
+            if isinstance(G, BlockSparseJacobian):
+                PGT = G.rmatmul_transpose(P)
+            else:
+                G = np.atleast_2d(G)
+                PGT = P @ G.T
+            S = G @ PGT + R
 
             outlier = False
 
@@ -227,10 +286,11 @@ class ExtendedKalmanFilter:
             if not outlier:
 
                 # Do the correction
-                K = np.linalg.solve(S.T, (P @ G.T).T).T
+                K = np.linalg.solve(S.T, PGT.T).T
                 dx = K @ z
                 x.state = x.state.plus(dx)
-                x.covariance = (np.identity(x.state.dof) - K @ G) @ P
+                # Equal to (I - K G) P, without forming the n x n product.
+                x.covariance = P - K @ PGT.T
                 x.symmetrize()
 
             details_dict = {"z": z, "S": S}
@@ -18,6 +18,7 @@ from .models import (
     RangeRelativePose,
     SingleIntegrator,
     DoubleIntegrator,
+    MultiAgentDoubleIntegrator,
     BodyFrameVelocity,
     RelativeBodyFrameVelocity,
     CompositeMeasurementModel,
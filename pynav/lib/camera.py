@@ -1,8 +1,11 @@
 """Module containing a basic pinhole camera model."""
 
 import numpy as np
-from pynav.lib import SE3State
-from typing import Any
+from pynav.types import MeasurementModel, BlockSparseJacobian
+from pynav.lib import SE3State, CompositeState, MatrixLieGroupState
+from pynav.lib.lie_kernels import so3_wedge
+from pylie import SO3
+from typing import Any, Tuple
 
 
 class PoseMatrix:
@@ -24,7 +27,8 @@ class PoseMatrix:
 
 
 class Camera:
-    """Class for a pinhole camera model.
+    """Class for a pinhole camera model, with optional radial-tangential
+    (plumb bob) lens distortion.
 
     This class contains utilities for generating measurements
     and predicting measurements, and converting pixel coordinates to
@@ -42,6 +46,7 @@ class Camera:
         sigma: float,
         T_bc: PoseMatrix = None,
         camera_id: Any = None,
+        distortion: np.ndarray = None,
     ):
         """Instantiate a Camera
 
@@ -68,6 +73,10 @@ class Camera:
             identity.
         camera_id : Any, optional
             Identifier for this camera, by default None
+        distortion : np.ndarray, optional
+            Radial-tangential distortion coefficients
+            [k1, k2, p1, p2] or [k1, k2, p1, p2, k3], using the same
+            ordering as OpenCV. By default None, for no distortion.
         """
         # Camera intrinsic parameters
         self.fu = float(fu)
@@ -92,6 +101,15 @@ class Camera:
         # Unique identifier
         self.camera_id = camera_id
 
+        # Lens distortion coefficients, stored as [k1, k2, p1, p2, k3]
+        if distortion is not None:
+            distortion = np.array(distortion, dtype=np.float64).ravel()
+            if distortion.size == 4:
+                distortion = np.append(distortion, 0.0)
+            if distortion.size != 5:
+                raise ValueError("distortion must have 4 or 5 coefficients.")
+        self.distortion = distortion
+
     @staticmethod
     def get_enu_to_cam() -> np.ndarray:
         """Returns a DCM that relates the "ENU frame to the camera frame,
@@ -135,6 +153,7 @@ class Camera:
             self.sigma,
             self.T_bc.copy(),
             self.camera_id,
+            None if self.distortion is None else self.distortion.copy(),
         )
 
     def is_measurement_valid(self, uv: np.ndarray) -> bool:
@@ -219,6 +238,9 @@ class Camera:
         np.ndarray
             (u, v) pixel coordinates.
         """
+        if self.distortion is not None:
+            return self.project_batch(r_pc_c)[0]
+
         x, y, z = r_pc_c.ravel()
 
         u = self.fu * x / z + self.cu
@@ -226,9 +248,246 @@ class Camera:
 
         return np.array([u, v])
 
+    def project_jacobian(self, r_pc_c: np.ndarray) -> np.ndarray:
+        """Jacobian of the pinhole projection with respect to the landmark
+        position resolved in the camera frame.
+
+        Parameters
+        ----------
+        r_pc_c : np.ndarray
+            Landmark relative to camera, resolved in camera frame.
+
+        Returns
+        -------
+        np.ndarray with shape (2, 3)
+            Jacobian of the (u, v) pixel coordinates.
+        """
+        if self.distortion is not None:
+            return self.project_jacobian_batch(r_pc_c)[0]
+
+        x, y, z = r_pc_c.ravel()
+
+        return np.array(
+            [
+                [self.fu / z, 0, -self.fu * x / z**2],
+                [0, self.fv / z, -self.fv * y / z**2],
+            ]
+        )
+
+    def resolve_landmarks_in_cam_frame(
+        self, pose: SE3State, r_pw_a: np.ndarray
+    ) -> np.ndarray:
+        """Batched version of `resolve_landmark_in_cam_frame`.
+
+        Parameters
+        ----------
+        pose : SE3State
+            Pose of the body.
+        r_pw_a : np.ndarray with shape (N, 3)
+            Landmark positions, resolved in the world frame.
+
+        Returns
+        -------
+        np.ndarray with shape (N, 3)
+            Landmark positions relative to the camera, resolved in the camera
+            frame.
+        """
+        r_pw_a = np.asarray(r_pw_a).reshape((-1, 3))
+        C_bc = self.T_bc.attitude
+        C_ab = pose.attitude
+        r_zw_a = pose.position.ravel()
+        r_cz_b = self.T_bc.position.ravel()
+
+        # Row-vector form of C_bc^T (C_ab^T (r_pw_a - r_zw_a) - r_cz_b)
+        return ((r_pw_a - r_zw_a) @ C_ab - r_cz_b) @ C_bc
+
+    def project_batch(self, r_pc_c: np.ndarray) -> np.ndarray:
+        """Batched pinhole projection.
+
+        Parameters
+        ----------
+        r_pc_c : np.ndarray with shape (N, 3)
+            Landmarks relative to camera, resolved in camera frame.
+
+        Returns
+        -------
+        np.ndarray with shape (N, 2)
+            (u, v) pixel coordinates. Landmarks with zero depth produce
+            non-finite coordinates.
+        """
+        r_pc_c = np.asarray(r_pc_c).reshape((-1, 3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xy = r_pc_c[:, :2] / r_pc_c[:, 2:3]
+        if self.distortion is not None:
+            xy = self._distort(xy)
+        return xy * [self.fu, self.fv] + [self.cu, self.cv]
+
+    def _distort(self, xy: np.ndarray) -> np.ndarray:
+        """Applies the radial-tangential distortion to normalized image
+        coordinates with shape (N, 2)."""
+        k1, k2, p1, p2, k3 = self.distortion
+        x = xy[:, 0]
+        y = xy[:, 1]
+        r2 = x**2 + y**2
+        radial = 1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        xy_d = np.empty_like(xy)
+        xy_d[:, 0] = x * radial + 2.0 * p1 * x * y + p2 * (r2 + 2.0 * x**2)
+        xy_d[:, 1] = y * radial + p1 * (r2 + 2.0 * y**2) + 2.0 * p2 * x * y
+        return xy_d
+
+    def _distort_jacobian(self, xy: np.ndarray) -> np.ndarray:
+        """Jacobian of `_distort`, with shape (N, 2, 2)."""
+        k1, k2, p1, p2, k3 = self.distortion
+        x = xy[:, 0]
+        y = xy[:, 1]
+        r2 = x**2 + y**2
+        radial = 1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        d_radial = 2.0 * (k1 + r2 * (2.0 * k2 + 3.0 * k3 * r2))
+        jac = np.empty(xy.shape + (2,))
+        jac[:, 0, 0] = radial + x**2 * d_radial + 2.0 * p1 * y + 6.0 * p2 * x
+        jac[:, 0, 1] = x * y * d_radial + 2.0 * p1 * x + 2.0 * p2 * y
+        jac[:, 1, 0] = x * y * d_radial + 2.0 * p1 * x + 2.0 * p2 * y
+        jac[:, 1, 1] = radial + y**2 * d_radial + 6.0 * p1 * y + 2.0 * p2 * x
+        return jac
+
+    def project_jacobian_batch(self, r_pc_c: np.ndarray) -> np.ndarray:
+        """Batched version of `project_jacobian`.
+
+        Parameters
+        ----------
+        r_pc_c : np.ndarray with shape (N, 3)
+            Landmarks relative to camera, resolved in camera frame.
+
+        Returns
+        -------
+        np.ndarray with shape (N, 2, 3)
+            Jacobians of the (u, v) pixel coordinates.
+        """
+        r_pc_c = np.asarray(r_pc_c).reshape((-1, 3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z_inv = 1.0 / r_pc_c[:, 2]
+        x = r_pc_c[:, 0] * z_inv
+        y = r_pc_c[:, 1] * z_inv
+
+        # Jacobian of the normalized image coordinates
+        jac = np.zeros((r_pc_c.shape[0], 2, 3))
+        jac[:, 0, 0] = z_inv
+        jac[:, 0, 2] = -x * z_inv
+        jac[:, 1, 1] = z_inv
+        jac[:, 1, 2] = -y * z_inv
+
+        if self.distortion is not None:
+            jac = self._distort_jacobian(np.stack([x, y], axis=1)) @ jac
+
+        jac[:, 0, :] *= self.fu
+        jac[:, 1, :] *= self.fv
+        return jac
+
+    def is_measurement_valid_batch(self, uv: np.ndarray) -> np.ndarray:
+        """Batched version of `is_measurement_valid`.
+
+        Parameters
+        ----------
+        uv : np.ndarray with shape (N, 2)
+            Measurements to check.
+
+        Returns
+        -------
+        np.ndarray with shape (N,)
+            Boolean mask of valid measurements.
+        """
+        uv = np.asarray(uv).reshape((-1, 2))
+        return (
+            (uv[:, 1] > 0.0)
+            & (uv[:, 1] < self.image_height)
+            & (uv[:, 0] > 0.0)
+            & (uv[:, 0] < self.image_width)
+        )
+
+    def is_landmark_in_front_of_cam_batch(
+        self, pose: SE3State, r_pw_a: np.ndarray
+    ) -> np.ndarray:
+        """Batched version of `is_landmark_in_front_of_cam`, returning a
+        boolean mask with shape (N,)."""
+        r_pc_c = self.resolve_landmarks_in_cam_frame(pose, r_pw_a)
+        return r_pc_c[:, 2] > 0.0
+
+    def evaluate_batch(self, pose: SE3State, r_pw_a: np.ndarray) -> np.ndarray:
+        """Predicts noise-free measurements of many landmarks at once.
+
+        Parameters
+        ----------
+        pose : SE3State
+            Pose of the body.
+        r_pw_a : np.ndarray with shape (N, 3)
+            Landmark positions, resolved in the world frame.
+
+        Returns
+        -------
+        np.ndarray with shape (N, 2)
+            noise-free pixel measurements
+        """
+        r_pc_c = self.resolve_landmarks_in_cam_frame(pose, r_pw_a)
+        return self.project_batch(r_pc_c)
+
+    def evaluate_batch_with_jacobians(
+        self, pose: MatrixLieGroupState, r_pw_a: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Predicts measurements of many landmarks, along with their validity
+        and Jacobians, in one call.
+
+        Parameters
+        ----------
+        pose : MatrixLieGroupState
+            Pose of the body, such as an `SE3State` or `SE23State`. Its
+            `direction` determines the perturbation used in the pose Jacobian.
+        r_pw_a : np.ndarray with shape (N, 3)
+            Landmark positions, resolved in the world frame.
+
+        Returns
+        -------
+        np.ndarray with shape (N, 2)
+            noise-free pixel measurements
+        np.ndarray with shape (N,)
+            Boolean mask of landmarks that are in front of the camera and
+            project inside the image.
+        np.ndarray with shape (N, 2, pose.dof)
+            Jacobians with respect to the pose.
+        np.ndarray with shape (N, 2, 3)
+            Jacobians with respect to the landmark positions.
+        """
+        r_pw_a = np.asarray(r_pw_a).reshape((-1, 3))
+        N = r_pw_a.shape[0]
+        C_ab = pose.attitude
+        C_bc = self.T_bc.attitude
+
+        r_pc_c = self.resolve_landmarks_in_cam_frame(pose, r_pw_a)
+        uv = self.project_batch(r_pc_c)
+        valid = (r_pc_c[:, 2] > 0.0) & self.is_measurement_valid_batch(uv)
+
+        jac_proj = self.project_jacobian_batch(r_pc_c) @ C_bc.T
+        jac_landmark = jac_proj @ C_ab.T
+
+        if pose.direction == "right":
+            r_pz_b = (r_pw_a - pose.position.ravel()) @ C_ab
+            jac_att = jac_proj @ so3_wedge(r_pz_b)
+            jac_pos = -jac_proj
+        elif pose.direction == "left":
+            jac_att = jac_landmark @ so3_wedge(r_pw_a)
+            jac_pos = -jac_landmark
+
+        # The blocks are stacked vertically so that the pose can place them in
+        # its own perturbation ordering with a single call.
+        jac_pose = pose.jacobian_from_blocks(
+            attitude=jac_att.reshape((2 * N, 3)),
+            position=jac_pos.reshape((2 * N, 3)),
+        ).reshape((N, 2, -1))
+
+        return uv, valid, jac_pose, jac_landmark
+
     def to_normalized_coords(self, uv: np.ndarray) -> np.ndarray:
         """Converts (u, v) pixel coordinates to
-        normalized image coordinates.
+        normalized image coordinates. Lens distortion is not removed.
 
         Parameters
         ----------
@@ -254,3 +513,127 @@ class Camera:
         v = y_n * self.fv + self.cv
 
         return np.array([u, v])
+
+
+class PixelLandmark(MeasurementModel):
+    """
+    Pixel measurement of a landmark whose position is estimated alongside a
+    pose, as in EKF-SLAM. The state is a `CompositeState` containing the pose
+    (an `SE3State` or `SE23State`, referenced by `pose_id`) and the landmark
+    position (a `VectorState` of size 3, referenced by `landmark_id`).
+
+    Since the measurement only depends on two substates, `jacobian_sparse`
+    returns a `BlockSparseJacobian`, which keeps the cost of a correction with
+    many landmarks in the state linear in the state dimension.
+    """
+
+    def __init__(self, camera: Camera, pose_id: Any, landmark_id: Any):
+        self.camera = camera
+        self.pose_id = pose_id
+        self.landmark_id = landmark_id
+
+    def evaluate(self, x: CompositeState) -> np.ndarray:
+        pose = x.get_state_by_id(self.pose_id)
+        r_pw_a = x.get_value_by_id(self.landmark_id)
+        return self.camera.evaluate(pose, r_pw_a)
+
+    def jacobian(self, x: CompositeState) -> np.ndarray:
+        return x.jacobian_from_blocks(self._jacobian_blocks(x))
+
+    def jacobian_sparse(self, x: CompositeState) -> BlockSparseJacobian:
+        return x.jacobian_from_blocks(self._jacobian_blocks(x), sparse=True)
+
+    def _jacobian_blocks(self, x: CompositeState) -> dict:
+        pose: MatrixLieGroupState = x.get_state_by_id(self.pose_id)
+        r_pw_a = x.get_value_by_id(self.landmark_id).reshape((-1, 1))
+        C_ab = pose.attitude
+        r_zw_a = pose.position.reshape((-1, 1))
+        C_bc = self.camera.T_bc.attitude
+
+        r_pc_c = self.camera.resolve_landmark_in_cam_frame(pose, r_pw_a)
+        jac_proj = self.camera.project_jacobian(r_pc_c) @ C_bc.T
+
+        # Jacobians of r_pz_b = C_ab^T (r_pw_a - r_zw_a)
+        if pose.direction == "right":
+            r_pz_b = C_ab.T @ (r_pw_a - r_zw_a)
+            jac_pose = pose.jacobian_from_blocks(
+                attitude=-jac_proj @ SO3.odot(r_pz_b),
+                position=-jac_proj,
+            )
+        elif pose.direction == "left":
+            jac_pose = pose.jacobian_from_blocks(
+                attitude=-jac_proj @ C_ab.T @ SO3.odot(r_pw_a),
+                position=-jac_proj @ C_ab.T,
+            )
+
+        jac_landmark = jac_proj @ C_ab.T
+
+        return {self.pose_id: jac_pose, self.landmark_id: jac_landmark}
+
+    def covariance(self, x: CompositeState) -> np.ndarray:
+        return self.camera.sigma**2 * np.identity(2)
+
+
+class CameraLandmark(MeasurementModel):
+    """
+    Pixel measurement of a landmark with known position, from a camera
+    rigidly attached to a body. The state can be any state with `attitude`
+    and `position` properties and a `jacobian_from_blocks` method, such as
+    `SE3State`, `SE23State` or `IMUState`. Lens distortion configured in the
+    `Camera` is accounted for in both the prediction and the Jacobian.
+    """
+
+    def __init__(self, camera: Camera, landmark_position: np.ndarray):
+        self.camera = camera
+        self.landmark_position = np.array(landmark_position).ravel()
+
+    def evaluate(self, x: MatrixLieGroupState) -> np.ndarray:
+        return self.camera.evaluate(x, self.landmark_position)
+
+    def jacobian(self, x: MatrixLieGroupState) -> np.ndarray:
+        _, _, jac_pose, _ = self.camera.evaluate_batch_with_jacobians(
+            x, self.landmark_position
+        )
+        return jac_pose[0]
+
+    def covariance(self, x: MatrixLieGroupState) -> np.ndarray:
+        return self.camera.sigma**2 * np.identity(2)
+
+
+class CameraLandmarks(MeasurementModel):
+    """
+    Stacked pixel measurements of several landmarks with known positions,
+    observed in the same image. This is equivalent to one `CameraLandmark`
+    per feature, but evaluates all of them with a single batched projection.
+    The measurement is `[u_1, v_1, u_2, v_2, ...]`.
+
+    All landmarks are assumed visible. Features can be screened beforehand
+    with `Camera.evaluate_batch_with_jacobians` or
+    `Camera.is_landmark_in_front_of_cam_batch`.
+    """
+
+    def __init__(self, camera: Camera, landmark_positions: np.ndarray):
+        """
+        Parameters
+        ----------
+        camera : Camera
+            Camera model.
+        landmark_positions : np.ndarray with shape (N, 3)
+            Landmark positions resolved in the world frame.
+        """
+        self.camera = camera
+        self.landmark_positions = np.array(landmark_positions).reshape((-1, 3))
+
+    def evaluate(self, x: MatrixLieGroupState) -> np.ndarray:
+        return self.camera.evaluate_batch(x, self.landmark_positions).ravel()
+
+    def jacobian(self, x: MatrixLieGroupState) -> np.ndarray:
+        _, _, jac_pose, _ = self.camera.evaluate_batch_with_jacobians(
+            x, self.landmark_positions
+        )
+        return jac_pose.reshape((-1, x.dof))
+
+    def covariance(self, x: MatrixLieGroupState) -> np.ndarray:
+        return self.camera.sigma**2 * np.identity(
+            2 * self.landmark_positions.shape[0]
+        )
@@ -1,9 +1,17 @@
-from pylie import SO3, SE23
+from pylie import SO3
 import numpy as np
 from ..types import ProcessModel, Input
 from typing import Any, List, Tuple
 from .states import CompositeState, VectorState, SE23State
-from math import factorial
+from .lie_kernels import (
+    so3_exp,
+    so3_left_jacobian,
+    so3_n_matrix,
+    so3_wedge,
+    so3_left_jacobian_inv,
+    se23_left_jacobian,
+    se23_adjoint,
+)
 
 
 class IMU(Input):
@@ -271,80 +279,103 @@ def get_unbiased_imu(x: IMUState, u: IMU) -> IMU:
 
 def N_matrix(phi_vec: np.ndarray):
     """
-    The N matrix from Barfoot 2nd edition, equation 9.211
+    The N matrix from Barfoot 2nd edition, equation 9.211.
+
+    Accepts a single vector with size 3, or a stack of vectors with shape
+    (K, 3), in which case an array with shape (K, 3, 3) is returned.
     """
-    if np.linalg.norm(phi_vec) < SO3._small_angle_tol:
-        return np.identity(3)
-    else:
-        phi = np.linalg.norm(phi_vec)
-        a = phi_vec / phi
-        a = a.reshape((-1, 1))
-        a_wedge = SO3.wedge(a)
-        c = (1 - np.cos(phi)) / phi**2
-        s = (phi - np.sin(phi)) / phi**2
-        N = 2 * c * np.identity(3) + (1 - 2 * c) * (a @ a.T) + 2 * s * a_wedge
-        return N
+    return so3_n_matrix(phi_vec)
 
 
 def M_matrix(phi_vec):
-    phi_mat = SO3.wedge(phi_vec)
-    M = np.sum(
-        [
-            (2 / factorial(n + 2)) * np.linalg.matrix_power(phi_mat, n)
-            for n in range(100)
-        ],
-        axis=0,
-    )
-    return M
+    """
+    The series :math:`\\sum_{n=0}^\\infty \\frac{2}{(n+2)!} (\\phi^\\wedge)^n`,
+    which is identical to `N_matrix` and is evaluated in closed form.
+    """
+    return so3_n_matrix(phi_vec)
 
 
 def adjoint_IE3(X):
     """
-    Adjoint matrix of the "Incremental Euclidean Group".
+    Adjoint matrix of the "Incremental Euclidean Group". Also accepts a stack
+    of elements with shape (K, 5, 5).
     """
-    R = X[:3, :3]
-    c = X[3, 4]
-    a = X[:3, 3].reshape((-1, 1))
-    b = X[:3, 4].reshape((-1, 1))
-    Ad = np.zeros((9, 9))
-    Ad[:3, :3] = R
-    Ad[3:6, :3] = SO3.wedge(a) @ R
-    Ad[3:6, 3:6] = R
-
-    Ad[6:9, :3] = -SO3.wedge(c * a - b) @ R
-    Ad[6:9, 3:6] = -c * R
-    Ad[6:9, 6:9] = R
+    R = X[..., :3, :3]
+    c = X[..., 3, 4, None]
+    a = X[..., :3, 3]
+    b = X[..., :3, 4]
+    Ad = np.zeros(X.shape[:-2] + (9, 9))
+    Ad[..., :3, :3] = R
+    Ad[..., 3:6, :3] = so3_wedge(a) @ R
+    Ad[..., 3:6, 3:6] = R
+
+    Ad[..., 6:9, :3] = -so3_wedge(c * a - b) @ R
+    Ad[..., 6:9, 3:6] = -c[..., None] * R
+    Ad[..., 6:9, 6:9] = R
     return Ad
 
 
 def inverse_IE3(X):
     """
-    Inverse matrix on the "Incremental Euclidean Group".
+    Inverse matrix on the "Incremental Euclidean Group". Also accepts a stack
+    of elements with shape (K, 5, 5).
     """
 
-    R = X[:3, :3]
-    c = X[3, 4]
-    a = X[:3, 3].reshape((-1, 1))
-    b = X[:3, 4].reshape((-1, 1))
-    X_inv = np.identity(5)
-    X_inv[:3, :3] = R.T
-    X_inv[:3, 3] = np.ravel(-R.T @ a)
-    X_inv[:3, 4] = np.ravel(R.T @ (c * a - b))
-    X_inv[3, 4] = np.ravel(-c)
+    R_T = np.swapaxes(X[..., :3, :3], -1, -2)
+    c = X[..., 3, 4, None]
+    a = X[..., :3, 3]
+    b = X[..., :3, 4]
+    X_inv = np.zeros(X.shape)
+    X_inv[..., [0, 1, 2, 3, 4], [0, 1, 2, 3, 4]] = 1.0
+    X_inv[..., :3, :3] = R_T
+    X_inv[..., :3, 3] = -(R_T @ a[..., None])[..., 0]
+    X_inv[..., :3, 4] = (R_T @ (c * a - b)[..., None])[..., 0]
+    X_inv[..., 3, 4] = -c[..., 0]
     return X_inv
 
 
+def _as_imu_arrays(
+    gyro: np.ndarray, accel: np.ndarray, dt
+) -> Tuple[np.ndarray, np.ndarray, Any]:
+    """
+    Returns gyro and accel as arrays with shape (3,) for a single sample, or
+    (K, 3) for stacked samples, in which case dt is returned with shape
+    (K, 1) (or (1, 1) if it is a scalar).
+    """
+    gyro = np.asarray(gyro, dtype=np.float64)
+    accel = np.asarray(accel, dtype=np.float64)
+    stacked = (gyro.ndim == 2 and gyro.shape[1] == 3) or (
+        accel.ndim == 2 and accel.shape[1] == 3
+    )
+    if stacked:
+        gyro = gyro.reshape((-1, 3))
+        accel = accel.reshape((-1, 3))
+        dt = np.asarray(dt, dtype=np.float64).reshape((-1, 1))
+    else:
+        gyro = gyro.ravel()
+        accel = accel.ravel()
+    return gyro, accel, dt
+
+
 def U_matrix(omega, accel, dt: float):
+    """
+    The U matrix containing the IMU measurements, on the "Incremental
+    Euclidean Group". The inputs can also be stacked, with shapes (K, 3),
+    (K, 3) and (K,) (or a scalar `dt`), in which case an array with shape
+    (K, 5, 5) is returned.
+    """
+    omega, a, dt = _as_imu_arrays(omega, accel, dt)
     phi = omega * dt
-    O = SO3.Exp(phi)
-    J = SO3.left_jacobian(phi)
-    a = accel.reshape((-1, 1))
-    V = N_matrix(phi)
-    U = np.identity(5)
-    U[:3, :3] = O
-    U[:3, 3] = np.ravel(dt * J @ a)
-    U[:3, 4] = np.ravel(dt**2 / 2 * V @ a)
-    U[3, 4] = dt
+    O = so3_exp(phi)
+    J = so3_left_jacobian(phi)
+    V = so3_n_matrix(phi)
+    a = a[..., None]
+    U = np.zeros(O.shape[:-2] + (5, 5))
+    U[..., [0, 1, 2, 3, 4], [0, 1, 2, 3, 4]] = 1.0
+    U[..., :3, :3] = O
+    U[..., :3, 3] = dt * (J @ a)[..., 0]
+    U[..., :3, 4] = dt**2 / 2 * (V @ a)[..., 0]
+    U[..., 3, 4] = np.ravel(dt) if np.ndim(dt) > 0 else dt
     return U
 
 
@@ -389,35 +420,46 @@ def L_matrix(unbiased_gyro, unbiased_accel, dt: float) -> np.ndarray:
 
     Since the noise and bias are both additive to the input, they have the
     same jacobians.
+
+    The inputs can also be stacked, with shapes (K, 3), (K, 3) and (K,) (or a
+    scalar `dt`), in which case an array with shape (K, 9, 6) is returned.
     """
+    om, a, dt = _as_imu_arrays(unbiased_gyro, unbiased_accel, dt)
 
-    a = unbiased_accel
-    om = unbiased_gyro
     omdt = om * dt
-    J_att_inv_times_N = SO3.left_jacobian_inv(omdt) @ N_matrix(omdt)
-    xi = np.zeros((9,))
-    xi[:3] = dt * om
-    xi[3:6] = dt * a
-    xi[6:9] = (dt**2 / 2) * J_att_inv_times_N @ a
-    J = SE23.left_jacobian(-xi)
-    Om = SO3.wedge(omdt)
+    J_att_inv_times_N = so3_left_jacobian_inv(omdt) @ so3_n_matrix(omdt)
+    a_col = a[..., None]
+    dt_mat = np.asarray(dt)[..., None]
+
+    xi = np.concatenate(
+        [omdt, dt * a, (dt**2 / 2) * (J_att_inv_times_N @ a_col)[..., 0]],
+        axis=-1,
+    )
+    J = se23_left_jacobian(-xi)
+
+    Om = so3_wedge(omdt)
     OmOm = Om @ Om
-    A = SO3.wedge(a)
-    # See Barfoot 2nd edition, equation 9.247
-    Up = dt * np.eye(9, 6)
-    Up[6:9, 0:3] = (
+    A = so3_wedge(a)
+    Om_a = (Om @ a_col)[..., 0]
+    OmOm_a = (OmOm @ a_col)[..., 0]
+
+    # See Barfoot 2nd edition, equation 9.247. The upper 6 rows of the
+    # right-hand factor are dt times identity, so only its last 3 rows need
+    # to be multiplied out.
+    Up_r = np.empty(J.shape[:-2] + (3, 6))
+    Up_r[..., 0:3] = (
         -0.5
-        * (dt**2 / 2)
+        * (dt_mat**2 / 2)
         * (
             (1 / 360)
-            * (dt**3)
-            * (OmOm @ A + Om @ (SO3.wedge(Om @ a)) + SO3.wedge(OmOm @ a))
-            - (1 / 6) * dt * A
+            * (dt_mat**3)
+            * (OmOm @ A + Om @ so3_wedge(Om_a) + so3_wedge(OmOm_a))
+            - (1 / 6) * dt_mat * A
         )
     )
-    Up[6:9, 3:6] = (dt**2 / 2) * J_att_inv_times_N
+    Up_r[..., 3:6] = (dt_mat**2 / 2) * J_att_inv_times_N
 
-    L = J @ Up
+    L = dt_mat * J[..., 0:6] + J[..., 6:9] @ Up_r
     return L
 
 
@@ -487,14 +529,67 @@ class IMUKinematics(ProcessModel):
         IMUState
             Propagated IMUState.
         """
-        x = x.copy()
+        G, U = self._get_G_U(x, u, dt)
+        return self._evaluate(x, u, dt, G, U)
 
-        # Get unbiased inputs
-        u_no_bias = get_unbiased_imu(x, u)
+    def jacobian(self, x: IMUState, u: IMU, dt: float) -> np.ndarray:
+        """
+        Returns the Jacobian of the IMU kinematics model with respect
+        to the full state
+        """
+        G, U = self._get_G_U(x, u, dt)
+        L = None
+        if hasattr(x, "bias_gyro"):
+            L = self._get_input_jacobian(x, u, dt, G, U)
+        return self._jacobian(x, G, U, L)
+
+    def covariance(self, x: IMUState, u: IMU, dt: float) -> np.ndarray:
+        G, U = self._get_G_U(x, u, dt)
+        L = self._get_input_jacobian(x, u, dt, G, U)
+        return self._covariance(x, dt, L)
 
+    def evaluate_with_jacobians(
+        self, x: IMUState, u: IMU, dt: float
+    ) -> Tuple[IMUState, np.ndarray, np.ndarray]:
+        """
+        Evaluates the propagated state, the process model Jacobian and the
+        process noise covariance, computing the unbiased input and the G, U
+        and L matrices only once.
+        """
+        G, U = self._get_G_U(x, u, dt)
+        L = self._get_input_jacobian(x, u, dt, G, U)
+        x_new = self._evaluate(x, u, dt, G, U)
+        A = self._jacobian(x, G, U, L)
+        Q = self._covariance(x, dt, L)
+        return x_new, A, Q
+
+    def _get_unbiased_inputs(
+        self, x: IMUState, u: IMU
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Same as `get_unbiased_imu`, but returns the gyro and accelerometer
+        arrays without copying the IMU object.
+        """
+        gyro = u.gyro.ravel()
+        accel = u.accel.ravel()
+        if hasattr(x, "bias_gyro"):
+            gyro = gyro - x.bias_gyro.ravel()
+        if hasattr(x, "bias_accel"):
+            accel = accel - x.bias_accel.ravel()
+        return gyro, accel
+
+    def _get_G_U(
+        self, x: IMUState, u: IMU, dt: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        gyro, accel = self._get_unbiased_inputs(x, u)
         G = G_matrix(self._gravity, dt)
-        U = U_matrix(u_no_bias.gyro, u_no_bias.accel, dt)
+        U = U_matrix(gyro, accel, dt)
+        return G, U
 
+    def _evaluate(
+        self, x: IMUState, u: IMU, dt: float, G: np.ndarray, U: np.ndarray
+    ) -> IMUState:
+        x = x.copy()
         x.pose = G @ x.pose @ U
 
         # Propagate the biases forward in time using random walk
@@ -506,21 +601,13 @@ class IMUKinematics(ProcessModel):
 
         return x
 
-    def jacobian(self, x: IMUState, u: IMU, dt: float) -> np.ndarray:
-        """
-        Returns the Jacobian of the IMU kinematics model with respect
-        to the full state
-        """
-
-        # Get unbiased inputs
-        u_no_bias = get_unbiased_imu(x, u)
-
-        G = G_matrix(self._gravity, dt)
-        U_inv = U_matrix_inv(u_no_bias.gyro, u_no_bias.accel, dt)
+    def _jacobian(
+        self, x: IMUState, G: np.ndarray, U: np.ndarray, L: np.ndarray
+    ) -> np.ndarray:
 
         # Jacobian of process model wrt to pose
         if x.direction == "right":
-            jac_pose = adjoint_IE3(U_inv)
+            jac_pose = adjoint_IE3(inverse_IE3(U))
         elif x.direction == "left":
             jac_pose = adjoint_IE3(G)
 
@@ -528,7 +615,7 @@ class IMUKinematics(ProcessModel):
 
         if hasattr(x, "bias_gyro"):
             # Jacobian of pose wrt to bias
-            jac_bias = -self._get_input_jacobian(x, u, dt)
+            jac_bias = -L
 
             # Jacobian of bias random walk wrt to pose
             jac_pose = np.vstack([jac_pose, np.zeros((6, jac_pose.shape[1]))])
@@ -546,15 +633,13 @@ class IMUKinematics(ProcessModel):
 
         return x.jacobian_from_blocks(**jac_kwargs)
 
-    def covariance(self, x: IMUState, u: IMU, dt: float) -> np.ndarray:
-
-        # Jacobian of pose wrt to noise
-        L_pn = self._get_input_jacobian(x, u, dt)
-
-        # Jacobian of bias random walk wrt to noise
-        L_bn = np.zeros((6, 6))
+    def _covariance(self, x: IMUState, dt: float, L_pn: np.ndarray) -> np.ndarray:
+        # L_pn is the Jacobian of pose wrt to noise
 
         if hasattr(x, "bias_gyro"):
+            # Jacobian of bias random walk wrt to noise
+            L_bn = np.zeros((6, 6))
+
             # Jacobian of pose wrt to bias random walk
             L_pw = np.zeros((9, 6))
 
@@ -563,12 +648,22 @@ class IMUKinematics(ProcessModel):
 
             L = np.block([[L_pn, L_pw], [L_bn, L_bw]])
 
+        elif self._Q.shape[0] == 6:
+            L = L_pn
         else:
-            L = np.hstack([[L_pn, L_bn]])
+            # The bias random walk does not affect a state without biases.
+            L = np.hstack([L_pn, np.zeros((9, self._Q.shape[0] - 6))])
 
         return L @ self._Q @ L.T
 
-    def _get_input_jacobian(self, x: IMUState, u: IMU, dt: float) -> np.ndarray:
+    def _get_input_jacobian(
+        self,
+        x: IMUState,
+        u: IMU,
+        dt: float,
+        G: np.ndarray = None,
+        U: np.ndarray = None,
+    ) -> np.ndarray:
         """
         Computes the jacobian of the nav state with respect to the input.
 
@@ -576,14 +671,15 @@ class IMUKinematics(ProcessModel):
         same jacobians.
         """
         # Get unbiased inputs
-        u_no_bias = get_unbiased_imu(x, u)
+        gyro, accel = self._get_unbiased_inputs(x, u)
 
-        G = G_matrix(self._gravity, dt)
-        U = U_matrix(u_no_bias.gyro, u_no_bias.accel, dt)
-        L = L_matrix(u_no_bias.gyro, u_no_bias.accel, dt)
+        if G is None or U is None:
+            G = G_matrix(self._gravity, dt)
+            U = U_matrix(gyro, accel, dt)
+        L = L_matrix(gyro, accel, dt)
 
         if x.direction == "right":
             jac = L
         elif x.direction == "left":
-            jac = SE23.adjoint(G @ x.pose @ U) @ L
+            jac = se23_adjoint(G @ x.pose @ U) @ L
         return jac
@@ -0,0 +1,765 @@
+"""
+Closed-form, batched kernels for the matrix Lie groups most used in pynav.
+
+All functions accept either a single element (a vector of shape ``(dof,)`` or
+``(dof, 1)``, or a matrix of shape ``(n, n)``) or a stack of elements with a
+leading batch dimension (``(N, dof)`` or ``(N, n, n)``). The output has a
+batch dimension if and only if the input did.
+
+The coefficient functions that appear in the exponential map and Jacobians
+of SO(3) suffer from catastrophic cancellation at small angles. Below
+``_SERIES_TOL`` they are evaluated with truncated Taylor series instead, which
+are accurate to machine precision in that range.
+
+The ``FastSO3``, ``FastSE3`` and ``FastSE23`` classes are drop-in subclasses of
+the corresponding pylie groups that route the hot-path operations through
+these kernels. See :meth:`pynav.lib.states.MatrixLieGroupState.use_fast_kernels`.
+"""
+
+from typing import Tuple
+from math import sin, cos, sqrt
+import numpy as np
+from pylie import SO3, SE3, SE23
+
+_SERIES_TOL = 0.1
+_PI_TOL = 1e-3
+
+# Taylor coefficients, in powers of theta^2, of the scalar functions below.
+_A_COEFFS = [1.0, -1 / 6, 1 / 120, -1 / 5040, 1 / 362880]
+_B_COEFFS = [1 / 2, -1 / 24, 1 / 720, -1 / 40320, 1 / 3628800]
+_C_COEFFS = [1 / 6, -1 / 120, 1 / 5040, -1 / 362880, 1 / 39916800]
+_D_COEFFS = [1 / 12, 1 / 720, 1 / 30240, 1 / 1209600, 1 / 47900160]
+_Q2_COEFFS = [1 / 24, -1 / 720, 1 / 40320, -1 / 3628800, 1 / 479001600]
+_Q3_COEFFS = [1 / 120, -1 / 2520, 1 / 120960, -1 / 9979200, 1 / 1245404160]
+_SCALAR_COEFFS = {
+    "a": _A_COEFFS,
+    "b": _B_COEFFS,
+    "c": _C_COEFFS,
+    "d": _D_COEFFS,
+    "q": _Q2_COEFFS,
+    "r": _Q3_COEFFS,
+}
+
+
+def _series(theta2: np.ndarray, coeffs) -> np.ndarray:
+    out = np.full_like(theta2, coeffs[-1])
+    for c in coeffs[-2::-1]:
+        out = out * theta2 + c
+    return out
+
+
+def _coefficients(theta: np.ndarray, names: str) -> Tuple[np.ndarray, ...]:
+    """
+    Evaluates the requested scalar coefficient functions of the rotation
+    angle, switching to series expansions at small angles. The letters of
+    ``names`` select from
+
+        - ``a``: sin(t) / t
+        - ``b``: (1 - cos(t)) / t^2
+        - ``c``: (t - sin(t)) / t^3
+        - ``d``: 1 / t^2 - (1 + cos(t)) / (2 t sin(t))
+        - ``q``: (t^2 + 2 cos(t) - 2) / (2 t^4)
+        - ``r``: (2 t - 3 sin(t) + t cos(t)) / (2 t^5)
+    """
+    small = theta < _SERIES_TOL
+    t = np.where(small, 1.0, theta)
+    t2 = t * t
+    theta2 = theta * theta
+    s = np.sin(t)
+    c = np.cos(t)
+    direct = {
+        "a": lambda: s / t,
+        "b": lambda: 2 * np.sin(0.5 * t) ** 2 / t2,
+        "c": lambda: (t - s) / (t2 * t),
+        "d": lambda: 1 / t2 - (1 + c) / (2 * t * s),
+        "q": lambda: (t2 + 2 * c - 2) / (2 * t2 * t2),
+        "r": lambda: (2 * t - 3 * s + t * c) / (2 * t2 * t2 * t),
+    }
+    return tuple(
+        np.where(small, _series(theta2, _SCALAR_COEFFS[n]), direct[n]())
+        for n in names
+    )
+
+
+def _scalar_coefficients(theta: float, names: str) -> Tuple[float, ...]:
+    """
+    Scalar version of :func:`_coefficients`, used for single elements where
+    the overhead of array operations dominates.
+    """
+    out = []
+    if theta < _SERIES_TOL:
+        theta2 = theta * theta
+        for n in names:
+            coeffs = _SCALAR_COEFFS[n]
+            value = coeffs[-1]
+            for c in coeffs[-2::-1]:
+                value = value * theta2 + c
+            out.append(value)
+        return tuple(out)
+
+    t = theta
+    t2 = t * t
+    s = sin(t)
+    c = cos(t)
+    for n in names:
+        if n == "a":
+            out.append(s / t)
+        elif n == "b":
+            out.append(2 * sin(0.5 * t) ** 2 / t2)
+        elif n == "c":
+            out.append((t - s) / (t2 * t))
+        elif n == "d":
+            out.append(1 / t2 - (1 + c) / (2 * t * s))
+        elif n == "q":
+            out.append((t2 + 2 * c - 2) / (2 * t2 * t2))
+        elif n == "r":
+            out.append((2 * t - 3 * s + t * c) / (2 * t2 * t2 * t))
+    return tuple(out)
+
+
+def _wedge3(phi: np.ndarray) -> np.ndarray:
+    W = np.zeros(phi.shape[:-1] + (3, 3))
+    W[..., 0, 1] = -phi[..., 2]
+    W[..., 0, 2] = phi[..., 1]
+    W[..., 1, 0] = phi[..., 2]
+    W[..., 1, 2] = -phi[..., 0]
+    W[..., 2, 0] = -phi[..., 1]
+    W[..., 2, 1] = phi[..., 0]
+    return W
+
+
+def _wedge3_single(phi: np.ndarray) -> np.ndarray:
+    return np.array(
+        [
+            [0.0, -phi[2], phi[1]],
+            [phi[2], 0.0, -phi[0]],
+            [-phi[1], phi[0], 0.0],
+        ]
+    )
+
+
+def _norm3(phi: np.ndarray) -> float:
+    return sqrt(phi[0] * phi[0] + phi[1] * phi[1] + phi[2] * phi[2])
+
+
+_I3 = np.identity(3)
+
+# Each operation below has a batch implementation, operating on arrays with a
+# leading batch dimension, and a `_single` implementation for one element.
+# The latter avoids the fixed cost of the batch machinery, which dominates
+# for 3 x 3 operands.
+
+
+def _so3_exp(phi: np.ndarray) -> np.ndarray:
+    theta = np.linalg.norm(phi, axis=-1)
+    a, b = _coefficients(theta, "ab")
+    W = _wedge3(phi)
+    C = a[:, None, None] * W + b[:, None, None] * (W @ W)
+    C[:, [0, 1, 2], [0, 1, 2]] += 1.0
+    return C
+
+
+def _so3_exp_single(phi: np.ndarray) -> np.ndarray:
+    a, b = _scalar_coefficients(_norm3(phi), "ab")
+    W = _wedge3_single(phi)
+    return _I3 + a * W + b * (W @ W)
+
+
+def _so3_log(C: np.ndarray) -> np.ndarray:
+    v = np.stack(
+        [
+            C[:, 2, 1] - C[:, 1, 2],
+            C[:, 0, 2] - C[:, 2, 0],
+            C[:, 1, 0] - C[:, 0, 1],
+        ],
+        axis=-1,
+    )
+    cos_theta = 0.5 * (np.trace(C, axis1=1, axis2=2) - 1)
+    sin_theta = 0.5 * np.linalg.norm(v, axis=-1)
+    theta = np.arctan2(sin_theta, cos_theta)
+    near_pi = theta > np.pi - _PI_TOL
+    (a,) = _coefficients(theta, "a")
+    phi = 0.5 * v / np.where(near_pi, 1.0, a)[:, None]
+
+    # Near theta = pi the antisymmetric part vanishes. Recover the axis from
+    # the symmetric part instead, and its sign from whatever is left of v.
+    if np.any(near_pi):
+        phi[near_pi] = [
+            _so3_log_near_pi(C_i, c_i, t_i, v_i)
+            for C_i, c_i, t_i, v_i in zip(
+                C[near_pi], cos_theta[near_pi], theta[near_pi], v[near_pi]
+            )
+        ]
+
+    return phi
+
+
+def _so3_log_single(C: np.ndarray) -> np.ndarray:
+    v = np.array(
+        [C[2, 1] - C[1, 2], C[0, 2] - C[2, 0], C[1, 0] - C[0, 1]]
+    )
+    cos_theta = 0.5 * (C[0, 0] + C[1, 1] + C[2, 2] - 1)
+    theta = np.arctan2(0.5 * _norm3(v), cos_theta)
+    if theta > np.pi - _PI_TOL:
+        return _so3_log_near_pi(C, cos_theta, theta, v)
+    (a,) = _scalar_coefficients(theta, "a")
+    return 0.5 * v / a
+
+
+def _so3_log_near_pi(
+    C: np.ndarray, cos_theta: float, theta: float, v: np.ndarray
+) -> np.ndarray:
+    S = (0.5 * (C + C.T) - cos_theta * _I3) / (1 - cos_theta)
+    k = np.argmax(np.diag(S))
+    axis = S[:, k] / sqrt(S[k, k])
+    if axis @ v < 0:
+        axis = -axis
+    return theta * axis
+
+
+def _so3_left_jacobian(phi: np.ndarray) -> np.ndarray:
+    theta = np.linalg.norm(phi, axis=-1)
+    b, c = _coefficients(theta, "bc")
+    W = _wedge3(phi)
+    J = b[:, None, None] * W + c[:, None, None] * (W @ W)
+    J[:, [0, 1, 2], [0, 1, 2]] += 1.0
+    return J
+
+
+def _so3_left_jacobian_single(phi: np.ndarray) -> np.ndarray:
+    b, c = _scalar_coefficients(_norm3(phi), "bc")
+    W = _wedge3_single(phi)
+    return _I3 + b * W + c * (W @ W)
+
+
+def _so3_left_jacobian_inv(phi: np.ndarray) -> np.ndarray:
+    theta = np.linalg.norm(phi, axis=-1)
+    (d,) = _coefficients(theta, "d")
+    W = _wedge3(phi)
+    J_inv = -0.5 * W + d[:, None, None] * (W @ W)
+    J_inv[:, [0, 1, 2], [0, 1, 2]] += 1.0
+    return J_inv
+
+
+def _so3_left_jacobian_inv_single(phi: np.ndarray) -> np.ndarray:
+    (d,) = _scalar_coefficients(_norm3(phi), "d")
+    W = _wedge3_single(phi)
+    return _I3 - 0.5 * W + d * (W @ W)
+
+
+def _so3_n_matrix(phi: np.ndarray) -> np.ndarray:
+    theta = np.linalg.norm(phi, axis=-1)
+    c, q = _coefficients(theta, "cq")
+    W = _wedge3(phi)
+    N = 2 * c[:, None, None] * W + 2 * q[:, None, None] * (W @ W)
+    N[:, [0, 1, 2], [0, 1, 2]] += 1.0
+    return N
+
+
+def _so3_n_matrix_single(phi: np.ndarray) -> np.ndarray:
+    c, q = _scalar_coefficients(_norm3(phi), "cq")
+    W = _wedge3_single(phi)
+    return _I3 + 2 * c * W + 2 * q * (W @ W)
+
+
+def _q_matrix(phi: np.ndarray, rho: np.ndarray) -> np.ndarray:
+    """
+    The Q matrix from Barfoot 2nd edition, equation 7.86, which forms the
+    off-diagonal blocks of the SE(3) and SE_2(3) left Jacobians.
+    """
+    theta = np.linalg.norm(phi, axis=-1)
+    c, q, r = _coefficients(theta, "cqr")
+    P = _wedge3(phi)
+    R = _wedge3(rho)
+    PR = P @ R
+    RP = R @ P
+    PRP = PR @ P
+    Q = (
+        0.5 * R
+        + c[:, None, None] * (PR + RP + PRP)
+        + q[:, None, None] * (P @ PR + RP @ P - 3 * PRP)
+        + r[:, None, None] * (PRP @ P + P @ PRP)
+    )
+    return Q
+
+
+def _q_matrix_single(phi: np.ndarray, rho: np.ndarray) -> np.ndarray:
+    c, q, r = _scalar_coefficients(_norm3(phi), "cqr")
+    P = _wedge3_single(phi)
+    R = _wedge3_single(rho)
+    PR = P @ R
+    RP = R @ P
+    PRP = PR @ P
+    return (
+        0.5 * R
+        + c * (PR + RP + PRP)
+        + q * (P @ PR + RP @ P - 3 * PRP)
+        + r * (PRP @ P + P @ PRP)
+    )
+
+
+def _as_vector(xi: np.ndarray, dof: int) -> np.ndarray:
+    xi = np.asarray(xi, dtype=np.float64)
+    if xi.ndim == 2 and xi.shape[1] == dof:
+        return xi
+    if xi.size != dof:
+        raise ValueError(
+            "Expected a vector with {0} elements or a (N, {0}) array.".format(dof)
+        )
+    return xi.ravel()
+
+
+def _as_matrix(X: np.ndarray) -> np.ndarray:
+    return np.asarray(X, dtype=np.float64)
+
+
+def so3_wedge(phi: np.ndarray) -> np.ndarray:
+    """
+    Skew-symmetric matrix of a vector (or stack of vectors).
+    """
+    phi = _as_vector(phi, 3)
+    if phi.ndim == 1:
+        return _wedge3_single(phi)
+    return _wedge3(phi)
+
+
+def so3_vee(W: np.ndarray) -> np.ndarray:
+    """
+    Inverse of :func:`so3_wedge`. Returns shape ``(3,)`` or ``(N, 3)``.
+    """
+    W = _as_matrix(W)
+    return np.stack([W[..., 2, 1], W[..., 0, 2], W[..., 1, 0]], axis=-1)
+
+
+def so3_exp(phi: np.ndarray) -> np.ndarray:
+    """
+    Exponential map of SO(3), from ``(3,)`` or ``(N, 3)`` to ``(3, 3)`` or
+    ``(N, 3, 3)``.
+    """
+    phi = _as_vector(phi, 3)
+    if phi.ndim == 1:
+        return _so3_exp_single(phi)
+    return _so3_exp(phi)
+
+
+def so3_log(C: np.ndarray) -> np.ndarray:
+    """
+    Logarithmic map of SO(3), from ``(3, 3)`` or ``(N, 3, 3)`` to ``(3,)`` or
+    ``(N, 3)``. Robust near both zero and pi.
+    """
+    C = _as_matrix(C)
+    if C.ndim == 2:
+        return _so3_log_single(C)
+    return _so3_log(C)
+
+
+def so3_inverse(C: np.ndarray) -> np.ndarray:
+    """
+    Inverse of SO(3) elements, which is their transpose.
+    """
+    return np.swapaxes(_as_matrix(C), -1, -2)
+
+
+def so3_left_jacobian(phi: np.ndarray) -> np.ndarray:
+    """
+    Left Jacobian of SO(3).
+    """
+    phi = _as_vector(phi, 3)
+    if phi.ndim == 1:
+        return _so3_left_jacobian_single(phi)
+    return _so3_left_jacobian(phi)
+
+
+def so3_left_jacobian_inv(phi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the left Jacobian of SO(3).
+    """
+    phi = _as_vector(phi, 3)
+    if phi.ndim == 1:
+        return _so3_left_jacobian_inv_single(phi)
+    return _so3_left_jacobian_inv(phi)
+
+
+def so3_right_jacobian(phi: np.ndarray) -> np.ndarray:
+    """
+    Right Jacobian of SO(3).
+    """
+    return so3_left_jacobian(-_as_vector(phi, 3))
+
+
+def so3_right_jacobian_inv(phi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the right Jacobian of SO(3).
+    """
+    return so3_left_jacobian_inv(-_as_vector(phi, 3))
+
+
+def so3_n_matrix(phi: np.ndarray) -> np.ndarray:
+    """
+    The N matrix from Barfoot 2nd edition, equation 9.211, defined by the
+    series :math:`\\sum_{n=0}^\\infty \\frac{2}{(n+2)!} (\\phi^\\wedge)^n`. It
+    appears in the position part of the discrete IMU kinematics.
+    """
+    phi = _as_vector(phi, 3)
+    if phi.ndim == 1:
+        return _so3_n_matrix_single(phi)
+    return _so3_n_matrix(phi)
+
+
+def _sek3_exp(xi: np.ndarray, k: int) -> np.ndarray:
+    n = 3 + k
+    X = np.zeros((xi.shape[0], n, n))
+    phi = xi[:, 0:3]
+    X[:, 0:3, 0:3] = _so3_exp(phi)
+    J = _so3_left_jacobian(phi)
+    X[:, 0:3, 3:] = J @ xi[:, 3:].reshape((-1, k, 3)).transpose((0, 2, 1))
+    X[:, range(3, n), range(3, n)] = 1.0
+    return X
+
+
+def _sek3_exp_single(xi: np.ndarray, k: int) -> np.ndarray:
+    X = np.identity(3 + k)
+    phi = xi[0:3]
+    X[0:3, 0:3] = _so3_exp_single(phi)
+    X[0:3, 3:] = _so3_left_jacobian_single(phi) @ xi[3:].reshape((k, 3)).T
+    return X
+
+
+def _sek3_log(X: np.ndarray, k: int) -> np.ndarray:
+    xi = np.zeros((X.shape[0], 3 + 3 * k))
+    phi = _so3_log(X[:, 0:3, 0:3])
+    xi[:, 0:3] = phi
+    J_inv = _so3_left_jacobian_inv(phi)
+    xi[:, 3:] = (J_inv @ X[:, 0:3, 3:]).transpose((0, 2, 1)).reshape((-1, 3 * k))
+    return xi
+
+
+def _sek3_log_single(X: np.ndarray, k: int) -> np.ndarray:
+    xi = np.empty(3 + 3 * k)
+    phi = _so3_log_single(X[0:3, 0:3])
+    xi[0:3] = phi
+    xi[3:] = (_so3_left_jacobian_inv_single(phi) @ X[0:3, 3:]).T.ravel()
+    return xi
+
+
+def _sek3_inverse(X: np.ndarray, k: int) -> np.ndarray:
+    X_inv = np.zeros(X.shape)
+    Ct = np.swapaxes(X[..., 0:3, 0:3], -1, -2)
+    X_inv[..., 0:3, 0:3] = Ct
+    X_inv[..., 0:3, 3:] = -Ct @ X[..., 0:3, 3:]
+    n = 3 + k
+    X_inv[..., range(3, n), range(3, n)] = 1.0
+    return X_inv
+
+
+def _sek3_adjoint(X: np.ndarray, k: int) -> np.ndarray:
+    dof = 3 + 3 * k
+    Ad = np.zeros(X.shape[:-2] + (dof, dof))
+    C = X[..., 0:3, 0:3]
+    wedge = _wedge3 if X.ndim == 3 else _wedge3_single
+    Ad[..., 0:3, 0:3] = C
+    for i in range(k):
+        s = slice(3 + 3 * i, 6 + 3 * i)
+        Ad[..., s, 0:3] = wedge(X[..., 0:3, 3 + i]) @ C
+        Ad[..., s, s] = C
+    return Ad
+
+
+def _sek3_left_jacobian(xi: np.ndarray, k: int) -> np.ndarray:
+    dof = 3 + 3 * k
+    phi = xi[:, 0:3]
+    J = _so3_left_jacobian(phi)
+    jac = np.zeros((xi.shape[0], dof, dof))
+    jac[:, 0:3, 0:3] = J
+    for i in range(k):
+        s = slice(3 + 3 * i, 6 + 3 * i)
+        jac[:, s, 0:3] = _q_matrix(phi, xi[:, s])
+        jac[:, s, s] = J
+    return jac
+
+
+def _sek3_left_jacobian_single(xi: np.ndarray, k: int) -> np.ndarray:
+    dof = 3 + 3 * k
+    phi = xi[0:3]
+    J = _so3_left_jacobian_single(phi)
+    jac = np.zeros((dof, dof))
+    jac[0:3, 0:3] = J
+    for i in range(k):
+        s = slice(3 + 3 * i, 6 + 3 * i)
+        jac[s, 0:3] = _q_matrix_single(phi, xi[s])
+        jac[s, s] = J
+    return jac
+
+
+def _sek3_left_jacobian_inv(xi: np.ndarray, k: int) -> np.ndarray:
+    dof = 3 + 3 * k
+    phi = xi[:, 0:3]
+    J_inv = _so3_left_jacobian_inv(phi)
+    jac = np.zeros((xi.shape[0], dof, dof))
+    jac[:, 0:3, 0:3] = J_inv
+    for i in range(k):
+        s = slice(3 + 3 * i, 6 + 3 * i)
+        jac[:, s, 0:3] = -J_inv @ _q_matrix(phi, xi[:, s]) @ J_inv
+        jac[:, s, s] = J_inv
+    return jac
+
+
+def _sek3_left_jacobian_inv_single(xi: np.ndarray, k: int) -> np.ndarray:
+    dof = 3 + 3 * k
+    phi = xi[0:3]
+    J_inv = _so3_left_jacobian_inv_single(phi)
+    jac = np.zeros((dof, dof))
+    jac[0:3, 0:3] = J_inv
+    for i in range(k):
+        s = slice(3 + 3 * i, 6 + 3 * i)
+        jac[s, 0:3] = -J_inv @ _q_matrix_single(phi, xi[s]) @ J_inv
+        jac[s, s] = J_inv
+    return jac
+
+
+def _sek3_vector_op(xi, k, single_op, batch_op) -> np.ndarray:
+    xi = _as_vector(xi, 3 + 3 * k)
+    if xi.ndim == 1:
+        return single_op(xi, k)
+    return batch_op(xi, k)
+
+
+def _sek3_matrix_op(X, k, single_op, batch_op) -> np.ndarray:
+    X = _as_matrix(X)
+    if X.ndim == 2:
+        return single_op(X, k)
+    return batch_op(X, k)
+
+
+def se3_exp(xi: np.ndarray) -> np.ndarray:
+    """
+    Exponential map of SE(3), with ``xi = [phi, rho]``.
+    """
+    return _sek3_vector_op(xi, 1, _sek3_exp_single, _sek3_exp)
+
+
+def se3_log(T: np.ndarray) -> np.ndarray:
+    """
+    Logarithmic map of SE(3). Returns ``[phi, rho]``.
+    """
+    return _sek3_matrix_op(T, 1, _sek3_log_single, _sek3_log)
+
+
+def se3_inverse(T: np.ndarray) -> np.ndarray:
+    """
+    Closed-form inverse of SE(3) elements.
+    """
+    return _sek3_inverse(_as_matrix(T), 1)
+
+
+def se3_adjoint(T: np.ndarray) -> np.ndarray:
+    """
+    Adjoint matrix of SE(3) elements.
+    """
+    return _sek3_adjoint(_as_matrix(T), 1)
+
+
+def se3_left_jacobian(xi: np.ndarray) -> np.ndarray:
+    """
+    Left Jacobian of SE(3).
+    """
+    return _sek3_vector_op(
+        xi, 1, _sek3_left_jacobian_single, _sek3_left_jacobian
+    )
+
+
+def se3_left_jacobian_inv(xi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the left Jacobian of SE(3).
+    """
+    return _sek3_vector_op(
+        xi, 1, _sek3_left_jacobian_inv_single, _sek3_left_jacobian_inv
+    )
+
+
+def se3_right_jacobian(xi: np.ndarray) -> np.ndarray:
+    """
+    Right Jacobian of SE(3).
+    """
+    return se3_left_jacobian(-_as_vector(xi, 6))
+
+
+def se3_right_jacobian_inv(xi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the right Jacobian of SE(3).
+    """
+    return se3_left_jacobian_inv(-_as_vector(xi, 6))
+
+
+def se23_exp(xi: np.ndarray) -> np.ndarray:
+    """
+    Exponential map of SE_2(3), with ``xi = [phi, nu, rho]``.
+    """
+    return _sek3_vector_op(xi, 2, _sek3_exp_single, _sek3_exp)
+
+
+def se23_log(X: np.ndarray) -> np.ndarray:
+    """
+    Logarithmic map of SE_2(3). Returns ``[phi, nu, rho]``.
+    """
+    return _sek3_matrix_op(X, 2, _sek3_log_single, _sek3_log)
+
+
+def se23_inverse(X: np.ndarray) -> np.ndarray:
+    """
+    Closed-form inverse of SE_2(3) elements.
+    """
+    return _sek3_inverse(_as_matrix(X), 2)
+
+
+def se23_adjoint(X: np.ndarray) -> np.ndarray:
+    """
+    Adjoint matrix of SE_2(3) elements.
+    """
+    return _sek3_adjoint(_as_matrix(X), 2)
+
+
+def se23_left_jacobian(xi: np.ndarray) -> np.ndarray:
+    """
+    Left Jacobian of SE_2(3).
+    """
+    return _sek3_vector_op(
+        xi, 2, _sek3_left_jacobian_single, _sek3_left_jacobian
+    )
+
+
+def se23_left_jacobian_inv(xi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the left Jacobian of SE_2(3).
+    """
+    return _sek3_vector_op(
+        xi, 2, _sek3_left_jacobian_inv_single, _sek3_left_jacobian_inv
+    )
+
+
+def se23_right_jacobian(xi: np.ndarray) -> np.ndarray:
+    """
+    Right Jacobian of SE_2(3).
+    """
+    return se23_left_jacobian(-_as_vector(xi, 9))
+
+
+def se23_right_jacobian_inv(xi: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the right Jacobian of SE_2(3).
+    """
+    return se23_left_jacobian_inv(-_as_vector(xi, 9))
+
+
+class FastSO3(SO3):
+    """
+    SO(3) with the exponential, logarithm and Jacobians evaluated by the
+    closed-form kernels in this module. All other operations are inherited
+    from pylie.
+    """
+
+    @staticmethod
+    def Exp(x):
+        return so3_exp(np.ravel(x))
+
+    @staticmethod
+    def Log(C):
+        return so3_log(C).reshape((-1, 1))
+
+    @staticmethod
+    def inverse(C):
+        return np.asarray(C).T
+
+    @staticmethod
+    def left_jacobian(x):
+        return so3_left_jacobian(np.ravel(x))
+
+    @staticmethod
+    def left_jacobian_inv(x):
+        return so3_left_jacobian_inv(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian(x):
+        return so3_right_jacobian(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian_inv(x):
+        return so3_right_jacobian_inv(np.ravel(x))
+
+
+class FastSE3(SE3):
+    """
+    SE(3) with the exponential, logarithm, inverse, adjoint and Jacobians
+    evaluated by the closed-form kernels in this module.
+    """
+
+    @staticmethod
+    def Exp(x):
+        return se3_exp(np.ravel(x))
+
+    @staticmethod
+    def Log(T):
+        return se3_log(T).reshape((-1, 1))
+
+    @staticmethod
+    def inverse(T):
+        return se3_inverse(T)
+
+    @staticmethod
+    def adjoint(T):
+        return se3_adjoint(T)
+
+    @staticmethod
+    def left_jacobian(x):
+        return se3_left_jacobian(np.ravel(x))
+
+    @staticmethod
+    def left_jacobian_inv(x):
+        return se3_left_jacobian_inv(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian(x):
+        return se3_right_jacobian(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian_inv(x):
+        return se3_right_jacobian_inv(np.ravel(x))
+
+
+class FastSE23(SE23):
+    """
+    SE_2(3) with the exponential, logarithm, inverse, adjoint and Jacobians
+    evaluated by the closed-form kernels in this module.
+    """
+
+    @staticmethod
+    def Exp(x):
+        return se23_exp(np.ravel(x))
+
+    @staticmethod
+    def Log(X):
+        return se23_log(X).reshape((-1, 1))
+
+    @staticmethod
+    def inverse(X):
+        return se23_inverse(X)
+
+    @staticmethod
+    def adjoint(X):
+        return se23_adjoint(X)
+
+    @staticmethod
+    def left_jacobian(x):
+        return se23_left_jacobian(np.ravel(x))
+
+    @staticmethod
+    def left_jacobian_inv(x):
+        return se23_left_jacobian_inv(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian(x):
+        return se23_right_jacobian(np.ravel(x))
+
+    @staticmethod
+    def right_jacobian_inv(x):
+        return se23_right_jacobian_inv(np.ravel(x))
@@ -4,6 +4,9 @@ from pynav.types import (
     MeasurementModel,
     StampedValue,
     Input,
+    BlockSparseJacobian,
+    BlockDiagonalMatrix,
+    BlockIdentityMatrix,
 )
 from pynav.lib.states import (
     CompositeState,
@@ -12,8 +15,58 @@ from pynav.lib.states import (
 )
 from pylie import SO2, SO3
 import numpy as np
-from typing import List
-from scipy.linalg import block_diag
+from typing import Any, Callable, List, Tuple, Union
+from collections import OrderedDict
+
+
+class _DtCache:
+    """
+    A small least-recently-used cache of the discrete-time matrices of a
+    process model, keyed by name and `dt`. Cached arrays are shared between
+    calls and are therefore read-only, unless `readonly` is False.
+    """
+
+    __slots__ = ["_entries", "maxsize", "readonly"]
+
+    def __init__(self, maxsize: int = 16, readonly: bool = True):
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self.maxsize = maxsize
+        self.readonly = readonly
+
+    def lookup(self, name: str, dt: float):
+        """
+        Returns the cached value, or None if there is none.
+        """
+        key = (name, float(dt))
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def store(self, name: str, dt: float, value):
+        """
+        Caches an array, or a tuple of arrays, evicting the least recently
+        used entry if the cache is full, and returns it.
+        """
+        if self.readonly:
+            arrays = value if isinstance(value, tuple) else (value,)
+            for array in arrays:
+                array.flags.writeable = False
+        key = (name, float(dt))
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def get(self, name: str, dt: float, func: Callable[[], Any]):
+        value = self.lookup(name, dt)
+        if value is None:
+            value = self.store(name, dt, func())
+        return value
+
+    def clear(self):
+        self._entries.clear()
 
 
 class SingleIntegrator(ProcessModel):
@@ -21,6 +74,9 @@ class SingleIntegrator(ProcessModel):
     The single-integrator process model is a process model of the form
 
         x_dot = u .
+
+    The Jacobian and covariance are cached for each `dt`, and copies are
+    returned. Setting `Q` clears the cache.
     """
 
     def __init__(self, Q: np.ndarray):
@@ -30,6 +86,20 @@ class SingleIntegrator(ProcessModel):
 
         self._Q = Q
         self.dim = Q.shape[0]
+        self._cache = _DtCache()
+
+    @property
+    def Q(self) -> np.ndarray:
+        """
+        Discrete time covariance on the input. Setting it clears the cached
+        matrices.
+        """
+        return self._Q
+
+    @Q.setter
+    def Q(self, Q: np.ndarray):
+        self._Q = Q
+        self._cache.clear()
 
     def evaluate(
         self, x: VectorState, u: StampedValue, dt: float
@@ -42,7 +112,7 @@ class SingleIntegrator(ProcessModel):
         return np.identity(self.dim)
 
     def covariance(self, x, u, dt) -> np.ndarray:
-        return dt**2 * self._Q
+        return self._cache.get("Q", dt, lambda: dt**2 * self._Q).copy()
 
 
 class DoubleIntegrator(ProcessModel):
@@ -54,6 +124,9 @@ class DoubleIntegrator(ProcessModel):
         v_dot = u
 
     where `u` is the input.
+
+    The Jacobians and covariance are cached for each `dt`, and copies are
+    returned. Setting `Q` clears the cache.
     """
 
     def __init__(self, Q: np.ndarray):
@@ -66,6 +139,20 @@ class DoubleIntegrator(ProcessModel):
 
         self._Q = Q
         self.dim = Q.shape[0]
+        self._cache = _DtCache()
+
+    @property
+    def Q(self) -> np.ndarray:
+        """
+        Discrete time covariance on the input. Setting it clears the cached
+        matrices.
+        """
+        return self._Q
+
+    @Q.setter
+    def Q(self, Q: np.ndarray):
+        self._Q = Q
+        self._cache.clear()
 
     def evaluate(
         self, x: VectorState, u: StampedValue, dt: float
@@ -74,8 +161,8 @@ class DoubleIntegrator(ProcessModel):
         Evaluate discrete-time process model
         """
         x_new = x.copy()
-        Ad = self.jacobian(None, None, dt)
-        Ld = self.input_jacobian(dt)
+        Ad = self._cache.get("A", dt, lambda: self._state_matrix(dt))
+        Ld = self._cache.get("L", dt, lambda: self._input_matrix(dt))
         u = np.atleast_1d(u.value)
         x_new.value = (
             Ad @ x.value.reshape((-1, 1)) + Ld @ u[:self.dim].reshape((-1, 1))
@@ -86,29 +173,35 @@ class DoubleIntegrator(ProcessModel):
         """
         Discrete-time state Jacobian
         """
-        
-        Ad = np.identity(2 * self.dim)
-        Ad[0 : self.dim, self.dim :] = dt * np.identity(self.dim)
-        return Ad
+        return self._cache.get("A", dt, lambda: self._state_matrix(dt)).copy()
 
     def covariance(self, x, u, dt) -> np.ndarray:
         """
         Discrete-time covariance on process model
         """
-
-        Ld = self.input_jacobian(dt)
-        return Ld @ self._Q @ Ld.T
+        return self._cache.get("Q", dt, lambda: self._covariance(dt)).copy()
 
     def input_jacobian(self, dt):
         """
         Discrete-time input Jacobian
         """
-        # TODO. make these public
+        return self._cache.get("L", dt, lambda: self._input_matrix(dt)).copy()
+
+    def _state_matrix(self, dt) -> np.ndarray:
+        Ad = np.identity(2 * self.dim)
+        Ad[0 : self.dim, self.dim :] = dt * np.identity(self.dim)
+        return Ad
+
+    def _input_matrix(self, dt) -> np.ndarray:
         Ld = np.zeros((2 * self.dim, self.dim))
         Ld[0 : self.dim, :] = 0.5 * dt**2 * np.identity(self.dim)
         Ld[self.dim :, :] = dt * np.identity(self.dim)
         return Ld
 
+    def _covariance(self, dt) -> np.ndarray:
+        Ld = self.input_jacobian(dt)
+        return Ld @ self._Q @ Ld.T
+
 
 class DoubleIntegratorWithBias(DoubleIntegrator):
     """
@@ -138,6 +231,7 @@ class DoubleIntegratorWithBias(DoubleIntegrator):
 
         self._Q = Q
         self.dim = int(Q.shape[0] / 2)
+        self._cache = _DtCache()
 
     def evaluate(
         self, x: VectorState, u: StampedValue, dt: float
@@ -146,9 +240,12 @@ class DoubleIntegratorWithBias(DoubleIntegrator):
         Evaluate discrete-time process model
         """
         x = x.copy()
-        u = u.copy()
-        Ad = super().jacobian(x, u, dt)
-        Ld = super().input_jacobian(dt)
+        Ad = self._cache.get(
+            "A_pv", dt, lambda: DoubleIntegrator._state_matrix(self, dt)
+        )
+        Ld = self._cache.get(
+            "L_pv", dt, lambda: DoubleIntegrator._input_matrix(self, dt)
+        )
 
         pv = x.value[0 : 2 * self.dim].reshape((-1, 1))
         bias = x.value[2 * self.dim :].reshape((-1, 1))
@@ -167,12 +264,9 @@ class DoubleIntegratorWithBias(DoubleIntegrator):
         x.value[2*self.dim:] = (bias + walk * dt).ravel()
         return x
 
-    def jacobian(self, x, u, dt) -> np.ndarray:
-        """
-        Discrete-time state Jacobian
-        """
-        Ad = super().jacobian(x, u, dt)
-        Ld = super().input_jacobian(dt)
+    def _state_matrix(self, dt) -> np.ndarray:
+        Ad = super()._state_matrix(dt)
+        Ld = super()._input_matrix(dt)
 
         A = np.block(
             [
@@ -182,20 +276,160 @@ class DoubleIntegratorWithBias(DoubleIntegrator):
         )
         return A
 
+    def _input_matrix(self, dt) -> np.ndarray:
+        Ld = super()._input_matrix(dt)
+        L = np.zeros((3 * self.dim, 2 * self.dim))
+        L[0 : 2 * self.dim, 0 : self.dim] = Ld
+        L[2 * self.dim :, self.dim :] = dt * np.identity(self.dim)
+        return L
+
+
+class MultiAgentDoubleIntegrator(ProcessModel):
+    """
+    K independent double integrators propagated together. The state vector
+    stacks the position and velocity of each agent,
+
+        x = [p_1, v_1, p_2, v_2, ..., p_K, v_K],
+
+    and the input stacks their accelerations `[u_1, ..., u_K]`. The state is
+    propagated with array operations on the (K, 2, d) view of the state.
+    The block-diagonal Jacobian and covariance, with one block per agent, are
+    available without forming them with `jacobian_blocks` and
+    `covariance_blocks`, which the EKF applies block by block, and
+    `predict_covariance` exploits the structure of the Jacobian.
+    Setting `Q` clears the cached matrices.
+    """
+
+    def __init__(self, Q: np.ndarray, n_agents: int):
+        """
+        Parameters
+        ----------
+        Q : np.ndarray with shape (d, d) or (K, d, d)
+            Discrete time covariance on the input of each agent, either
+            shared by all agents or given per agent.
+        n_agents : int
+            Number of agents K.
+        """
+        Q = np.asarray(Q)
+        self.dim = Q.shape[-1]
+        self.n_agents = n_agents
+        self._agent_model = DoubleIntegrator(np.identity(self.dim))
+        self._cache = _DtCache()
+        self.Q = Q
+
+    @property
+    def Q(self) -> np.ndarray:
+        """
+        Discrete time covariance on the input of each agent, with shape
+        (K, d, d). Setting it clears the cached matrices.
+        """
+        return self._Q
+
+    @Q.setter
+    def Q(self, Q: np.ndarray):
+        Q = np.asarray(Q)
+        if Q.shape[-1] != Q.shape[-2]:
+            raise ValueError("Q must be an n x n matrix.")
+        if Q.ndim == 3 and Q.shape[0] != self.n_agents:
+            raise ValueError("Q must have one covariance per agent.")
+        self._Q = np.broadcast_to(Q, (self.n_agents,) + Q.shape[-2:])
+        self._cache.clear()
+
+    def evaluate(
+        self, x: VectorState, u: StampedValue, dt: float
+    ) -> VectorState:
+        x = x.copy()
+        K, d = self.n_agents, self.dim
+        pv = x.value.reshape((K, 2, d))
+        accel = np.asarray(u.value)
+        if accel.size != K * d:
+            raise ValueError(
+                f"Input must contain {K * d} values, one acceleration of "
+                f"dimension {d} per agent, got shape {accel.shape}."
+            )
+        accel = accel.reshape((K, d))
+
+        pv_new = np.empty((K, 2, d))
+        pv_new[:, 0] = pv[:, 0] + dt * pv[:, 1] + (0.5 * dt**2) * accel
+        pv_new[:, 1] = pv[:, 1] + dt * accel
+        x.value = pv_new.ravel()
+        return x
+
+    def jacobian(self, x, u, dt) -> np.ndarray:
+        return self.jacobian_blocks(x, u, dt).toarray()
+
+    def input_jacobian(self, dt) -> np.ndarray:
+        """
+        Discrete-time input Jacobian, with shape (2Kd, Kd).
+        """
+        return np.kron(
+            np.identity(self.n_agents), self._agent_model.input_jacobian(dt)
+        )
+
     def covariance(self, x, u, dt) -> np.ndarray:
+        return self.covariance_blocks(x, u, dt).toarray()
+
+    def jacobian_blocks(self, x, u, dt) -> BlockDiagonalMatrix:
         """
-        Discrete-time covariance on process model
+        Block-diagonal Jacobian, with the read-only Jacobian of a single
+        double integrator repeated on each diagonal block.
         """
+        A = self._cache.get("A", dt, lambda: self._agent_model._state_matrix(dt))
+        return BlockDiagonalMatrix([A] * self.n_agents)
 
-        L = self.input_jacobian(dt)
-        return L @ self._Q @ L.T
+    def covariance_blocks(self, x, u, dt) -> BlockDiagonalMatrix:
+        """
+        Block-diagonal covariance, with the read-only covariance of each
+        agent on the diagonal blocks.
+        """
+        return BlockDiagonalMatrix(list(self._agent_covariance(dt)))
+
+    def evaluate_with_jacobians(
+        self, x: VectorState, u: StampedValue, dt: float
+    ) -> Tuple[VectorState, BlockDiagonalMatrix, BlockDiagonalMatrix]:
+        """
+        Returns the propagated state with the Jacobian and covariance as
+        block-diagonal matrices, which the EKF applies block by block.
+        """
+        A = self.jacobian_blocks(x, u, dt)
+        Q = self.covariance_blocks(x, u, dt)
+        return self.evaluate(x, u, dt), A, Q
+
+    def predict_covariance(self, P: np.ndarray, dt: float) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{A} \mathbf{P} \mathbf{A}^T + \mathbf{Q}`
+        using only the structure of the Jacobian, with O((Kd)^2) operations
+        instead of the O((Kd)^3) of dense products.
+
+        Parameters
+        ----------
+        P : np.ndarray with shape (2Kd, 2Kd)
+            Covariance of the stacked state.
+        dt : float
+            Time interval.
+        """
+        K, d = self.n_agents, self.dim
+        n = 2 * d
+        P_new = np.array(P, dtype=np.float64).reshape((K, 2, d, K, 2, d))
+
+        # Each agent's position rows and columns gain dt times its velocity.
+        P_new[:, 0] += dt * P_new[:, 1]
+        P_new[:, :, :, :, 0] += dt * P_new[:, :, :, :, 1]
+
+        P_blocks = P_new.reshape((K, n, K, n))
+        idx = np.arange(K)
+        P_blocks[idx, :, idx, :] += self._agent_covariance(dt)
+        return P_new.reshape((K * n, K * n))
+
+    def _agent_covariance(self, dt) -> np.ndarray:
+        """Stack of the (2d, 2d) discrete-time covariances of the agents."""
+
+        def _covariance():
+            L = self._agent_model._input_matrix(dt)
+            return L @ self._Q @ L.T
+
+        return self._cache.get("Q_agents", dt, _covariance)
 
-    def input_jacobian(self, dt):
-        Ld = super().input_jacobian(dt)
-        L = np.zeros((3 * self.dim, 2 * self.dim))
-        L[0 : 2 * self.dim, 0 : self.dim] = Ld
-        L[2 * self.dim :, self.dim :] = dt * np.identity(self.dim)
-        return L
 
 class OneDimensionalPositionVelocityRange(MeasurementModel):
     """
@@ -362,12 +596,43 @@ class CompositeProcessModel(ProcessModel):
     # own process model from scratch.
 
     def __init__(self, model_list: List[ProcessModel]):
+        """
+        Parameters
+        ----------
+        model_list : List[ProcessModel]
+            Process model of each substate, in the order of the substates.
+
+        If the input is a `CompositeInput`, every substate is propagated with
+        its own input. Any other input is treated as an asynchronously-received
+        input for the single substate whose `state_id` matches `u.state_id`,
+        which is propagated while all other substates are left unchanged. The
+        Jacobian and covariance are then only nonzero (or non-identity) on
+        that substate's block, which the EKF exploits to only update the
+        corresponding rows and columns of the covariance.
+        """
         self._model_list = model_list
 
+    @staticmethod
+    def _is_partial(u: Input) -> bool:
+        if isinstance(u, CompositeInput):
+            return False
+        if not hasattr(u, "state_id"):
+            raise ValueError(
+                "The input to a CompositeProcessModel must be a CompositeInput,"
+                " or have a `state_id` matching the substate it propagates."
+                f" Got {type(u).__name__}."
+            )
+        return True
+
     def evaluate(
-        self, x: CompositeState, u: CompositeInput, dt: float
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
     ) -> CompositeState:
         x = x.copy()
+        if self._is_partial(u):
+            i = x.get_index_by_id(u.state_id)
+            x.value[i] = self._model_list[i].evaluate(x.value[i], u, dt)
+            return x
+
         for i, x_sub in enumerate(x.value):
             u_sub = u.input_list[i]
             x.value[i] = self._model_list[i].evaluate(x_sub, u_sub, dt)
@@ -375,24 +640,94 @@ class CompositeProcessModel(ProcessModel):
         return x
 
     def jacobian(
-        self, x: CompositeState, u: CompositeInput, dt: float
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
     ) -> np.ndarray:
+        return self.jacobian_blocks(x, u, dt).toarray()
+
+    def covariance(
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
+    ) -> np.ndarray:
+        return self.covariance_blocks(x, u, dt).toarray()
+
+    def jacobian_blocks(
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
+    ) -> Union[BlockDiagonalMatrix, BlockIdentityMatrix]:
+        """
+        Block-diagonal Jacobian, with one block per substate. For an input
+        targeting a single substate, the Jacobian is the identity outside of
+        that substate's block.
+        """
+        if self._is_partial(u):
+            i = x.get_index_by_id(u.state_id)
+            jac = self._model_list[i].jacobian(x.value[i], u, dt)
+            slc = x.get_slice_by_id(u.state_id)
+            return BlockIdentityMatrix([jac], [slc], x.dof)
+
         jac = []
         for i, x_sub in enumerate(x.value):
             u_sub = u.input_list[i]
             jac.append(self._model_list[i].jacobian(x_sub, u_sub, dt))
 
-        return block_diag(*jac)
+        return BlockDiagonalMatrix(jac)
+
+    def covariance_blocks(
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
+    ) -> BlockDiagonalMatrix:
+        """
+        Block-diagonal covariance, with one block per substate. For an input
+        targeting a single substate, the covariance is zero outside of that
+        substate's block.
+        """
+        if self._is_partial(u):
+            i = x.get_index_by_id(u.state_id)
+            cov = self._model_list[i].covariance(x.value[i], u, dt)
+            slc = x.get_slice_by_id(u.state_id)
+            return BlockDiagonalMatrix([cov], [slc], x.dof)
 
-    def covariance(
-        self, x: CompositeState, u: CompositeInput, dt: float
-    ) -> np.ndarray:
         cov = []
         for i, x_sub in enumerate(x.value):
             u_sub = u.input_list[i]
             cov.append(self._model_list[i].covariance(x_sub, u_sub, dt))
 
-        return block_diag(*cov)
+        return BlockDiagonalMatrix(cov)
+
+    def evaluate_with_jacobians(
+        self, x: CompositeState, u: Union[CompositeInput, Input], dt: float
+    ) -> Tuple[
+        CompositeState,
+        Union[BlockDiagonalMatrix, BlockIdentityMatrix],
+        BlockDiagonalMatrix,
+    ]:
+        """
+        Evaluates each substate's model once, returning the new state along
+        with the block-diagonal Jacobian and covariance, which the EKF
+        applies block by block.
+        """
+        x_new = x.copy()
+        if self._is_partial(u):
+            i = x.get_index_by_id(u.state_id)
+            x_sub_new, A_sub, Q_sub = self._model_list[
+                i
+            ].evaluate_with_jacobians(x.value[i], u, dt)
+            x_new.value[i] = x_sub_new
+            slc = x.get_slice_by_id(u.state_id)
+            return (
+                x_new,
+                BlockIdentityMatrix([A_sub], [slc], x.dof),
+                BlockDiagonalMatrix([Q_sub], [slc], x.dof),
+            )
+
+        jac = []
+        cov = []
+        for i, x_sub in enumerate(x.value):
+            x_sub_new, A_sub, Q_sub = self._model_list[
+                i
+            ].evaluate_with_jacobians(x_sub, u.input_list[i], dt)
+            x_new.value[i] = x_sub_new
+            jac.append(A_sub)
+            cov.append(Q_sub)
+
+        return x_new, BlockDiagonalMatrix(jac), BlockDiagonalMatrix(cov)
 
 
 class CompositeMeasurementModel(MeasurementModel):
@@ -409,12 +744,12 @@ class CompositeMeasurementModel(MeasurementModel):
         return self.model.evaluate(x.get_state_by_id(self.state_id))
 
     def jacobian(self, x: CompositeState) -> np.ndarray:
+        return self.jacobian_sparse(x).toarray()
+
+    def jacobian_sparse(self, x: CompositeState) -> BlockSparseJacobian:
         x_sub = x.get_state_by_id(self.state_id)
-        jac_sub = self.model.jacobian(x_sub)
-        jac = np.zeros((jac_sub.shape[0], x.dof))
-        slc = x.get_slice_by_id(self.state_id)
-        jac[:, slc] = jac_sub
-        return jac
+        jac_sub = np.atleast_2d(self.model.jacobian(x_sub))
+        return x.jacobian_from_blocks({self.state_id: jac_sub}, sparse=True)
 
     def covariance(self, x: CompositeState) -> np.ndarray:
         x_sub = x.get_state_by_id(self.state_id)
@@ -437,6 +772,12 @@ class RangePointToAnchor(MeasurementModel):
         y = np.linalg.norm(self._r_cw_a - r_zw_a)
         return y
 
+    def evaluate_batch(self, states: List[VectorState]) -> List[np.ndarray]:
+        if len(states) == 0:
+            return []
+        r_zw_a = np.array([x.value.ravel()[0 : self.dim] for x in states])
+        return list(np.linalg.norm(self._r_cw_a - r_zw_a, axis=1))
+
     def jacobian(self, x: VectorState) -> np.ndarray:
         r_zw_a = x.value.ravel()[0 : self.dim]
         r_zc_a: np.ndarray = r_zw_a - self._r_cw_a
@@ -466,6 +807,16 @@ class PointRelativePosition(MeasurementModel):
         r_pw_a = self._landmark_position.reshape((-1, 1))
         return C_ab.T @ (r_pw_a - r_zw_a)
 
+    def evaluate_batch(
+        self, states: List[MatrixLieGroupState]
+    ) -> List[np.ndarray]:
+        if len(states) == 0:
+            return []
+        C_ab = np.array([x.attitude for x in states])
+        r_zw_a = np.array([x.position.ravel() for x in states])
+        y = np.einsum("nji,nj->ni", C_ab, self._landmark_position - r_zw_a)
+        return list(y[:, :, None])
+
     def jacobian(self, x: MatrixLieGroupState) -> np.ndarray:
         r_zw_a = x.position.reshape((-1, 1))
         C_ab = x.attitude
@@ -570,6 +921,16 @@ class RangePoseToAnchor(MeasurementModel):
         r_tc_a: np.ndarray = r_tw_a - self._r_cw_a.reshape((-1, 1))
         return np.linalg.norm(r_tc_a)
 
+    def evaluate_batch(
+        self, states: List[MatrixLieGroupState]
+    ) -> List[np.ndarray]:
+        if len(states) == 0:
+            return []
+        C_ab = np.array([x.attitude for x in states])
+        r_zw_a = np.array([x.position.ravel() for x in states])
+        r_tc_a = C_ab @ self._r_tz_b + r_zw_a - self._r_cw_a
+        return list(np.linalg.norm(r_tc_a, axis=1))
+
     def jacobian(self, x: MatrixLieGroupState) -> np.ndarray:
         r_zw_a = x.position
         C_ab = x.attitude
@@ -628,6 +989,12 @@ class RangePoseToPose(MeasurementModel):
         return np.array(np.linalg.norm(r_t1t2_a.flatten()))
 
     def jacobian(self, x: CompositeState) -> np.ndarray:
+        return x.jacobian_from_blocks(self._jacobian_blocks(x))
+
+    def jacobian_sparse(self, x: CompositeState) -> BlockSparseJacobian:
+        return x.jacobian_from_blocks(self._jacobian_blocks(x), sparse=True)
+
+    def _jacobian_blocks(self, x: CompositeState) -> dict:
         x1: MatrixLieGroupState = x.get_state_by_id(self.state_id1)
         x2: MatrixLieGroupState = x.get_state_by_id(self.state_id2)
         r_1w_a = x1.position.reshape((-1, 1))
@@ -671,9 +1038,7 @@ class RangePoseToPose(MeasurementModel):
                 position=-rho.T @ np.identity(r_t2_2.size),
             )
 
-        return x.jacobian_from_blocks(
-            {self.state_id1: jac1, self.state_id2: jac2}
-        )
+        return {self.state_id1: jac1, self.state_id2: jac2}
 
     def covariance(self, x: CompositeState) -> np.ndarray:
         return self._R
@@ -11,6 +11,7 @@ from pynav.lib.imu import (
     G_matrix,
 )
 from pynav.lib.states import MatrixLieGroupState, VectorState
+from pynav.lib.models import _DtCache
 import numpy as np
 from pylie import SO3, SE3, SE2, SE23, MatrixLieGroup
 
@@ -65,6 +66,55 @@ class RelativeMotionIncrement(Input):
         """
         raise NotImplementedError()
 
+    def reset(self):
+        """
+        Resets the RMI in place to an identity increment with zero covariance,
+        reusing its allocated arrays.
+        """
+        raise NotImplementedError()
+
+
+class IncrementPool:
+    """
+    A pool of reusable RMIs of the same kind. RMIs are taken from the pool
+    with `acquire`, which resets them in place, and given back with `release`
+    once no longer needed. New RMIs are only created, from the template, when
+    the pool is empty.
+    """
+
+    def __init__(self, template: RelativeMotionIncrement, size: int = 0):
+        """
+        Parameters
+        ----------
+        template : RelativeMotionIncrement
+            RMI from which new RMIs are created with `template.new()`.
+        size : int, optional
+            Number of RMIs to preallocate, by default 0.
+        """
+        self.template = template
+        self._free: List[RelativeMotionIncrement] = [
+            template.new() for _ in range(size)
+        ]
+
+    def acquire(self) -> RelativeMotionIncrement:
+        """
+        Returns an identity RMI, reusing a released one if available.
+        """
+        if self._free:
+            rmi = self._free.pop()
+            rmi.reset()
+            return rmi
+        return self.template.new()
+
+    def release(self, rmi: RelativeMotionIncrement):
+        """
+        Returns an RMI to the pool. It must not be used afterwards.
+        """
+        self._free.append(rmi)
+
+    def __len__(self):
+        return len(self._free)
+
 
 class IMUIncrement(RelativeMotionIncrement):
     __slots__ = [
@@ -98,7 +148,6 @@ class IMUIncrement(RelativeMotionIncrement):
             measurements. If a 12 x 12 array is provided, this is the covariance
             of gyro, accel, gyro bias random walk, and accel bias random walk.
         """
-        # TODO: add tests for when (6,6) input covariance is given
         if gravity is None:
             gravity = np.array([0, 0, -9.80665])
 
@@ -107,7 +156,6 @@ class IMUIncrement(RelativeMotionIncrement):
             self._estimating_bias = True
             self.covariance = np.zeros((15, 15))
         elif input_covariance.shape[0] == 6:
-            super().__init__(dof=9)
             self.dof = 9
             self._estimating_bias = False
             self.covariance = np.zeros((9, 9))
@@ -135,13 +183,46 @@ class IMUIncrement(RelativeMotionIncrement):
 
     @property
     def value(self):
-        db = self.new_bias.reshape((-1, 1)) - self.original_bias.reshape(
-            (-1, 1)
-        )
-        return self.original_value @ SE23.Exp(self.bias_jacobian @ db)
+        return self.value_at_bias(self.new_bias)
+
+    def value_at_bias(self, bias: np.ndarray) -> np.ndarray:
+        """
+        Returns the RMI value corrected to first order for a bias, without
+        modifying the RMI.
+
+        Parameters
+        ----------
+        bias : np.ndarray with size 6
+            Bias stacked as [gyro_bias, accel_bias].
+        """
+        return self.original_value @ SE23.Exp(self.bias_update_vector(bias))
+
+    def bias_update_vector(self, bias: np.ndarray) -> np.ndarray:
+        """
+        Returns the correction :math:`\\mathbf{J}_b (\\mathbf{b} -
+        \\bar{\\mathbf{b}})` applied to the RMI for a given bias.
+        """
+        return self.bias_jacobian @ (np.ravel(bias) - self.original_bias)
+
+    def reset(self, new_bias: np.ndarray = None):
+        """
+        Resets the RMI in place to an identity increment, reusing its arrays.
+
+        Parameters
+        ----------
+        new_bias : np.ndarray with size 6, optional
+            New bias, stacked as [gyro_bias, accel_bias], about which the next
+            increments are computed. By default, the bias is unchanged.
+        """
+        self.original_value[...] = np.identity(5)
+        self.covariance[...] = 0.0
+        self.bias_jacobian[...] = 0.0
+        self.stamps = [None, None]
+        if new_bias is not None:
+            self.original_bias = np.array(new_bias, dtype=np.float64).ravel()
+        self.new_bias = self.original_bias
 
     def increment(self, u: IMU, dt: float):
-        u = u.copy()
         if self.stamps[0] is None:
             self.stamps[0] = u.stamp
             self.stamps[1] = u.stamp + dt
@@ -154,30 +235,141 @@ class IMUIncrement(RelativeMotionIncrement):
         U = U_matrix(unbiased_gyro, unbiased_accel, dt)
         self.original_value = self.original_value @ U
 
-        U_inv = inverse_IE3(U)
-        A = adjoint_IE3(U_inv)
+        A = adjoint_IE3(inverse_IE3(U))
         L = L_matrix(unbiased_gyro, unbiased_accel, dt)
         Q = self.input_covariance
 
-        A_full = np.zeros((15, 15))
-        A_full[0:9, 0:9] = A
-        A_full[0:9, 9:15] = -L
-        A_full[9:15, 9:15] = np.identity(6)
+        if self._estimating_bias:
+            A_full = np.zeros((15, 15))
+            A_full[0:9, 0:9] = A
+            A_full[0:9, 9:15] = -L
+            A_full[9:15, 9:15] = np.identity(6)
+
+            L_full = np.zeros((15, 12))
+            L_full[0:9, 0:6] = L
+            L_full[9:15, 6:12] = dt * np.identity(6)
+            self.covariance = (
+                A_full @ self.covariance @ A_full.T + L_full @ Q @ L_full.T
+            )
+        else:
+            # The biases are not part of the RMI state, so only the 9 x 9
+            # navigation block is propagated.
+            self.covariance = A @ self.covariance @ A.T + L @ Q @ L.T
 
-        L_full = np.zeros((15, 12))
-        L_full[0:9, 0:6] = L
-        L_full[9:15, 6:12] = dt * np.identity(6)
+        self.bias_jacobian = A @ self.bias_jacobian - L
+        self.symmetrize()
 
-        if not self._estimating_bias:
-            A_full = A_full[0:9, 9:9]
-            L_full = L_full[0:9, 0:6]
+    def preintegrate(
+        self,
+        gyro: np.ndarray,
+        accel: np.ndarray,
+        dt: np.ndarray,
+        stamp: float = None,
+        tree: bool = False,
+    ):
+        """
+        In-place preintegration of many IMU samples at once, equivalent to
+        calling `increment` once per sample but operating directly on arrays.
+        The U, L and adjoint matrices of all samples are computed with
+        batched kernels.
+
+        Parameters
+        ----------
+        gyro : np.ndarray with shape (N, 3)
+            Gyro measurements.
+        accel : np.ndarray with shape (N, 3)
+            Accelerometer measurements.
+        dt : np.ndarray with shape (N,) or float
+            Duration over which each sample is held.
+        stamp : float, optional
+            Timestamp of the first sample. Required if the RMI is empty.
+        tree : bool, optional
+            If True, the per-sample transitions are combined with a pairwise
+            tree reduction, which replaces the loop over samples by
+            O(log N) batched matrix products. By default False, for a
+            sequential loop.
+        """
+        gyro = np.asarray(gyro, dtype=np.float64).reshape((-1, 3))
+        accel = np.asarray(accel, dtype=np.float64).reshape((-1, 3))
+        N = gyro.shape[0]
+        dt = np.broadcast_to(np.asarray(dt, dtype=np.float64).ravel(), (N,))
+        if N == 0:
+            return
+
+        if self.stamps[0] is None:
+            if stamp is None:
+                raise ValueError("A stamp is required to start an empty RMI.")
+            self.stamps[0] = stamp
+            self.stamps[1] = stamp + np.sum(dt)
+        else:
+            self.stamps[1] += np.sum(dt)
+
+        unbiased_gyro = gyro - self.gyro_bias
+        unbiased_accel = accel - self.accel_bias
+        U = U_matrix(unbiased_gyro, unbiased_accel, dt)
+        A = adjoint_IE3(inverse_IE3(U))
+        L = L_matrix(unbiased_gyro, unbiased_accel, dt)
+
+        if self._estimating_bias or tree:
+            F, G = self._batch_transitions(A, L, dt)
+            P = np.zeros((15, 15))
+            P[0 : self.dof, 0 : self.dof] = self.covariance
+
+        if tree:
+            U_total, F_total, G_total = _tree_reduce_increments(U, F, G)
+            self.original_value = self.original_value @ U_total
+            P = F_total @ P @ F_total.T + G_total
+
+            # The bias jacobian obeys the same recursion as the top-right block
+            # of the transition matrix, J <- A J - L.
+            self.bias_jacobian = (
+                F_total[0:9, 0:9] @ self.bias_jacobian + F_total[0:9, 9:15]
+            )
+            self.covariance = P[0 : self.dof, 0 : self.dof]
+        else:
+            X = self.original_value
+            J = self.bias_jacobian
+            if self._estimating_bias:
+                for k in range(N):
+                    X = X @ U[k]
+                    P = F[k] @ P @ F[k].T + G[k]
+                    J = A[k] @ J - L[k]
+            else:
+                P = self.covariance
+                LQLT = L @ self.input_covariance @ np.swapaxes(L, 1, 2)
+                for k in range(N):
+                    X = X @ U[k]
+                    P = A[k] @ P @ A[k].T + LQLT[k]
+                    J = A[k] @ J - L[k]
+            self.original_value = X
+            self.bias_jacobian = J
+            self.covariance = P
 
-        self.covariance = (
-            A_full @ self.covariance @ A_full.T + L_full @ Q @ L_full.T
-        )
-        self.bias_jacobian = A @ self.bias_jacobian - L
         self.symmetrize()
 
+    def _batch_transitions(
+        self, A: np.ndarray, L: np.ndarray, dt: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stacked transition matrices of the 15-dimensional [nav state, bias]
+        error and the process noise covariance it receives at each sample.
+        Without bias estimation, the bias random walk noise is zero.
+        """
+        N = A.shape[0]
+        F = np.zeros((N, 15, 15))
+        F[:, 0:9, 0:9] = A
+        F[:, 0:9, 9:15] = -L
+        F[:, [9, 10, 11, 12, 13, 14], [9, 10, 11, 12, 13, 14]] = 1.0
+        G = np.zeros((N, 15, 15))
+        Q = self.input_covariance
+        G[:, 0:9, 0:9] = L @ Q[0:6, 0:6] @ np.swapaxes(L, 1, 2)
+        if self._estimating_bias:
+            LQ = L @ Q[0:6, 6:12]
+            G[:, 0:9, 9:15] = LQ * dt[:, None, None]
+            G[:, 9:15, 0:9] = np.swapaxes(G[:, 0:9, 9:15], 1, 2)
+            G[:, 9:15, 9:15] = Q[6:12, 6:12] * (dt**2)[:, None, None]
+        return F, G
+
     def update_bias(self, new_bias: np.ndarray):
         """
         Updates the RMI given new bias values
@@ -221,17 +413,19 @@ class IMUIncrement(RelativeMotionIncrement):
         IMUIncrement
             A copy of the RMI
         """
-        new = IMUIncrement(
-            self.input_covariance,
-            self.gyro_bias,
-            self.accel_bias,
-            self.state_id,
-            self.gravity,
-        )
+        # Bypass __init__ to avoid allocating arrays that are overwritten.
+        new = IMUIncrement.__new__(IMUIncrement)
+        new.dof = self.dof
+        new._estimating_bias = self._estimating_bias
         new.original_value = self.original_value.copy()
+        new.original_bias = self.original_bias
+        new.new_bias = self.new_bias
+        new.stamps = self.stamps.copy()
         new.covariance = self.covariance.copy()
+        new.input_covariance = self.input_covariance
         new.bias_jacobian = self.bias_jacobian.copy()
-        new.stamps = self.stamps.copy()
+        new.gravity = self.gravity
+        new.state_id = self.state_id
         return new
 
     def new(
@@ -252,29 +446,118 @@ class IMUIncrement(RelativeMotionIncrement):
         IMUIncrement
             A copy of the RMI with reinitialized values
         """
-        gyro_bias = self.gyro_bias
-        accel_bias = self.accel_bias
+        new_gyro_bias = self.gyro_bias
+        new_accel_bias = self.accel_bias
 
         if new_bias is not None:
-            gyro_bias = new_bias[:3]
-            accel_bias = new_bias[3:]
+            new_gyro_bias = new_bias[:3]
+            new_accel_bias = new_bias[3:]
 
         if gyro_bias is not None:
-            gyro_bias = self.gyro_bias
+            new_gyro_bias = gyro_bias
 
         if accel_bias is not None:
-            accel_bias = self.accel_bias
+            new_accel_bias = accel_bias
 
         new = IMUIncrement(
             self.input_covariance,
-            gyro_bias,
-            accel_bias,
+            new_gyro_bias,
+            new_accel_bias,
             self.state_id,
             self.gravity,
         )
         return new
 
 
+def _tree_reduce_increments(
+    U: np.ndarray, F: np.ndarray, G: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Combines per-sample increments `U_k`, error transitions `F_k` and noise
+    covariances `G_k`, each stacked along the first axis, into the increment,
+    transition and noise of the whole interval. An earlier element `a`
+    followed by `b` combines to
+
+        U = U_a U_b,  F = F_b F_a,  G = F_b G_a F_b^T + G_b,
+
+    which is associative, so adjacent pairs are combined level by level.
+    """
+    while U.shape[0] > 1:
+        n_pairs = U.shape[0] // 2
+        a = slice(0, 2 * n_pairs, 2)
+        b = slice(1, 2 * n_pairs, 2)
+        F_b = F[b]
+        U_new = U[a] @ U[b]
+        F_new = F_b @ F[a]
+        G_new = F_b @ G[a] @ np.swapaxes(F_b, 1, 2) + G[b]
+        if U.shape[0] % 2 == 1:
+            U_new = np.concatenate([U_new, U[-1:]])
+            F_new = np.concatenate([F_new, F[-1:]])
+            G_new = np.concatenate([G_new, G[-1:]])
+        U, F, G = U_new, F_new, G_new
+
+    return U[0], F[0], G[0]
+
+
+def preintegrate_between_stamps(
+    input_data: List[Input],
+    stamps: List[float],
+    rmi: RelativeMotionIncrement,
+) -> List[RelativeMotionIncrement]:
+    """
+    Preintegrates a time-sorted input sequence into one RMI per interval
+    between consecutive `stamps`. Each input is held constant until the stamp
+    of the next input, and is split at the interval boundaries. The first
+    input is also used before its own stamp, if required.
+
+    Parameters
+    ----------
+    input_data : List[Input]
+        Inputs, sorted by stamp.
+    stamps : List[float]
+        Sorted stamps of the states to connect, for example keyframes.
+    rmi : RelativeMotionIncrement
+        Template RMI, from which a fresh RMI is created for each interval with
+        `rmi.new()`.
+
+    Returns
+    -------
+    List[RelativeMotionIncrement]
+        `len(stamps) - 1` RMIs, the RMI at index i spanning
+        `[stamps[i], stamps[i + 1]]`.
+    """
+    input_stamps = np.array([u.stamp for u in input_data])
+    rmi_list = []
+    for i in range(len(stamps) - 1):
+        t_start = stamps[i]
+        t_end = stamps[i + 1]
+
+        # Inputs held during this interval, and their boundaries.
+        first = max(np.searchsorted(input_stamps, t_start, side="right") - 1, 0)
+        last = max(np.searchsorted(input_stamps, t_end, side="left"), first + 1)
+        bounds = np.clip(input_stamps[first : last + 1], t_start, t_end)
+        bounds[0] = t_start
+        if bounds.size == last - first:
+            bounds = np.append(bounds, t_end)
+        bounds[-1] = t_end
+        dt = np.diff(bounds)
+
+        new_rmi = rmi.new()
+        new_rmi.stamps = [t_start, t_start]
+        if isinstance(new_rmi, IMUIncrement):
+            new_rmi.preintegrate(
+                [u.gyro for u in input_data[first:last]],
+                [u.accel for u in input_data[first:last]],
+                dt,
+            )
+        else:
+            for u, dt_k in zip(input_data[first:last], dt):
+                new_rmi.increment(u, dt_k)
+        rmi_list.append(new_rmi)
+
+    return rmi_list
+
+
 class PreintegratedIMUKinematics(ProcessModel):
     def __init__(self, gravity=None):
         if gravity is None:
@@ -283,25 +566,43 @@ class PreintegratedIMUKinematics(ProcessModel):
 
     def evaluate(self, x: IMUState, rmi: IMUIncrement, dt=None) -> IMUState:
         x = x.copy()
-        rmi = rmi.copy()
-
-        rmi.update_bias(x.bias)
         dt = rmi.stamps[1] - rmi.stamps[0]
         DG = G_matrix(self.gravity, dt)
-        DU = rmi.value
+        DU = rmi.value_at_bias(x.bias)
         x.pose = DG @ x.pose @ DU
         return x
 
     def jacobian(self, x: IMUState, rmi: IMUIncrement, dt=None) -> np.ndarray:
+        DG, DU, db = self._bias_corrected_rmi(x, rmi)
+        return self._jacobian(x, rmi, DG, DU, db)
+
+    def covariance(self, x: IMUState, rmi: IMUIncrement, dt=None) -> np.ndarray:
+        DG, DU, db = self._bias_corrected_rmi(x, rmi)
+        return self._covariance(x, rmi, DG, DU, db)
+
+    def evaluate_with_jacobians(
+        self, x: IMUState, rmi: IMUIncrement, dt=None
+    ) -> Tuple[IMUState, np.ndarray, np.ndarray]:
+        DG, DU, db = self._bias_corrected_rmi(x, rmi)
+        A = self._jacobian(x, rmi, DG, DU, db)
+        Q = self._covariance(x, rmi, DG, DU, db)
         x = x.copy()
-        rmi = rmi.copy()
-        rmi.update_bias(x.bias)
+        x.pose = DG @ x.pose @ DU
+        return x, A, Q
+
+    def _bias_corrected_rmi(self, x: IMUState, rmi: IMUIncrement):
+        """
+        Gravity increment, RMI corrected for the bias of `x`, and the bias
+        correction vector. The RMI itself is not modified.
+        """
         dt = rmi.stamps[1] - rmi.stamps[0]
         DG = G_matrix(self.gravity, dt)
-        DU = rmi.value
-        J = SE23.right_jacobian(
-            rmi.bias_jacobian @ (x.bias - rmi.original_bias)
-        )
+        db = rmi.bias_update_vector(x.bias)
+        DU = rmi.original_value @ SE23.Exp(db)
+        return DG, DU, db
+
+    def _jacobian(self, x, rmi, DG, DU, db) -> np.ndarray:
+        J = SE23.right_jacobian(db)
         A = np.identity(15)
         if x.direction == "right":
             A[0:9, 0:9] = adjoint_IE3(inverse_IE3(DU))
@@ -312,22 +613,14 @@ class PreintegratedIMUKinematics(ProcessModel):
             A[0:9, 9:15] = Ad @ J @ rmi.bias_jacobian
         return A
 
-    def covariance(self, x: IMUState, rmi: IMUIncrement, dt=None) -> np.ndarray:
-        x = x.copy()
-        rmi = rmi.copy()
-        rmi.update_bias(x.bias)
-        dt = rmi.stamps[1] - rmi.stamps[0]
-        DG = G_matrix(self.gravity, dt)
-        DU = rmi.value
-        update_bias_vec = rmi.bias_jacobian @ (x.bias - rmi.original_bias)
-
+    def _covariance(self, x, rmi, DG, DU, db) -> np.ndarray:
+        # Without bias estimation in the RMI, the bias rows receive no noise.
+        L = np.identity(15)[:, 0 : rmi.dof]
         if x.direction == "right":
-            L = np.identity(15)
-            L[0:9, 0:9] = SE23.adjoint(SE23.Exp(-update_bias_vec))
+            L[0:9, 0:9] = SE23.adjoint(SE23.Exp(-db))
         elif x.direction == "left":
             Ad = SE23.adjoint(DG @ x.pose @ DU)
-            L = np.identity(15)
-            L[0:9, 0:9] = Ad @ SE23.adjoint(SE23.Exp(-update_bias_vec))
+            L[0:9, 0:9] = Ad @ SE23.adjoint(SE23.Exp(-db))
         return L @ rmi.covariance @ L.T
 
 
@@ -356,8 +649,11 @@ class BodyVelocityIncrement(RelativeMotionIncrement):
         bias: np.ndarray = None,
         state_id=None,
     ):
+        if bias is None:
+            bias = np.zeros((group.dof))
+
         self.dof = group.dof
-        self.bias = bias
+        self.bias = np.array(bias).ravel()
         self.group = group
         self.covariance = np.zeros((group.dof, group.dof))
         self.input_covariance = Q
@@ -365,12 +661,7 @@ class BodyVelocityIncrement(RelativeMotionIncrement):
         self.bias_jacobian = np.zeros((group.dof, group.dof))
         self.stamps = [None, None]
         self.state_id = state_id
-
-        bias = np.array(bias).ravel()
-        if bias is None:
-            self.bias = np.zeros((group.dof))
-
-        self.new_bias = bias
+        self.new_bias = self.bias
 
     def increment(self, u: StampedValue, dt):
         """
@@ -422,10 +713,39 @@ class BodyVelocityIncrement(RelativeMotionIncrement):
         numpy.ndarray
             The RMI matrix :math:`\Delta \mathbf{U}_{ij}`.
         """
-        db = self.new_bias - self.bias
+        return self.value_at_bias(self.new_bias)
 
+    def value_at_bias(self, bias: np.ndarray) -> np.ndarray:
+        """
+        Returns the RMI value corrected to first order for a bias, without
+        modifying the RMI.
+
+        Parameters
+        ----------
+        bias : np.ndarray
+            Bias value.
+        """
+        db = np.ravel(bias) - self.bias
         return self.original_value @ self.group.Exp(self.bias_jacobian @ db)
 
+    def reset(self, new_bias: np.ndarray = None):
+        """
+        Resets the RMI in place to an identity increment, reusing its arrays.
+
+        Parameters
+        ----------
+        new_bias : np.ndarray, optional
+            New bias about which the next increments are computed. By default,
+            the bias is unchanged.
+        """
+        self.original_value[...] = self.group.identity()
+        self.covariance[...] = 0.0
+        self.bias_jacobian[...] = 0.0
+        self.stamps = [None, None]
+        if new_bias is not None:
+            self.bias = np.array(new_bias).ravel()
+        self.new_bias = self.bias
+
     def plus(self, w: np.ndarray):
         """
         Adds noise to the RMI
@@ -637,6 +957,7 @@ class LinearIncrement(RelativeMotionIncrement):
         dof: int,
         bias: np.ndarray = None,
         state_id: Any = None,
+        constant_matrices: bool = False,
     ):
         """
 
@@ -659,12 +980,22 @@ class LinearIncrement(RelativeMotionIncrement):
             be augmented to include a bias state.
         state_id : Any, optional
             Optional container for other identifying information, by default None.
+        constant_matrices : bool, optional
+            Whether the state and input matrices depend only on `dt`, and not
+            on the input value, as for the double integrator. If True, they are
+            evaluated once per distinct `dt` and cached, and `preintegrate`
+            reuses powers of the transition matrix. By default False.
         """
         self.dof = dof
         self._input_covariance = input_covariance
         self._state_matrix = state_matrix
         self._input_matrix = input_matrix
         self.state_id = state_id
+        self.constant_matrices = constant_matrices
+
+        # Bounded cache of the matrices and transition matrix powers per dt,
+        # shared with RMIs created by `new`.
+        self._matrix_cache = _DtCache(maxsize=32, readonly=False)
 
         #:numpy.ndarray: The RMI value before a new bias correction.
         self.original_value = [
@@ -704,9 +1035,131 @@ class LinearIncrement(RelativeMotionIncrement):
             u.value = u.value.ravel() - self.original_bias.ravel()
 
         # Get the state and input matrices, increment the RMI value
+        A, B, A_full, B_full = self._get_matrices(u, dt)
+        if (
+            self.original_bias is not None
+            and u.value.size == 2 * self.original_bias.size
+        ):
+            u.value = u.value[: self.original_bias.size]
+
+        self.original_value[0] = A @ self.original_value[0]
+        self.original_value[1] = A @ self.original_value[1].reshape(
+            (-1, 1)
+        ) + B @ u.value.reshape((-1, 1))
+
+        self.covariance = (
+            A_full @ self.covariance @ A_full.T
+            + B_full @ self._input_covariance @ B_full.T
+        )
+
+        if self.bias_jacobian is None:
+            self.bias_jacobian = np.zeros((self.dof, u.dof))
+
+        self.bias_jacobian = A @ self.bias_jacobian - B
+
+    def preintegrate(
+        self, values: np.ndarray, dt: np.ndarray, stamp: float = None
+    ):
+        """
+        In-place preintegration of many inputs at once, equivalent to calling
+        `increment` once per input.
+
+        The transition from sample k to the end of the interval is the product
+        :math:`\\mathbf{S}_{k} = \\mathbf{A}_{N-1} \\cdots \\mathbf{A}_{k+1}`
+        of the (bias-augmented) state matrices, so that
+
+        .. math::
+            \\Delta \\mathbf{u}_{ij} = \\sum_k \\mathbf{S}_k \\mathbf{B}_k
+            \\mathbf{u}_k, \\quad \\mathbf{Q}_{ij} = \\sum_k \\mathbf{S}_k
+            \\mathbf{B}_k \\mathbf{Q} \\mathbf{B}_k^T \\mathbf{S}_k^T,
+
+        which are evaluated with stacked array operations. With
+        `constant_matrices` and a single `dt`, the products are powers of one
+        matrix, computed by repeated squaring.
+
+        Parameters
+        ----------
+        values : np.ndarray with shape (N, m)
+            Input values, one row per sample.
+        dt : np.ndarray with shape (N,) or float
+            Duration over which each input is held.
+        stamp : float, optional
+            Timestamp of the first input. Required if the RMI is empty.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        N = values.shape[0]
+        values = values.reshape((N, -1))
+        dt = np.broadcast_to(np.asarray(dt, dtype=np.float64).ravel(), (N,))
+        if N == 0:
+            return
+
+        if self.stamps[0] is None:
+            if stamp is None:
+                raise ValueError("A stamp is required to start an empty RMI.")
+            self.stamps[0] = stamp
+            self.stamps[1] = stamp + np.sum(dt)
+        else:
+            self.stamps[1] += np.sum(dt)
+
+        if self.original_bias is not None:
+            values = values - self.original_bias.ravel()
+            if values.shape[1] == 2 * self.original_bias.size:
+                values = values[:, : self.original_bias.size]
+
+        dof = self.dof
+        Q = self._input_covariance
+        if self.constant_matrices and np.all(dt == dt[0]):
+            u = StampedValue(values[0], self.stamps[0])
+            A, B, A_full, B_full = self._get_matrices(u, dt[0])
+            S = self._matrix_powers(A_full, N, dt[0])[::-1]
+            A_total = S[0] @ A_full
+            S_B = S[:, :dof, :dof] @ B
+            G = B_full @ Q @ B_full.T
+            noise = S @ G @ np.swapaxes(S, 1, 2)
+        else:
+            matrices = [
+                self._get_matrices(StampedValue(values[k], None), dt[k])
+                for k in range(N)
+            ]
+            A_full = np.array([m[2] for m in matrices])
+            B = np.array([m[1] for m in matrices])
+            B_full = np.array([m[3] for m in matrices])
+
+            # Suffix products S_k = A_{N-1} ... A_{k+1}
+            S = np.empty_like(A_full)
+            S[-1] = np.identity(A_full.shape[1])
+            for k in range(N - 2, -1, -1):
+                S[k] = S[k + 1] @ A_full[k + 1]
+            A_total = S[0] @ A_full[0]
+            S_B = S[:, :dof, :dof] @ B
+            G = B_full @ Q @ np.swapaxes(B_full, 1, 2)
+            noise = S @ G @ np.swapaxes(S, 1, 2)
+
+        A_ij = A_total[:dof, :dof]
+        self.original_value[0] = A_ij @ self.original_value[0]
+        self.original_value[1] = A_ij @ self.original_value[1].reshape(
+            (-1, 1)
+        ) + np.einsum("kij,kj->i", S_B, values).reshape((-1, 1))
+        self.covariance = (
+            A_total @ self.covariance @ A_total.T + np.sum(noise, axis=0)
+        )
+
+        if self.bias_jacobian is None:
+            self.bias_jacobian = np.zeros((dof, values.shape[1]))
+        self.bias_jacobian = A_ij @ self.bias_jacobian - np.sum(S_B, axis=0)
+        self.symmetrize()
+
+    def _get_matrices(self, u: StampedValue, dt: float):
+        """
+        State and input matrices, along with their bias-augmented versions.
+        """
+        if self.constant_matrices:
+            matrices = self._matrix_cache.lookup("matrices", dt)
+            if matrices is not None:
+                return matrices
+
         A = self._state_matrix(u, dt)
         B = self._input_matrix(u, dt)
-
         if self.original_bias is not None:
             bias = self.original_bias
             A_full = np.zeros((self.dof + bias.size, self.dof + bias.size))
@@ -717,26 +1170,28 @@ class LinearIncrement(RelativeMotionIncrement):
             B_full = np.zeros((self.dof + bias.size, 2 * bias.size))
             B_full[: self.dof, : bias.size] = B
             B_full[self.dof :, bias.size :] = dt * np.identity(bias.size)
-            if u.value.size == 2 * bias.size:
-                u.value = u.value[: bias.size]
         else:
             A_full = A
             B_full = B
 
-        self.original_value[0] = A @ self.original_value[0]
-        self.original_value[1] = A @ self.original_value[1].reshape(
-            (-1, 1)
-        ) + B @ u.value.reshape((-1, 1))
+        matrices = (A, B, A_full, B_full)
+        if self.constant_matrices:
+            self._matrix_cache.store("matrices", dt, matrices)
+        return matrices
 
-        self.covariance = (
-            A_full @ self.covariance @ A_full.T
-            + B_full @ self._input_covariance @ B_full.T
-        )
-
-        if self.bias_jacobian is None:
-            self.bias_jacobian = np.zeros((self.dof, u.dof))
-
-        self.bias_jacobian = A @ self.bias_jacobian - B
+    def _matrix_powers(self, A: np.ndarray, N: int, dt: float) -> np.ndarray:
+        """
+        Stack of the powers A^0, ..., A^(N-1), extended by repeated squaring
+        and cached along with the matrices of the corresponding `dt`.
+        """
+        powers = self._matrix_cache.lookup("powers", dt)
+        if powers is None:
+            powers = np.identity(A.shape[0])[None, :, :]
+        while powers.shape[0] < N:
+            A_n = powers[-1] @ A
+            powers = np.concatenate([powers, powers @ A_n])
+        self._matrix_cache.store("powers", dt, powers)
+        return powers[:N]
 
     def update_bias(self, new_bias):
         """
@@ -762,13 +1217,45 @@ class LinearIncrement(RelativeMotionIncrement):
         if self.original_bias is None or self.new_bias is None:
             return self.original_value
         else:
-            delta_bias = (self.new_bias - self.original_bias).reshape((-1, 1))
-            out = self.original_value
-            out[1] = (
-                self.original_value[1].reshape((-1, 1))
-                + self.bias_jacobian @ delta_bias
-            )
-            return out
+            return self.value_at_bias(self.new_bias)
+
+    def value_at_bias(self, bias: np.ndarray) -> List[np.ndarray]:
+        """
+        Returns the RMI value corrected to first order for a bias, without
+        modifying the RMI.
+
+        Parameters
+        ----------
+        bias : np.ndarray
+            Bias value.
+        """
+        delta_bias = (np.ravel(bias) - self.original_bias).reshape((-1, 1))
+        return [
+            self.original_value[0],
+            self.original_value[1].reshape((-1, 1))
+            + self.bias_jacobian @ delta_bias,
+        ]
+
+    def reset(self, new_bias: np.ndarray = None):
+        """
+        Resets the RMI in place to an identity increment, reusing its arrays.
+
+        Parameters
+        ----------
+        new_bias : np.ndarray, optional
+            New bias about which the next increments are computed. Only
+            applicable if the RMI was created with a bias. By default, the
+            bias is unchanged.
+        """
+        self.original_value[0][...] = np.identity(self.dof)
+        self.original_value[1] = np.zeros((self.dof, 1))
+        self.covariance[...] = 0.0
+        if self.bias_jacobian is not None:
+            self.bias_jacobian[...] = 0.0
+        self.stamps = [None, None]
+        if new_bias is not None:
+            self.original_bias = np.array(new_bias).ravel()
+        self.new_bias = self.original_bias
 
     def plus(self, w: np.ndarray) -> "LinearIncrement":
         """
@@ -823,7 +1310,10 @@ class LinearIncrement(RelativeMotionIncrement):
             self.dof,
             new_bias,
             self.state_id,
+            self.constant_matrices,
         )
+        if (new_bias is None) == (self.original_bias is None):
+            new._matrix_cache = self._matrix_cache
         return new
 
 
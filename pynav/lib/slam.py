@@ -0,0 +1,221 @@
+"""
+Utilities for filtering-based SLAM, where substates such as landmarks are
+regularly added to and removed from the estimated state.
+"""
+
+import numpy as np
+from typing import Any, List, Union
+from pynav.types import State, StateWithCovariance, BlockSparseJacobian
+from pynav.lib.states import CompositeState
+
+
+class SLAMStateWithCovariance(StateWithCovariance):
+    """
+    A `StateWithCovariance` for a `CompositeState` that grows and shrinks.
+
+    The covariance is stored in the top-left corner of a larger buffer whose
+    capacity doubles whenever it is exceeded, so that adding a substate only
+    writes the new rows and columns instead of rebuilding the full matrix.
+    Substates can be marginalized out by moving rows and columns within the
+    buffer.
+
+    The `covariance` attribute is a view into the buffer. It is therefore
+    only valid until the next addition or removal of a substate, and
+    substates must be added and removed through this object rather than
+    through the `CompositeState` directly.
+    """
+
+    __slots__ = ["_buffer"]
+
+    def __init__(
+        self,
+        state: CompositeState,
+        covariance: np.ndarray,
+        capacity: int = None,
+    ):
+        """
+        Parameters
+        ----------
+        state : CompositeState
+            Initial state.
+        covariance : np.ndarray
+            Initial covariance, with size matching `state.dof`.
+        capacity : int, optional
+            Initial size of the covariance buffer, by default the size of
+            the initial covariance.
+        """
+        n = covariance.shape[0]
+        if capacity is None or capacity < n:
+            capacity = n
+        self._buffer = np.empty((capacity, capacity))
+        super(SLAMStateWithCovariance, self).__init__(state, covariance)
+
+    @property
+    def covariance(self) -> np.ndarray:
+        n = self.state.dof
+        return self._buffer[:n, :n]
+
+    @covariance.setter
+    def covariance(self, covariance: np.ndarray):
+        n = covariance.shape[0]
+        if self._is_own_view(covariance):
+            # Already updated in place, e.g. by an in-place EKF predict.
+            return
+        self._reserve(n)
+        self._buffer[:n, :n] = covariance
+
+    def _is_own_view(self, covariance: np.ndarray) -> bool:
+        return (
+            covariance.base is self._buffer
+            and covariance.ctypes.data == self._buffer.ctypes.data
+            and covariance.strides == self._buffer.strides
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows currently allocated for the covariance."""
+        return self._buffer.shape[0]
+
+    def _reserve(self, size: int):
+        """Grows the buffer geometrically until it can hold `size` rows."""
+        capacity = self._buffer.shape[0]
+        if size <= capacity:
+            return
+
+        new_capacity = max(size, 2 * capacity)
+        n = self.state.dof
+        buffer = np.empty((new_capacity, new_capacity))
+        buffer[:n, :n] = self._buffer[:n, :n]
+        self._buffer = buffer
+
+    def add_state(
+        self,
+        state: State,
+        covariance: np.ndarray,
+        cross_covariance: np.ndarray = None,
+    ):
+        """
+        Appends a substate to the composite state.
+
+        Parameters
+        ----------
+        state : State
+            New substate, with a unique `state_id`.
+        covariance : np.ndarray with shape (k, k)
+            Marginal covariance of the new substate.
+        cross_covariance : np.ndarray with shape (k, n), optional
+            Covariance between the new substate and the existing state, by
+            default zero.
+        """
+        n = self.state.dof
+        k = state.dof
+        self._reserve(n + k)
+
+        B = self._buffer
+        B[n : n + k, n : n + k] = covariance
+        if cross_covariance is None:
+            B[n : n + k, :n] = 0.0
+            B[:n, n : n + k] = 0.0
+        else:
+            B[n : n + k, :n] = cross_covariance
+            B[:n, n : n + k] = np.transpose(cross_covariance)
+
+        self.state.add_state(state)
+
+    def augment(
+        self,
+        state: State,
+        jacobian: Union[np.ndarray, BlockSparseJacobian],
+        covariance: np.ndarray = None,
+    ):
+        """
+        Appends a substate initialized as a function of the existing state,
+        for example a landmark initialized from a measurement and the current
+        pose estimate. If the new substate is :math:`\\mathbf{l} =
+        \\mathbf{h}(\\mathbf{x}, \\mathbf{y})`, its covariance blocks are
+
+        .. math::
+            \\mathbf{P}_{ll} = \\mathbf{H}_x \\mathbf{P} \\mathbf{H}_x^T
+            + \\mathbf{H}_y \\mathbf{R} \\mathbf{H}_y^T, \\quad
+            \\mathbf{P}_{lx} = \\mathbf{H}_x \\mathbf{P}.
+
+        Parameters
+        ----------
+        state : State
+            New substate.
+        jacobian : np.ndarray or BlockSparseJacobian with shape (k, n)
+            Jacobian :math:`\\mathbf{H}_x` of the new substate with respect to
+            the existing state. A `BlockSparseJacobian` only touches the
+            columns of the involved substates.
+        covariance : np.ndarray with shape (k, k), optional
+            Additional covariance :math:`\\mathbf{H}_y \\mathbf{R}
+            \\mathbf{H}_y^T`, by default zero.
+        """
+        P = self.covariance
+        if isinstance(jacobian, BlockSparseJacobian):
+            PHT = jacobian.rmatmul_transpose(P)
+        else:
+            PHT = P @ np.transpose(jacobian)
+
+        P_ll = jacobian @ PHT
+        if covariance is not None:
+            P_ll = P_ll + covariance
+
+        self.add_state(state, P_ll, PHT.T)
+
+    def marginalize_state(self, state_id: Any, preserve_order: bool = False):
+        """
+        Removes a substate and its rows and columns of the covariance.
+
+        If `preserve_order` is False and the last substate has the same DOF as
+        the removed one, the last substate is moved into the vacated position,
+        which copies O(k n) covariance entries. Otherwise, all subsequent rows
+        and columns are shifted, which copies O(n^2) entries.
+
+        Parameters
+        ----------
+        state_id : Any
+            ID of the substate to remove.
+        preserve_order : bool, optional
+            Whether the order of the remaining substates must be kept, by
+            default False.
+        """
+        x = self.state
+        n = x.dof
+        idx = x.get_index_by_id(state_id)
+        slc = x.get_slice_by_id(state_id)
+        k = slc.stop - slc.start
+        B = self._buffer
+
+        if slc.stop == n:
+            x.remove_state_by_id(state_id)
+        elif not preserve_order and x.value[-1].dof == k:
+            # Move the last substate into the vacated slot. The row copy must
+            # come first so that the column copy also moves the diagonal block.
+            B[slc, :n] = B[n - k : n, :n]
+            B[:n, slc] = B[:n, n - k : n]
+            x.value[idx] = x.value.pop()
+            x.invalidate_cache()
+        else:
+            B[slc.start : n - k, :n] = B[slc.stop : n, :n]
+            B[: n - k, slc.start : n - k] = B[: n - k, slc.stop : n]
+            x.remove_state_by_id(state_id)
+
+    def marginalize_states(
+        self, state_ids: List[Any], preserve_order: bool = False
+    ):
+        """
+        Removes several substates. See `marginalize_state`.
+        """
+        for state_id in state_ids:
+            self.marginalize_state(state_id, preserve_order)
+
+    def copy(self) -> "SLAMStateWithCovariance":
+        return SLAMStateWithCovariance(
+            self.state.copy(), self.covariance, self.capacity
+        )
+
+    def __repr__(self):
+        return (
+            f"SLAMStateWithCovariance(stamp={self.stamp}, dof={self.state.dof})"
+        )
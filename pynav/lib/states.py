@@ -1,8 +1,11 @@
 from pylie import SO2, SO3, SE2, SE3, SE23, SL3
 from pylie.numpy.base import MatrixLieGroup
 import numpy as np
-from ..types import State
-from typing import Any, List
+from ..types import State, BlockSparseJacobian
+from . import lie_kernels
+from .lie_kernels import FastSO3, FastSE3, FastSE23
+from typing import Any, Callable, Iterator, List
+from contextlib import contextmanager
 
 try:
     # We do not want to make ROS a hard dependency, so we import it only if
@@ -39,6 +42,29 @@ class VectorState(State):
         og_shape = self.value.shape
         return (self.value.ravel() - x.value.ravel()).reshape(og_shape)
 
+    @staticmethod
+    def plus_batch(
+        values: np.ndarray, dx: np.ndarray, direction: str = None
+    ) -> np.ndarray:
+        """
+        Batched `plus` of stacked values and increments with shape (N, dof).
+        `direction` is ignored.
+        """
+        return np.reshape(values, (len(values), -1)) + np.reshape(
+            dx, (len(dx), -1)
+        )
+
+    @staticmethod
+    def minus_batch(
+        values: np.ndarray, values_other: np.ndarray, direction: str = None
+    ) -> np.ndarray:
+        """
+        Batched `minus` of stacked values with shape (N, dof), returning an
+        array with shape (N, dof). `direction` is ignored.
+        """
+        N = len(values)
+        return np.reshape(values, (N, -1)) - np.reshape(values_other, (N, -1))
+
     def copy(self) -> "VectorState":
         return VectorState(self.value.copy(), self.stamp, self.state_id)
 
@@ -50,6 +76,17 @@ class MatrixLieGroupState(State):
 
     __slots__ = ["group", "direction"]
 
+    # Group used by subclasses that fix their group, and its closed-form
+    # counterpart in pynav.lib.lie_kernels, if one exists.
+    _group: MatrixLieGroup = None
+    _fast_group: MatrixLieGroup = None
+
+    # Batched exponential, logarithm and inverse, used by `plus_batch` and
+    # `minus_batch`, if available.
+    _exp_batch: Callable[[np.ndarray], np.ndarray] = None
+    _log_batch: Callable[[np.ndarray], np.ndarray] = None
+    _inverse_batch: Callable[[np.ndarray], np.ndarray] = None
+
     def __init__(
         self,
         value: np.ndarray,
@@ -84,6 +121,60 @@ class MatrixLieGroupState(State):
             raise ValueError("direction must either be 'left' or 'right'.")
         return diff.ravel()
 
+    @classmethod
+    def plus_batch(
+        cls,
+        values: np.ndarray,
+        dx: np.ndarray,
+        direction: str = "right",
+    ) -> np.ndarray:
+        """
+        Batched `plus` of stacked group elements with shape (N, n, n) and
+        increments with shape (N, dof), returning an array with shape
+        (N, n, n). Only available for the state types with closed-form
+        kernels in :mod:`pynav.lib.lie_kernels`.
+        """
+        if cls._exp_batch is None:
+            raise NotImplementedError(
+                "{0} does not support batched plus".format(cls.__name__)
+            )
+
+        values = np.asarray(values)
+        dX = cls._exp_batch(np.reshape(dx, (len(values), -1)))
+        if direction == "right":
+            return values @ dX
+        elif direction == "left":
+            return dX @ values
+        else:
+            raise ValueError("direction must either be 'left' or 'right'.")
+
+    @classmethod
+    def minus_batch(
+        cls,
+        values: np.ndarray,
+        values_other: np.ndarray,
+        direction: str = "right",
+    ) -> np.ndarray:
+        """
+        Batched `minus` of stacked group elements with shape (N, n, n),
+        returning an array with shape (N, dof). Only available for the state
+        types with closed-form kernels in :mod:`pynav.lib.lie_kernels`.
+        """
+        if cls._log_batch is None:
+            raise NotImplementedError(
+                "{0} does not support batched minus".format(cls.__name__)
+            )
+
+        values = np.asarray(values)
+        values_other = np.asarray(values_other)
+        if direction == "right":
+            diff = cls._inverse_batch(values_other) @ values
+        elif direction == "left":
+            diff = values @ cls._inverse_batch(values_other)
+        else:
+            raise ValueError("direction must either be 'left' or 'right'.")
+        return np.reshape(cls._log_batch(diff), (len(values), -1))
+
     def copy(self) -> "MatrixLieGroupState":
         return self.__class__(
             self.value.copy(),
@@ -148,6 +239,63 @@ class MatrixLieGroupState(State):
     def jacobian_from_blocks(self, **kwargs) -> np.ndarray:
         raise NotImplementedError()
 
+    @classmethod
+    def use_fast_kernels(cls, enabled: bool = True):
+        """
+        Switches this state type between the generic pylie implementation and
+        the closed-form, small-angle-safe kernels of
+        :mod:`pynav.lib.lie_kernels` for `plus`, `minus` and their Jacobians.
+
+        This is a global switch: it changes the group of the state type
+        itself, and therefore affects all code in the process that constructs
+        states of this type, until it is switched back. States constructed
+        before the call keep the group they were created with. Use
+        `fast_kernels()` to enable the kernels only within a block. The
+        kernels are available for ``SO3State``, ``SE3State`` and
+        ``SE23State``.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            Whether to use the fast kernels, by default True
+        """
+        if cls._fast_group is None:
+            raise NotImplementedError(
+                "{0} does not have fast kernels".format(cls.__name__)
+            )
+
+        if enabled:
+            cls._group = cls._fast_group
+        else:
+            cls._group = cls._fast_group.__bases__[0]
+
+    @classmethod
+    @contextmanager
+    def fast_kernels(cls, enabled: bool = True) -> Iterator[None]:
+        """
+        Context manager version of `use_fast_kernels()`. The group of the
+        state type that was in use before entering the block is restored on
+        exit, including when an exception is raised.
+
+        Example
+        -------
+        .. code-block:: python
+
+            with SE3State.fast_kernels():
+                results = run_filter(ekf, x0, P0, input_data, meas_data)
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            Whether to use the fast kernels within the block, by default True
+        """
+        previous = cls._group
+        cls.use_fast_kernels(enabled)
+        try:
+            yield
+        finally:
+            cls._group = previous
+
 
 class SO2State(MatrixLieGroupState):
     def __init__(
@@ -169,6 +317,12 @@ class SO2State(MatrixLieGroupState):
 
 
 class SO3State(MatrixLieGroupState):
+    _group = SO3
+    _fast_group = FastSO3
+    _exp_batch = staticmethod(lie_kernels.so3_exp)
+    _log_batch = staticmethod(lie_kernels.so3_log)
+    _inverse_batch = staticmethod(lie_kernels.so3_inverse)
+
     def __init__(
         self,
         value: np.ndarray,
@@ -176,7 +330,7 @@ class SO3State(MatrixLieGroupState):
         state_id=None,
         direction="right",
     ):
-        super().__init__(value, SO3, stamp, state_id, direction)
+        super().__init__(value, self._group, stamp, state_id, direction)
 
     @property
     def attitude(self):
@@ -281,6 +435,12 @@ class SE2State(MatrixLieGroupState):
 
 
 class SE3State(MatrixLieGroupState):
+    _group = SE3
+    _fast_group = FastSE3
+    _exp_batch = staticmethod(lie_kernels.se3_exp)
+    _log_batch = staticmethod(lie_kernels.se3_log)
+    _inverse_batch = staticmethod(lie_kernels.se3_inverse)
+
     def __init__(
         self,
         value: np.ndarray,
@@ -288,7 +448,7 @@ class SE3State(MatrixLieGroupState):
         state_id=None,
         direction="right",
     ):
-        super().__init__(value, SE3, stamp, state_id, direction)
+        super().__init__(value, self._group, stamp, state_id, direction)
 
     @property
     def attitude(self) -> np.ndarray:
@@ -389,6 +549,12 @@ class SE3State(MatrixLieGroupState):
 
 
 class SE23State(MatrixLieGroupState):
+    _group = SE23
+    _fast_group = FastSE23
+    _exp_batch = staticmethod(lie_kernels.se23_exp)
+    _log_batch = staticmethod(lie_kernels.se23_log)
+    _inverse_batch = staticmethod(lie_kernels.se23_inverse)
+
     def __init__(
         self,
         value: np.ndarray,
@@ -399,7 +565,7 @@ class SE23State(MatrixLieGroupState):
         if value.shape != (5, 5):
             raise ValueError("Value must be a 5x5 matrix")
 
-        super().__init__(value, SE23, stamp, state_id, direction)
+        super().__init__(value, self._group, stamp, state_id, direction)
 
     @property
     def pose(self):
@@ -464,6 +630,14 @@ class SL3State(MatrixLieGroupState):
         super().__init__(value, SL3, stamp, state_id, direction)
 
 
+def _is_packable(state: State) -> bool:
+    """
+    Whether a substate can be stored in the contiguous buffer of a
+    `CompositeState`, whose `plus` and `minus` are plain vector arithmetic.
+    """
+    return type(state) is VectorState
+
+
 class CompositeState(State):
     """
     A "composite" state object intended to hold a list of State objects as a
@@ -484,10 +658,19 @@ class CompositeState(State):
     and by ID.
     """
 
-    __slots__ = ["state_id"]
+    __slots__ = [
+        "state_id",
+        "_slice_table",
+        "_vector_buffer",
+        "_vector_buffer_index",
+    ]
 
     def __init__(
-        self, state_list: List[State], stamp: float = None, state_id=None
+        self,
+        state_list: List[State],
+        stamp: float = None,
+        state_id=None,
+        contiguous_vectors: bool = False,
     ):
 
         #:List[State]: The substates are the CompositeState's value.
@@ -496,6 +679,12 @@ class CompositeState(State):
         self.stamp = stamp
         self.state_id = state_id
 
+        self._slice_table = None
+        self._vector_buffer = None
+        self._vector_buffer_index = None
+        if contiguous_vectors:
+            self.pack_vector_states()
+
     def __getstate__(self):
         """
         Get the state of the object for pickling.
@@ -508,6 +697,7 @@ class CompositeState(State):
                 "value": self.value,
                 "stamp": self.stamp,
                 "state_id": self.state_id,
+                "contiguous_vectors": self.contiguous_vectors,
             },
         )
 
@@ -522,48 +712,155 @@ class CompositeState(State):
         self.value = attributes["value"]
         self.stamp = attributes["stamp"]
         self.state_id = attributes["state_id"]
+        self._slice_table = None
+        self._vector_buffer = None
+        self._vector_buffer_index = None
+        if attributes.get("contiguous_vectors", False):
+            self.pack_vector_states()
+
+    def _get_slice_table(self):
+        """
+        Returns the cached bookkeeping of the substates, which is a tuple
+        `(index_by_id, slices, slice_by_id, dof)`. The table is rebuilt
+        lazily after `add_state` or `remove_state_by_id`, or if the length of
+        the substate list has been changed directly. If substates are replaced
+        by states with a different ID or DOF through direct manipulation of
+        `self.value`, `invalidate_cache()` must be called.
+        """
+        table = self._slice_table
+        if table is not None and table[4] == len(self.value):
+            return table
+
+        index_by_id = {}
+        slices = []
+        slice_by_id = {}
+        counter = 0
+        for i, state in enumerate(self.value):
+            slc = slice(counter, counter + state.dof)
+            slices.append(slc)
+            if state.state_id not in index_by_id:
+                index_by_id[state.state_id] = i
+                slice_by_id[state.state_id] = slc
+            counter += state.dof
+
+        table = (index_by_id, slices, slice_by_id, counter, len(self.value))
+        self._slice_table = table
+        return table
+
+    def invalidate_cache(self):
+        """
+        Discards the cached id-to-slice table. Only needs to be called after
+        replacing substates through direct manipulation of `self.value`.
+        """
+        self._slice_table = None
+        if self._vector_buffer is not None:
+            self.pack_vector_states()
 
     @property
     def dof(self):
-        return sum([x.dof for x in self.value])
+        return self._get_slice_table()[3]
 
-    def get_index_by_id(self, state_id):
+    @property
+    def contiguous_vectors(self) -> bool:
         """
-        Get index of a particular state_id in the list of states.
+        Whether the values of the `VectorState` substates are stored in a
+        single contiguous buffer.
         """
-        return [x.state_id for x in self.value].index(state_id)
+        return self._vector_buffer is not None
 
-    def get_slices(self) -> List[slice]:
+    @property
+    def vector_buffer(self) -> np.ndarray:
         """
-        Get slices for each state in the list of states.
+        Contiguous buffer holding the values of all `VectorState` substates,
+        in order. The substate values are views into this array. Only
+        available after `pack_vector_states()`.
         """
-        slices = []
+        return self._vector_buffer
+
+    def pack_vector_states(self):
+        """
+        Moves the values of all `VectorState` substates into one contiguous
+        buffer, and makes each substate value a view into it with the same
+        shape as before. Subclasses of `VectorState` are left as they are,
+        since they may redefine `plus` and `minus`. `plus` and
+        `minus` then process all vector substates with a single array
+        operation, and the whole block can be accessed with `vector_buffer`.
+
+        Values must then be modified in place, for example with
+        `set_value_by_id`. Assigning a new array to a substate's `value`
+        detaches it from the buffer, after which this method must be called
+        again.
+        """
+        index = [
+            np.arange(slc.start, slc.stop)
+            for state, slc in zip(self.value, self.get_slices())
+            if _is_packable(state)
+        ]
+        if len(index) == 0:
+            buffer = np.zeros((0,))
+            index = np.zeros((0,), dtype=int)
+        else:
+            buffer = np.concatenate(
+                [
+                    state.value.ravel()
+                    for state in self.value
+                    if _is_packable(state)
+                ]
+            )
+            index = np.concatenate(index)
+
+        self._vector_buffer_index = index
+        self._attach_vector_buffer(buffer)
+
+    def _attach_vector_buffer(self, buffer: np.ndarray):
+        self._vector_buffer = buffer
         counter = 0
         for state in self.value:
-            slices.append(slice(counter, counter + state.dof))
-            counter += state.dof
+            if _is_packable(state):
+                shape = np.shape(state.value)
+                state.value = buffer[counter : counter + state.dof].reshape(shape)
+                counter += state.dof
 
-        return slices
+    def get_index_by_id(self, state_id):
+        """
+        Get index of a particular state_id in the list of states.
+        """
+        try:
+            return self._get_slice_table()[0][state_id]
+        except KeyError:
+            raise ValueError(f"{state_id} is not in list") from None
+
+    def get_slices(self) -> List[slice]:
+        """
+        Get slices for each state in the list of states. The returned list is
+        cached and should not be modified.
+        """
+        return self._get_slice_table()[1]
 
     def add_state(self, state: State, stamp: float = None, state_id=None):
         """Adds a state and it's corresponding slice to the composite state."""
         self.value.append(state)
+        self.invalidate_cache()
 
     def remove_state_by_id(self, state_id):
         """Removes a given state by ID."""
         idx = self.get_index_by_id(state_id)
         self.value.pop(idx)
+        self.invalidate_cache()
 
     def get_slice_by_id(self, state_id, slices=None):
         """
         Get slice of a particular state_id in the list of states.
         """
 
-        if slices is None:
-            slices = self.get_slices()
+        if slices is not None:
+            idx = self.get_index_by_id(state_id)
+            return slices[idx]
 
-        idx = self.get_index_by_id(state_id)
-        return slices[idx]
+        try:
+            return self._get_slice_table()[2][state_id]
+        except KeyError:
+            raise ValueError(f"{state_id} is not in list") from None
 
     def get_matrix_block_by_ids(
         self, mat: np.ndarray, state_id_1: Any, state_id_2: Any = None
@@ -672,14 +969,23 @@ class CompositeState(State):
         Set the whole sub-state by id.
         """
         idx = self.get_index_by_id(state_id)
+        slc = self.get_slices()[idx]
         self.value[idx] = state
+        if state.state_id != state_id or state.dof != slc.stop - slc.start:
+            self.invalidate_cache()
+        elif self._vector_buffer is not None:
+            self.pack_vector_states()
 
     def set_value_by_id(self, value: Any, state_id: Any):
         """
         Set the value of a sub-state by id.
         """
         idx = self.get_index_by_id(state_id)
-        self.value[idx].value = value
+        state = self.value[idx]
+        if self._vector_buffer is not None and _is_packable(state):
+            state.value[...] = np.reshape(value, state.value.shape)
+        else:
+            state.value = value
 
     def set_stamp_for_all(self, stamp: float):
         """
@@ -699,19 +1005,38 @@ class CompositeState(State):
         Returns a new composite state object where the state values have also
         been copied.
         """
-        return self.__class__(
+        new = self.__class__(
             [state.copy() for state in self.value], self.stamp, self.state_id
         )
+        self._copy_cache_to(new)
+        return new
+
+    def _copy_cache_to(self, new: "CompositeState"):
+        # The slice table only depends on the ids and dofs of the substates,
+        # which are identical in a copy, so it can be shared.
+        new._slice_table = self._slice_table
+        if self._vector_buffer is not None:
+            new._vector_buffer_index = self._vector_buffer_index
+            new._attach_vector_buffer(self._vector_buffer.copy())
 
     def plus(self, dx, new_stamp: float = None) -> "CompositeState":
         """
         Updates the value of each sub-state given a dx. Interally parses
         the dx vector.
         """
+        dx = np.ravel(dx)
+        slices = self.get_slices()
         new = self.copy()
-        for i, state in enumerate(new.value):
-            new.value[i] = state.plus(dx[: state.dof])
-            dx = dx[state.dof :]
+        if self._vector_buffer is not None and new._vector_buffer is not None:
+            # All vector substates are updated with one operation on the
+            # buffer, the remaining substates one at a time.
+            new._vector_buffer += dx[self._vector_buffer_index]
+            for i, state in enumerate(new.value):
+                if not _is_packable(state):
+                    new.value[i] = state.plus(dx[slices[i]])
+        else:
+            for i, state in enumerate(new.value):
+                new.value[i] = state.plus(dx[slices[i]])
 
         if new_stamp is not None:
             new.set_stamp_for_all(new_stamp)
@@ -719,13 +1044,24 @@ class CompositeState(State):
         return new
 
     def minus(self, x: "CompositeState") -> np.ndarray:
-        dx = []
-        for i, v in enumerate(x.value):
-            dx.append(
-                self.value[i].minus(x.value[i]).reshape((self.value[i].dof,))
+        dx = np.empty(self.dof)
+        slices = self.get_slices()
+        vectorized = (
+            self._vector_buffer is not None
+            and x._vector_buffer is not None
+            and self._vector_buffer.size == x._vector_buffer.size
+        )
+        if vectorized:
+            dx[self._vector_buffer_index] = (
+                self._vector_buffer - x._vector_buffer
             )
 
-        return np.concatenate(dx).reshape((-1, 1))
+        for i, v in enumerate(x.value):
+            if vectorized and _is_packable(v):
+                continue
+            dx[slices[i]] = self.value[i].minus(x.value[i]).ravel()
+
+        return dx.reshape((-1, 1))
 
     def plus_by_id(
         self, dx, state_id: int, new_stamp: float = None
@@ -741,33 +1077,38 @@ class CompositeState(State):
 
         return new
 
-    def jacobian_from_blocks(self, block_dict: dict):
+    def jacobian_from_blocks(self, block_dict: dict, sparse: bool = False):
         """
         Returns the jacobian of the entire composite state given jacobians
         associated with some of the substates. These are provided as a dictionary
-        with the the keys being the substate IDs.
+        with the the keys being the substate IDs. If `sparse` is True, a
+        `BlockSparseJacobian` holding only the provided blocks is returned
+        instead of a dense array.
         """
+        if sparse:
+            return BlockSparseJacobian(
+                [
+                    (self.get_slice_by_id(state_id), block)
+                    for state_id, block in block_dict.items()
+                ],
+                self.dof,
+            )
+
         block: np.ndarray = list(block_dict.values())[0]
         m = block.shape[0]  # Dimension of "y" value
         jac = np.zeros((m, self.dof))
-        slices = self.get_slices()
         for state_id, block in block_dict.items():
-            slc = self.get_slice_by_id(state_id, slices)
+            slc = self.get_slice_by_id(state_id)
             jac[:, slc] = block
 
         return jac
 
     def plus_jacobian(self, dx: np.ndarray) -> np.ndarray:
         dof = self.dof
+        dx = np.ravel(dx)
         jac = np.zeros((dof, dof))
-        counter = 0
-        for state in self.value:
-            jac[
-                counter : counter + state.dof,
-                counter : counter + state.dof,
-            ] = state.plus_jacobian(dx)
-            dx = dx[state.dof :]
-            counter += state.dof
+        for state, slc in zip(self.value, self.get_slices()):
+            jac[slc, slc] = state.plus_jacobian(dx[slc])
 
         return jac
 
@@ -775,13 +1116,8 @@ class CompositeState(State):
 
         dof = self.dof
         jac = np.zeros((dof, dof))
-        counter = 0
-        for i, state in enumerate(self.value):
-            jac[
-                counter : counter + state.dof,
-                counter : counter + state.dof,
-            ] = state.minus_jacobian(x.value[i])
-            counter += state.dof
+        for i, slc in enumerate(self.get_slices()):
+            jac[slc, slc] = self.value[i].minus_jacobian(x.value[i])
 
         return jac
 
@@ -4,7 +4,7 @@ This module contains the core primitive types used throughout pynav.
 """
 
 import numpy as np
-from typing import List, Any
+from typing import List, Any, Tuple
 from abc import ABC, abstractmethod
 
 
@@ -187,6 +187,267 @@ class State(ABC):
         return "\n".join(s)
 
 
+class BlockSparseJacobian:
+    """
+    A Jacobian with respect to a large state of which only a few column blocks
+    are nonzero, stored as a list of `(slice, block)` pairs. Each `block` is an
+    `(m, k)` array placed at the columns given by `slice`.
+
+    Products with an `(n, n)` covariance cost O(k n) per measurement dimension
+    instead of O(n^2). The dense array can be recovered with `toarray()`.
+    """
+
+    __slots__ = ["blocks", "dof"]
+
+    def __init__(self, blocks: List[Tuple[slice, np.ndarray]], dof: int):
+        """
+        Parameters
+        ----------
+        blocks : List[Tuple[slice, np.ndarray]]
+            Nonzero column blocks and the columns they occupy. Slices must
+            not overlap.
+        dof : int
+            Total number of columns, i.e. the DOF of the full state.
+        """
+        #:List[Tuple[slice, numpy.ndarray]]: nonzero column blocks
+        self.blocks = [(slc, np.atleast_2d(block)) for slc, block in blocks]
+        #:int: total number of columns
+        self.dof = dof
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.blocks[0][1].shape[0], self.dof)
+
+    def toarray(self) -> np.ndarray:
+        """
+        Returns the dense Jacobian.
+        """
+        jac = np.zeros(self.shape)
+        for slc, block in self.blocks:
+            jac[:, slc] = block
+        return jac
+
+    def __array__(self, dtype=None, copy=None):
+        jac = self.toarray()
+        return jac if dtype is None else jac.astype(dtype)
+
+    def __matmul__(self, M: np.ndarray) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{G} \mathbf{M}` using only the rows of
+        :math:`\mathbf{M}` that hit a nonzero block.
+        """
+        M = np.asarray(M)
+        out = None
+        for slc, block in self.blocks:
+            term = block @ M[slc]
+            out = term if out is None else out + term
+        return out
+
+    def rmatmul_transpose(self, P: np.ndarray) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{P} \mathbf{G}^T` using only the columns of
+        :math:`\mathbf{P}` that hit a nonzero block.
+        """
+        out = None
+        for slc, block in self.blocks:
+            term = P[:, slc] @ block.T
+            out = term if out is None else out + term
+        return out
+
+
+class BlockDiagonalMatrix:
+    """
+    A square block-diagonal matrix, stored as the list of its diagonal blocks,
+    such as the Jacobian and covariance of a process model acting separately
+    on each substate of a composite state.
+
+    Products with an `(n, n)` covariance are applied block by block and cost
+    O(k n) per row instead of O(n^2). The dense array can be recovered with
+    `toarray()`.
+    """
+
+    __slots__ = ["blocks", "slices", "dof"]
+
+    def __init__(
+        self,
+        blocks: List[np.ndarray],
+        slices: List[slice] = None,
+        dof: int = None,
+    ):
+        """
+        Parameters
+        ----------
+        blocks : List[np.ndarray]
+            Square diagonal blocks, in order.
+        slices : List[slice], optional
+            Rows and columns occupied by each block, which must not overlap.
+            All other entries of the matrix are zero. By default, the blocks
+            are contiguous and cover the whole matrix.
+        dof : int, optional
+            Total number of rows and columns, required if `slices` is given.
+        """
+        #:List[numpy.ndarray]: diagonal blocks
+        self.blocks = [np.atleast_2d(block) for block in blocks]
+
+        if slices is None:
+            slices = []
+            dof = 0
+            for block in self.blocks:
+                slices.append(slice(dof, dof + block.shape[0]))
+                dof += block.shape[0]
+
+        #:List[slice]: rows and columns occupied by each block
+        self.slices = slices
+
+        #:int: total number of rows and columns
+        self.dof = dof
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.dof, self.dof)
+
+    @property
+    def T(self) -> "BlockDiagonalMatrix":
+        return BlockDiagonalMatrix(
+            [block.T for block in self.blocks], self.slices, self.dof
+        )
+
+    def toarray(self) -> np.ndarray:
+        """
+        Returns the dense matrix.
+        """
+        out = np.zeros(self.shape)
+        for slc, block in zip(self.slices, self.blocks):
+            out[slc, slc] = block
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.toarray()
+        return out if dtype is None else out.astype(dtype)
+
+    def __matmul__(self, M: np.ndarray) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{A} \mathbf{M}` block row by block row.
+        """
+        M = np.asarray(M)
+        out = np.zeros(M.shape, dtype=np.result_type(M, np.float64))
+        for slc, block in zip(self.slices, self.blocks):
+            out[slc] = block @ M[slc]
+        return out
+
+    def congruence(self, P: np.ndarray) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{A} \mathbf{P} \mathbf{A}^T` in
+        O(sum(k_i^2) n) operations, where k_i are the block sizes.
+        """
+        AP = self @ P
+        out = np.zeros_like(AP)
+        for slc, block in zip(self.slices, self.blocks):
+            out[:, slc] = AP[:, slc] @ block.T
+        return out
+
+    def add_to(self, P: np.ndarray) -> np.ndarray:
+        """
+        Adds the blocks to the diagonal blocks of `P`, in place, and returns
+        `P`.
+        """
+        for slc, block in zip(self.slices, self.blocks):
+            P[slc, slc] += block
+        return P
+
+
+class BlockIdentityMatrix:
+    """
+    A square matrix equal to the identity except on a few diagonal blocks,
+    such as the Jacobian of a process model that only propagates some
+    substates of a composite state and leaves the others unchanged.
+
+    The congruence with a covariance only modifies the rows and columns of
+    the blocks, which touches O(k n) entries instead of O(n^2).
+    """
+
+    __slots__ = ["blocks", "slices", "dof"]
+
+    def __init__(self, blocks: List[np.ndarray], slices: List[slice], dof: int):
+        """
+        Parameters
+        ----------
+        blocks : List[np.ndarray]
+            Square diagonal blocks that differ from the identity.
+        slices : List[slice]
+            Rows and columns occupied by each block, which must not overlap.
+        dof : int
+            Total number of rows and columns.
+        """
+        #:List[numpy.ndarray]: diagonal blocks
+        self.blocks = [np.atleast_2d(block) for block in blocks]
+
+        #:List[slice]: rows and columns occupied by each block
+        self.slices = slices
+
+        #:int: total number of rows and columns
+        self.dof = dof
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.dof, self.dof)
+
+    @property
+    def T(self) -> "BlockIdentityMatrix":
+        return BlockIdentityMatrix(
+            [block.T for block in self.blocks], self.slices, self.dof
+        )
+
+    def toarray(self) -> np.ndarray:
+        """
+        Returns the dense matrix.
+        """
+        out = np.identity(self.dof)
+        for slc, block in zip(self.slices, self.blocks):
+            out[slc, slc] = block
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.toarray()
+        return out if dtype is None else out.astype(dtype)
+
+    def __matmul__(self, M: np.ndarray) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{A} \mathbf{M}`, which only modifies the rows
+        of the blocks.
+        """
+        out = np.array(M, dtype=np.result_type(M, np.float64))
+        for slc, block in zip(self.slices, self.blocks):
+            out[slc] = block @ out[slc]
+        return out
+
+    def congruence(self, P: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Computes :math:`\mathbf{A} \mathbf{P} \mathbf{A}^T` for a symmetric
+        `P` by only rewriting the rows and columns of the blocks.
+
+        Parameters
+        ----------
+        P : np.ndarray
+            Symmetric matrix.
+        out : np.ndarray, optional
+            Array in which to write the result, which may be `P` itself. By
+            default, a copy of `P` is made.
+        """
+        if out is None:
+            out = np.array(P, dtype=np.float64)
+        elif out is not P:
+            out[...] = P
+
+        for slc, block in zip(self.slices, self.blocks):
+            rows = block @ out[slc, :]
+            diag = rows[:, slc] @ block.T
+            rows[:, slc] = 0.5 * (diag + diag.T)
+            out[slc, :] = rows
+            out[:, slc] = rows.T
+        return out
+
+
 class MeasurementModel(ABC):
     """
     Abstract measurement model base class, used to implement measurement models
@@ -221,6 +482,34 @@ class MeasurementModel(ABC):
         """
         pass
 
+    def evaluate_batch(self, states: List[State]) -> List[np.ndarray]:
+        """
+        Evaluates the measurement model at each of the given states. Models
+        that can process many states with array operations should override
+        this, which is used by the fast mode of `DataGenerator`. By default,
+        `evaluate()` is called once per state.
+
+        Parameters
+        ----------
+        states : List[State]
+            States at which to evaluate the model.
+
+        Returns
+        -------
+        List[np.ndarray]
+            One measurement per state, as returned by `evaluate()`.
+        """
+        return [self.evaluate(x) for x in states]
+
+    def jacobian_sparse(self, x: State):
+        """
+        Evaluates the measurement model Jacobian, optionally as a
+        `BlockSparseJacobian`. Models whose Jacobian only involves a few
+        substates of a large `CompositeState` should override this. By
+        default, the dense `jacobian()` is returned.
+        """
+        return self.jacobian(x)
+
     def jacobian_fd(self, x: State, step_size=1e-6):
         """
         Calculates the model jacobian with finite difference.
@@ -324,6 +613,38 @@ class ProcessModel(ABC):
         """
         pass
 
+    def evaluate_with_jacobians(
+        self, x: State, u: Input, dt: float
+    ) -> Tuple[State, np.ndarray, np.ndarray]:
+        """
+        Evaluates the process model, its Jacobian and its covariance at the
+        same point. Models whose `evaluate`, `jacobian` and `covariance` share
+        intermediate results should override this to compute them only once.
+
+        Since `evaluate` may modify `x` in place, the Jacobian and covariance
+        are computed first. Overrides must likewise evaluate them at the
+        input state :math:`\mathbf{x}_{k-1}`, not at the propagated state.
+
+        Parameters
+        ----------
+        x : State
+            State at time :math:`k-1`.
+        u : Input
+            The input value :math:`\mathbf{u}` provided as a Input object.
+        dt : float
+            The time interval :math:`\Delta t` between the two states.
+
+        Returns
+        -------
+        Tuple[State, np.ndarray, np.ndarray]
+            State at time :math:`k`, Jacobian :math:`\mathbf{A}_{k-1}` and
+            covariance :math:`\mathbf{Q}_k`.
+        """
+        A = self.jacobian(x, u, dt)
+        Q = self.covariance(x, u, dt)
+        x_new = self.evaluate(x, u, dt)
+        return x_new, A, Q
+
     def jacobian_fd(
         self, x: State, u: Input, dt: float, step_size=1e-6, *args, **kwargs
     ) -> np.ndarray:
@@ -1,4 +1,9 @@
 from typing import Callable, List, Tuple, Union, Any
+from collections import OrderedDict
+from functools import lru_cache
+import os
+import shutil
+import tempfile
 from joblib import Parallel, delayed
 from pynav.types import State, Measurement, StateWithCovariance
 import numpy as np
@@ -6,11 +11,49 @@ import matplotlib.pyplot as plt
 from scipy.stats.distributions import chi2
 from scipy.interpolate import interp1d
 from tqdm import tqdm
-from scipy.linalg import block_diag, expm
+from scipy.linalg import expm
 
 from pynav.lib.states import SE3State
 
 
+@lru_cache(maxsize=1024)
+def _chi2_quantile_scalar(probability: float, dof: float) -> float:
+    return float(chi2.ppf(probability, df=dof))
+
+
+def chi2_quantile(
+    probability: float, dof: Union[int, np.ndarray]
+) -> np.ndarray:
+    """
+    Inverse CDF of the chi-square distribution, equivalent to
+    `chi2.ppf(probability, df=dof)`. Quantiles are cached by
+    (dof, probability), and for an array of dofs only the distinct values
+    are evaluated, which makes repeated bounds on long trajectories cheap.
+
+    Parameters
+    ----------
+    probability : float
+        Cumulative probability, between 0 and 1.
+    dof : int or np.ndarray
+        Degrees of freedom, as a scalar or an array of any shape.
+
+    Returns
+    -------
+    float or np.ndarray
+        Quantile(s), with the same shape as `dof`.
+    """
+    dof = np.asarray(dof)
+    unique_dof, inverse = np.unique(dof, return_inverse=True)
+    probability = float(probability)
+
+    values = np.empty(unique_dof.shape)
+    for i, df in enumerate(unique_dof.tolist()):
+        values[i] = _chi2_quantile_scalar(probability, df)
+
+    out = values[inverse].reshape(dof.shape)
+    return out[()] if out.ndim == 0 else out
+
+
 class GaussianResult:
     """
     A data container that simultaneously computes various interesting metrics
@@ -131,6 +174,113 @@ class GaussianResultList:
         #:numpy.ndarray with shape (N,): true state value. type depends on implementation
         self.value_true = np.array([r.state_true.value for r in result_list])
 
+    @classmethod
+    def from_arrays(
+        cls,
+        stamp: np.ndarray,
+        error: np.ndarray,
+        covariance: np.ndarray,
+        value: np.ndarray = None,
+        value_true: np.ndarray = None,
+    ) -> "GaussianResultList":
+        """
+        Computes all the metrics at once from stacked arrays, without any
+        `GaussianResult` or `State` objects. The NEES is computed with batched
+        Cholesky factorizations of the covariances. The `state` and
+        `state_true` attributes are None.
+
+        Parameters
+        ----------
+        stamp : np.ndarray with shape (N,)
+            Timestamps.
+        error : np.ndarray with shape (N, dof)
+            Estimation error at each timestamp.
+        covariance : np.ndarray with shape (N, dof, dof)
+            Estimated covariance at each timestamp.
+        value : np.ndarray with shape (N, ...), optional
+            Estimated state values.
+        value_true : np.ndarray with shape (N, ...), optional
+            True state values.
+        """
+        error = np.asarray(error, dtype=np.float64)
+        covariance = np.asarray(covariance, dtype=np.float64)
+        N, dof = error.shape
+
+        L = np.linalg.cholesky(covariance)
+        z = np.linalg.solve(L, error[:, :, None])[:, :, 0]
+
+        result = cls.__new__(cls)
+        result.stamp = np.asarray(stamp)
+        result.state = None
+        result.state_true = None
+        result.covariance = covariance
+        result.error = error
+        result.ees = np.sum(error**2, axis=1)
+        result.nees = np.sum(z**2, axis=1)
+        result.md = np.sqrt(result.nees)
+        result.three_sigma = 3 * np.sqrt(
+            np.diagonal(covariance, axis1=1, axis2=2)
+        )
+        result.value = value
+        result.value_true = value_true
+        result.dof = np.full(N, dof)
+        return result
+
+    @classmethod
+    def from_states(
+        cls,
+        estimates: List[StateWithCovariance],
+        states_true: List[State],
+    ) -> "GaussianResultList":
+        """
+        Equivalent to building a `GaussianResult` for each pair of estimate
+        and true state, and stacking them in a `GaussianResultList`, but with
+        all metrics computed by `from_arrays`. If the states are all of the
+        same type and that type has a `minus_batch` implementation matching
+        its `minus`, the errors are also computed in a single batched
+        operation.
+
+        Parameters
+        ----------
+        estimates : List[StateWithCovariance]
+            Estimated states and covariances, with a constant dof.
+        states_true : List[State]
+            The corresponding true states.
+        """
+        states = [x.state for x in estimates]
+        value = np.array([x.value for x in states])
+        value_true = np.array([x.value for x in states_true])
+
+        state_type = type(states[0])
+        direction = getattr(states[0], "direction", None)
+        same_type = all(
+            type(x) is state_type and getattr(x, "direction", None) == direction
+            for x in states
+        )
+        error = None
+        if same_type and _has_batch_methods(state_type, "minus"):
+            try:
+                error = state_type.minus_batch(value, value_true, direction)
+            except NotImplementedError:
+                pass
+        if error is None:
+            error = np.array(
+                [x.minus(y).ravel() for x, y in zip(states, states_true)]
+            )
+
+        result = cls.from_arrays(
+            np.array([x.stamp for x in states]),
+            error,
+            np.array([x.covariance for x in estimates]),
+            value,
+            value_true,
+        )
+        result.state = np.empty(len(states), dtype=object)
+        result.state[:] = states
+        result.state_true = np.empty(len(states_true), dtype=object)
+        result.state_true[:] = states_true
+        return result
+
     def nees_lower_bound(self, confidence_interval: float):
         """
         Calculates the NEES lower bound throughout the trajectory.
@@ -159,7 +309,7 @@ class GaussianResultList:
             raise ValueError("Confidence interval must lie in (0, 1)")
 
         lower_bound_threshold = (1 - confidence_interval) / 2
-        return chi2.ppf(lower_bound_threshold, df=self.dof)
+        return chi2_quantile(lower_bound_threshold, self.dof)
 
     def nees_upper_bound(self, confidence_interval: float, double_sided=True):
         """
@@ -194,7 +344,7 @@ class GaussianResultList:
         if double_sided:
             upper_bound_threshold += (1 - confidence_interval) / 2
 
-        return chi2.ppf(upper_bound_threshold, df=self.dof)
+        return chi2_quantile(upper_bound_threshold, self.dof)
 
 
 class MonteCarloResult:
@@ -243,6 +393,67 @@ class MonteCarloResult:
         #:numpy.ndarray with shape (N): dof throughout trajectory
         self.dof: np.ndarray = trial_results[0].dof
 
+    @classmethod
+    def from_arrays(
+        cls,
+        stamp: np.ndarray,
+        dof: np.ndarray,
+        error: np.ndarray,
+        nees: np.ndarray,
+        three_sigma: np.ndarray = None,
+    ) -> "MonteCarloResult":
+        """
+        Builds the result directly from stacked trial arrays, without any
+        `GaussianResultList`. The `trial_results` attribute is then None, and
+        the arrays are kept as the `error`, `nees` and `three_sigma`
+        attributes.
+
+        Parameters
+        ----------
+        stamp : np.ndarray with shape (N,)
+            Timestamps, identical for all trials.
+        dof : np.ndarray with shape (N,)
+            Degrees of freedom throughout the trajectory.
+        error : np.ndarray with shape (num_trials, N, dof)
+            Estimation error of each trial.
+        nees : np.ndarray with shape (num_trials, N)
+            NEES of each trial.
+        three_sigma : np.ndarray with shape (num_trials, N, dof), optional
+            Three-sigma bounds of each trial.
+        """
+        result = cls._from_statistics(
+            stamp,
+            dof,
+            error.shape[0],
+            np.average(nees, axis=0),
+            np.average(error**2, axis=0),
+        )
+        result.error = error
+        result.nees = nees
+        result.three_sigma = three_sigma
+        return result
+
+    @classmethod
+    def _from_statistics(
+        cls,
+        stamp: np.ndarray,
+        dof: np.ndarray,
+        num_trials: int,
+        average_nees: np.ndarray,
+        mean_squared_error: np.ndarray,
+    ) -> "MonteCarloResult":
+        result = cls.__new__(cls)
+        result.trial_results = None
+        result.num_trials = num_trials
+        result.stamp = np.asarray(stamp)
+        result.average_nees = average_nees
+        result.average_ees = np.sum(mean_squared_error, axis=1)
+        result.rmse = np.sqrt(mean_squared_error)
+        result.total_rmse = np.sqrt(result.average_ees)
+        result.expected_nees = np.array(dof)
+        result.dof = np.asarray(dof)
+        return result
+
     def nees_lower_bound(self, confidence_interval: float):
         """
         Calculates the NEES lower bound throughout the trajectory.
@@ -263,7 +474,7 @@ class MonteCarloResult:
 
         lower_bound_threshold = (1 - confidence_interval) / 2
         return (
-            chi2.ppf(lower_bound_threshold, df=self.num_trials * self.dof)
+            chi2_quantile(lower_bound_threshold, self.num_trials * self.dof)
             / self.num_trials
         )
 
@@ -294,16 +505,176 @@ class MonteCarloResult:
             upper_bound_threshold += (1 - confidence_interval) / 2
 
         return (
-            chi2.ppf(upper_bound_threshold, df=self.num_trials * self.dof)
+            chi2_quantile(upper_bound_threshold, self.num_trials * self.dof)
             / self.num_trials
         )
 
 
+class MonteCarloAccumulator:
+    """
+    Streaming computation of the `MonteCarloResult` statistics, which are
+    updated online as trials complete using Welford's algorithm. Only the
+    running means and variances are stored, so memory use does not grow
+    with the number of trials, and the statistics can be inspected at any
+    point to monitor their convergence.
+
+    Example
+    -------
+    .. code-block:: python
+
+        acc = MonteCarloAccumulator()
+        for i in range(num_trials):
+            acc.add(trial(i))
+            print(acc.num_trials, acc.average_nees_standard_error.max())
+
+        result = acc.result()
+    """
+
+    def __init__(self):
+        #:int: number of trials added so far
+        self.num_trials = 0
+        #:numpy.ndarray with shape (N,): timestamps throughout trajectory
+        self.stamp: np.ndarray = None
+        #:numpy.ndarray with shape (N,): dof throughout trajectory
+        self.dof: np.ndarray = None
+        #:numpy.ndarray with shape (N,): running average NEES
+        self.average_nees: np.ndarray = None
+        #:numpy.ndarray with shape (N,): running average EES
+        self.average_ees: np.ndarray = None
+        #:numpy.ndarray with shape (N, dof): running mean of squared errors
+        self.mean_squared_error: np.ndarray = None
+        self._m2_nees: np.ndarray = None
+        self._m2_ees: np.ndarray = None
+
+    def add(self, trial_result: GaussianResultList):
+        """
+        Adds the result of one trial. Trials must have identical timestamps
+        and a constant state dof.
+        """
+        error = np.asarray(trial_result.error, dtype=np.float64)
+        nees = np.asarray(trial_result.nees, dtype=np.float64)
+        ees = np.sum(error**2, axis=1)
+
+        if self.num_trials == 0:
+            self.stamp = trial_result.stamp
+            self.dof = trial_result.dof
+            self.average_nees = np.zeros(nees.shape)
+            self.average_ees = np.zeros(ees.shape)
+            self.mean_squared_error = np.zeros(error.shape)
+            self._m2_nees = np.zeros(nees.shape)
+            self._m2_ees = np.zeros(ees.shape)
+        elif error.shape != self.mean_squared_error.shape:
+            raise ValueError(
+                "All trials must have identical timestamps and state dof."
+            )
+
+        self.num_trials += 1
+        n = self.num_trials
+
+        delta = nees - self.average_nees
+        self.average_nees += delta / n
+        self._m2_nees += delta * (nees - self.average_nees)
+
+        delta = ees - self.average_ees
+        self.average_ees += delta / n
+        self._m2_ees += delta * (ees - self.average_ees)
+
+        self.mean_squared_error += (error**2 - self.mean_squared_error) / n
+
+    def merge(self, other: "MonteCarloAccumulator"):
+        """
+        Adds all the trials of another accumulator, for example one filled by
+        a different worker, using the pairwise update of Chan et al.
+        """
+        if other.num_trials == 0:
+            return
+        if self.num_trials == 0:
+            self.stamp = other.stamp
+            self.dof = other.dof
+            self.average_nees = other.average_nees.copy()
+            self.average_ees = other.average_ees.copy()
+            self.mean_squared_error = other.mean_squared_error.copy()
+            self._m2_nees = other._m2_nees.copy()
+            self._m2_ees = other._m2_ees.copy()
+            self.num_trials = other.num_trials
+            return
+        if other.mean_squared_error.shape != self.mean_squared_error.shape:
+            raise ValueError(
+                "All trials must have identical timestamps and state dof."
+            )
+
+        n_a = self.num_trials
+        n_b = other.num_trials
+        n = n_a + n_b
+        weight = n_a * n_b / n
+
+        delta = other.average_nees - self.average_nees
+        self.average_nees = self.average_nees + delta * n_b / n
+        self._m2_nees = self._m2_nees + other._m2_nees + delta**2 * weight
+
+        delta = other.average_ees - self.average_ees
+        self.average_ees = self.average_ees + delta * n_b / n
+        self._m2_ees = self._m2_ees + other._m2_ees + delta**2 * weight
+
+        self.mean_squared_error = (
+            n_a * self.mean_squared_error + n_b * other.mean_squared_error
+        ) / n
+        self.num_trials = n
+
+    @property
+    def rmse(self) -> np.ndarray:
+        """Root-mean-squared error of each component, with shape (N, dof)."""
+        return np.sqrt(self.mean_squared_error)
+
+    @property
+    def total_rmse(self) -> np.ndarray:
+        """Total RMSE throughout the trajectory, with shape (N,)."""
+        return np.sqrt(self.average_ees)
+
+    @property
+    def nees_variance(self) -> np.ndarray:
+        """Sample variance of the NEES across trials, with shape (N,)."""
+        return self._m2_nees / max(self.num_trials - 1, 1)
+
+    @property
+    def ees_variance(self) -> np.ndarray:
+        """Sample variance of the EES across trials, with shape (N,)."""
+        return self._m2_ees / max(self.num_trials - 1, 1)
+
+    @property
+    def average_nees_standard_error(self) -> np.ndarray:
+        """
+        Standard error of the average NEES, with shape (N,), which indicates
+        how well it has converged.
+        """
+        return np.sqrt(self.nees_variance / max(self.num_trials, 1))
+
+    def result(self) -> MonteCarloResult:
+        """
+        Returns a `MonteCarloResult` with the current statistics. Its
+        `trial_results` attribute is None.
+        """
+        if self.num_trials == 0:
+            raise ValueError("No trials have been added.")
+
+        return MonteCarloResult._from_statistics(
+            self.stamp,
+            self.dof,
+            self.num_trials,
+            self.average_nees.copy(),
+            self.mean_squared_error.copy(),
+        )
+
+
 def monte_carlo(
     trial: Callable[[int], GaussianResultList],
     num_trials: int,
     n_jobs: int = -1,
     verbose: int = 10,
+    seed: Union[int, np.random.SeedSequence] = None,
+    shared_memory: bool = False,
+    streaming: bool = False,
+    callback: Callable[[MonteCarloAccumulator], Any] = None,
 ) -> MonteCarloResult:
     """
     Monte-Carlo experiment executor. Give a callable `trial` function that
@@ -329,6 +700,28 @@ def monte_carlo(
         are printed. Above 50, the output is sent to stdout. The frequency
         of the messages increases with the verbosity level. If it more than
         10, all iterations are reported.
+    seed: int or np.random.SeedSequence, optional
+        If provided, one independent `NoiseSource` per trial is spawned from
+        this seed and passed to `trial` as a second argument, so that the
+        results are reproducible regardless of `n_jobs`. By default, `trial`
+        is only given the trial number.
+    shared_memory: bool, optional
+        If True, each worker writes the error, NEES and three-sigma arrays of
+        its trials directly into preallocated memory-mapped arrays instead of
+        sending the `GaussianResultList` back to the parent, which avoids
+        serializing the state objects. The first trial is run in the parent
+        to size the arrays, and all trials must have identical timestamps and
+        a constant dof. The returned result is built with
+        `MonteCarloResult.from_arrays` and has no `trial_results`. By default
+        False.
+    streaming: bool, optional
+        If True, the trial results are added to a `MonteCarloAccumulator` as
+        they complete and then discarded, so that memory use does not grow
+        with the number of trials. The returned result has no
+        `trial_results`. By default False.
+    callback: Callable[[MonteCarloAccumulator], Any], optional
+        With `streaming`, called with the accumulator after each trial, for
+        example to report the convergence of the statistics.
 
     Returns
     -------
@@ -338,14 +731,93 @@ def monte_carlo(
     trial_results = [None] * num_trials
 
     print("Starting Monte Carlo experiment...")
+    if seed is None:
+        trial_args = [(i,) for i in range(num_trials)]
+    else:
+        sources = NoiseSource(seed).spawn(num_trials)
+        trial_args = [(i, sources[i]) for i in range(num_trials)]
+
+    if shared_memory:
+        return _monte_carlo_shared(trial, trial_args, n_jobs, verbose)
+
+    if streaming:
+        accumulator = MonteCarloAccumulator()
+        results = Parallel(
+            n_jobs=n_jobs, verbose=verbose, return_as="generator_unordered"
+        )(delayed(trial)(*args) for args in trial_args)
+        for trial_result in results:
+            accumulator.add(trial_result)
+            if callback is not None:
+                callback(accumulator)
+        return accumulator.result()
+
     trial_results = Parallel(n_jobs=n_jobs, verbose=verbose)(
-        delayed(trial)(i) for i in range(num_trials)
+        delayed(trial)(*args) for args in trial_args
     )
 
     return MonteCarloResult(trial_results)
 
 
-def randvec(cov: np.ndarray, num_samples: int = 1) -> np.ndarray:
+_SHARED_FIELDS = ("error", "nees", "three_sigma")
+
+
+def _monte_carlo_shared(
+    trial: Callable, trial_args: List[tuple], n_jobs: int, verbose: int
+) -> MonteCarloResult:
+    """
+    Runs the trials with each worker writing its results into memory-mapped
+    arrays in a temporary directory. See `monte_carlo`.
+    """
+    first = trial(*trial_args[0])
+    if first.error.dtype == object or np.any(first.dof != first.dof[0]):
+        raise ValueError(
+            "Shared-memory Monte Carlo requires a constant state dof."
+        )
+
+    num_trials = len(trial_args)
+    directory = tempfile.mkdtemp(prefix="pynav_monte_carlo_")
+    try:
+        paths = {}
+        for name in _SHARED_FIELDS:
+            paths[name] = os.path.join(directory, name + ".npy")
+            shape = (num_trials,) + getattr(first, name).shape
+            np.lib.format.open_memmap(
+                paths[name], mode="w+", dtype=np.float64, shape=shape
+            )
+
+        _write_shared_trial(paths, 0, first)
+        Parallel(n_jobs=n_jobs, verbose=verbose)(
+            delayed(_run_shared_trial)(trial, trial_args[i], i, paths)
+            for i in range(1, num_trials)
+        )
+
+        arrays = {name: np.load(path) for name, path in paths.items()}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return MonteCarloResult.from_arrays(first.stamp, first.dof, **arrays)
+
+
+def _run_shared_trial(trial: Callable, args: tuple, i: int, paths: dict):
+    _write_shared_trial(paths, i, trial(*args))
+
+
+def _write_shared_trial(paths: dict, i: int, result: GaussianResultList):
+    for name, path in paths.items():
+        out = np.load(path, mmap_mode="r+")
+        value = getattr(result, name)
+        if value.shape != out.shape[1:]:
+            raise ValueError(
+                "All trials must have identical timestamps and state dof."
+            )
+        out[i] = value
+        out.flush()
+        del out
+
+
+def randvec(
+    cov: np.ndarray, num_samples: int = 1, noise_source: "NoiseSource" = None
+) -> np.ndarray:
     """
 
     Produces a random zero-mean column vector with covariance given by `cov`
@@ -357,8 +829,10 @@ def randvec(cov: np.ndarray, num_samples: int = 1) -> np.ndarray:
     num_samples : int, optional
         Will make `num_samples` independent random vectors and
         stack them horizontally, by default 1. It can be faster to generate
-        many samples this way to avoid recomputing the Cholesky decomposition
-        every time.
+        many samples this way to avoid the per-call overhead.
+    noise_source : NoiseSource, optional
+        Source of the random numbers. By default, the global `np.random`
+        state is used.
 
     Returns
     -------
@@ -366,8 +840,126 @@ def randvec(cov: np.ndarray, num_samples: int = 1) -> np.ndarray:
         Random column vector(s) with covariance `cov`
 
     """
-    L = np.linalg.cholesky(cov)
-    return L @ np.random.normal(0, 1, (cov.shape[0], num_samples))
+    if noise_source is not None:
+        return noise_source.randvec(cov, num_samples)
+
+    L = _default_cholesky_cache(cov)
+    return L @ np.random.normal(0, 1, (L.shape[0], num_samples))
+
+
+class _CholeskyCache:
+    """
+    Least-recently-used cache of Cholesky factors, keyed by the contents of
+    the covariance. Cached factors are read-only.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Any, np.ndarray]" = OrderedDict()
+
+    def __call__(self, cov: np.ndarray) -> np.ndarray:
+        cov = np.atleast_2d(np.asarray(cov, dtype=np.float64))
+        key = (cov.shape, cov.tobytes())
+        L = self._cache.get(key)
+        if L is None:
+            L = np.linalg.cholesky(cov)
+            L.flags.writeable = False
+            self._cache[key] = L
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return L
+
+
+_default_cholesky_cache = _CholeskyCache()
+
+
+class NoiseSource:
+    """
+    Source of Gaussian noise built on a `numpy.random.Generator`.
+
+    Cholesky factors are cached by covariance, and standard normal samples
+    are drawn from the generator in large blocks, so that drawing many small
+    noise vectors with the same handful of covariances, as when generating
+    data, is cheap. Independent streams for parallel Monte Carlo trials are
+    obtained with `spawn`, which makes results reproducible regardless of
+    how trials are scheduled.
+
+    Example
+    -------
+    .. code-block:: python
+
+        noise = NoiseSource(seed=42)
+        w = noise.randvec(Q)
+        trial_sources = noise.spawn(100)
+    """
+
+    def __init__(
+        self,
+        seed: Union[int, np.random.SeedSequence] = None,
+        block_size: int = 4096,
+    ):
+        """
+        Parameters
+        ----------
+        seed : int or np.random.SeedSequence, optional
+            Seed of the generator. By default, fresh entropy is used.
+        block_size : int, optional
+            Number of standard normal samples drawn at once, by default 4096.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        #:numpy.random.SeedSequence: seed of this source
+        self.seed_sequence = seed
+        #:numpy.random.Generator: underlying generator
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._cholesky = _CholeskyCache()
+        self._buffer = np.empty(0)
+        self._position = 0
+
+    def standard_normal(self, n: int, num_samples: int = 1) -> np.ndarray:
+        """
+        Draws an array of shape (n, num_samples) of independent standard
+        normal samples.
+        """
+        size = n * num_samples
+        if size > self.block_size:
+            return self.rng.standard_normal((n, num_samples))
+
+        if self._position + size > self._buffer.size:
+            self._buffer = self.rng.standard_normal(self.block_size)
+            self._position = 0
+
+        out = self._buffer[self._position : self._position + size]
+        self._position += size
+        return out.reshape((n, num_samples))
+
+    def cholesky(self, cov: np.ndarray) -> np.ndarray:
+        """
+        Returns the cached, read-only lower Cholesky factor of `cov`.
+        """
+        return self._cholesky(cov)
+
+    def randvec(self, cov: np.ndarray, num_samples: int = 1) -> np.ndarray:
+        """
+        Produces random zero-mean column vectors with covariance `cov`. See
+        the `randvec` function.
+        """
+        L = self.cholesky(cov)
+        return L @ self.standard_normal(L.shape[0], num_samples)
+
+    def spawn(self, n: int) -> List["NoiseSource"]:
+        """
+        Creates `n` statistically independent noise sources, for example one
+        per Monte Carlo trial.
+        """
+        return [
+            NoiseSource(seed, self.block_size)
+            for seed in self.seed_sequence.spawn(n)
+        ]
 
 
 def van_loans(
@@ -409,24 +1001,212 @@ def van_loans(
     Tuple[np.ndarray, np.ndarray]
         A_d and Q_d, discrete-time matrices.
     """
-    N = A_c.shape[0]
+    Xi = _van_loan_matrix(A_c, L_c, Q_c)
+    return _van_loan_extract(expm(Xi * dt))
 
+
+def _van_loan_matrix(
+    A_c: np.ndarray, L_c: np.ndarray, Q_c: np.ndarray
+) -> np.ndarray:
+    """
+    Forms the 2N x 2N matrix whose exponential contains the discrete-time
+    A and Q matrices.
+    """
     A_c = np.atleast_2d(A_c)
     L_c = np.atleast_2d(L_c)
     Q_c = np.atleast_2d(Q_c)
+    N = A_c.shape[0]
 
-    # Form Xi matrix and compute Upsilon using matrix exponential
-    Xi = block_diag(A_c, -A_c.T, A_c, np.zeros((N, N)))
-    Xi[:N, N : 2 * N] = L_c @ Q_c @ L_c.T
-    Upsilon = expm(Xi * dt)
+    Xi = np.zeros((2 * N, 2 * N))
+    Xi[:N, :N] = A_c
+    Xi[:N, N:] = L_c @ Q_c @ L_c.T
+    Xi[N:, N:] = -A_c.T
+    return Xi
 
-    # Extract relevant parts of Upsilon
-    A_d = Upsilon[:N, :N]
-    Q_d = Upsilon[:N, N : 2 * N] @ A_d.T
 
+def _van_loan_extract(Upsilon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extracts A_d and Q_d from the exponential of the Van Loan matrix, or from
+    a stack of them.
+    """
+    N = Upsilon.shape[-1] // 2
+    A_d = Upsilon[..., :N, :N]
+    Q_d = Upsilon[..., :N, N:] @ np.swapaxes(A_d, -1, -2)
     return A_d, Q_d
 
 
+class VanLoanDiscretizer:
+    """
+    Van Loan discretization with a least-recently-used cache of results,
+    keyed by the continuous-time matrices and the timestep. Repeated calls
+    with the same matrices and `dt`, as when a process model is discretized
+    at a constant rate, only cost a dictionary lookup.
+
+    The returned arrays are shared with the cache and are therefore
+    read-only.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Parameters
+        ----------
+        maxsize : int, optional
+            Maximum number of (matrices, dt) results kept, by default 128.
+        """
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Any, Tuple[np.ndarray, np.ndarray]]" = (
+            OrderedDict()
+        )
+        self._matrices: "OrderedDict[Any, np.ndarray]" = OrderedDict()
+        self._eigen: "OrderedDict[Any, Any]" = OrderedDict()
+        self._max_eigvec_condition = 1e6
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(
+        self,
+        A_c: np.ndarray,
+        L_c: np.ndarray,
+        Q_c: np.ndarray,
+        dt: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the discrete-time A and Q matrices. See `van_loans`.
+        """
+        key, Xi = self._get_matrix(A_c, L_c, Q_c)
+        result = self._lookup((key, float(dt)))
+        if result is None:
+            result = self._store((key, float(dt)), expm(Xi * dt))
+        return result
+
+    def batch(
+        self,
+        A_c: np.ndarray,
+        L_c: np.ndarray,
+        Q_c: np.ndarray,
+        dt: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the discrete-time A and Q matrices for an array of timesteps.
+        Each distinct timestep is only discretized once. Those missing from
+        the cache are computed together, from a single eigendecomposition of
+        the Van Loan matrix when it is diagonalizable, and otherwise with a
+        stacked matrix exponential.
+
+        Parameters
+        ----------
+        A_c : np.ndarray
+            Continuous-time A matrix.
+        L_c : np.ndarray
+            Continuous-time L matrix.
+        Q_c : np.ndarray
+            Continuous-time noise matrix
+        dt : np.ndarray with shape (K,)
+            Discretization timesteps.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            A_d and Q_d, with shape (K, N, N).
+        """
+        key, Xi = self._get_matrix(A_c, L_c, Q_c)
+        dt = np.asarray(dt, dtype=np.float64).ravel()
+        dt_unique, inverse = np.unique(dt, return_inverse=True)
+        N = Xi.shape[0] // 2
+
+        A_d = np.empty((dt_unique.size, N, N))
+        Q_d = np.empty((dt_unique.size, N, N))
+        missing = []
+        for i, dt_i in enumerate(dt_unique):
+            result = self._lookup((key, float(dt_i)))
+            if result is None:
+                missing.append(i)
+            else:
+                A_d[i], Q_d[i] = result
+
+        if missing:
+            Upsilon = self._expm_batch(key, Xi, dt_unique[missing])
+            A_new, Q_new = _van_loan_extract(Upsilon)
+            A_d[missing] = A_new
+            Q_d[missing] = Q_new
+            for i, Upsilon_i in zip(missing, Upsilon):
+                self._store((key, float(dt_unique[i])), Upsilon_i)
+
+        return A_d[inverse], Q_d[inverse]
+
+    def _expm_batch(self, key, Xi: np.ndarray, dt: np.ndarray) -> np.ndarray:
+        """
+        Stack of exp(Xi * dt_k). If Xi has a well-conditioned eigenvector
+        basis, it is decomposed once and every timestep only costs a diagonal
+        scaling. Otherwise, as for the nilpotent matrices of kinematic models,
+        a stacked matrix exponential is used.
+        """
+        eig = self._eigen.get(key)
+        if eig is None:
+            eigvals, V = np.linalg.eig(Xi)
+            if np.linalg.cond(V) < self._max_eigvec_condition:
+                eig = (eigvals, V, np.linalg.inv(V))
+            else:
+                eig = False
+            self._eigen[key] = eig
+            if len(self._eigen) > self.maxsize:
+                self._eigen.popitem(last=False)
+
+        if eig is False:
+            return expm(Xi[None, :, :] * dt[:, None, None])
+
+        eigvals, V, V_inv = eig
+        scale = np.exp(eigvals[None, :] * dt[:, None])
+        Upsilon = (V[None, :, :] * scale[:, None, :]) @ V_inv
+        return Upsilon.real
+
+    def clear(self):
+        """Empties the cache."""
+        self._cache.clear()
+        self._matrices.clear()
+        self._eigen.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_matrix(self, A_c, L_c, Q_c) -> Tuple[Any, np.ndarray]:
+        A_c = np.atleast_2d(np.asarray(A_c, dtype=np.float64))
+        L_c = np.atleast_2d(np.asarray(L_c, dtype=np.float64))
+        Q_c = np.atleast_2d(np.asarray(Q_c, dtype=np.float64))
+        key = (
+            A_c.shape,
+            L_c.shape,
+            A_c.tobytes(),
+            L_c.tobytes(),
+            Q_c.tobytes(),
+        )
+        Xi = self._matrices.get(key)
+        if Xi is None:
+            Xi = _van_loan_matrix(A_c, L_c, Q_c)
+            self._matrices[key] = Xi
+            if len(self._matrices) > self.maxsize:
+                self._matrices.popitem(last=False)
+        return key, Xi
+
+    def _lookup(self, key) -> Tuple[np.ndarray, np.ndarray]:
+        result = self._cache.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key, Upsilon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        A_d, Q_d = _van_loan_extract(Upsilon)
+        A_d = A_d.copy()
+        A_d.flags.writeable = False
+        Q_d.flags.writeable = False
+        self._cache[key] = (A_d, Q_d)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return A_d, Q_d
+
+
 def plot_error(
     results: GaussianResultList,
     axs: List[plt.Axes] = None,
@@ -678,6 +1458,206 @@ def set_axes_equal(ax: plt.Axes):
     ax.set_zlim3d([z_middle - length, z_middle + length])
 
 
+def _has_batch_methods(state_type: type, *names: str) -> bool:
+    """
+    Whether `state_type` has the batched counterparts `<name>_batch` of the
+    given methods, defined by the same class as the methods themselves. A
+    subclass that overrides `plus` or `minus` without overriding the batched
+    versions therefore does not use them.
+    """
+
+    def owner(name):
+        for cls in state_type.__mro__:
+            if name in cls.__dict__:
+                return cls
+        return None
+
+    return all(
+        owner(name + "_batch") is not None
+        and owner(name + "_batch") is owner(name)
+        for name in names
+    )
+
+
+class TrajectoryInterpolator:
+    """
+    Performs "linear" (geodesic) interpolation along a trajectory of `State`
+    objects, which is sorted and indexed once so that many queries can be
+    answered cheaply. Query points are located with a single
+    `np.searchsorted`. If all the states share a type with batched `plus` and
+    `minus` operations, such as `VectorState` or the `SO3State`, `SE3State`
+    and `SE23State` types, the increments between consecutive states are
+    computed once and the interpolation itself is vectorized.
+
+    If a query point is out of bounds, the end points are returned.
+
+    Example
+    -------
+    .. code-block:: python
+
+        interp = TrajectoryInterpolator(ground_truth)
+        states_true = interp([x.stamp for x in estimates])
+        values_true = interp.values(stamps)
+    """
+
+    def __init__(self, state_list: List[State]):
+        """
+        Parameters
+        ----------
+        state_list : List[State]
+            States to interpolate between, in any order.
+        """
+        stamps = np.array([x.stamp for x in state_list], dtype=np.float64)
+        order = np.argsort(stamps, kind="stable")
+
+        #:numpy.ndarray with shape (N,): sorted timestamps
+        self.stamps = stamps[order]
+        #:List[State]: states sorted by timestamp
+        self.states: List[State] = [state_list[i] for i in order]
+
+        first = self.states[0]
+        self._direction = getattr(first, "direction", None)
+        self._state_type = type(first)
+        self._batch = self._supports_batch()
+
+        self._values = None
+        self._increments = None
+        if self._batch:
+            self._values = np.array([x.value for x in self.states])
+            if len(self.states) > 1:
+                self._increments = self._state_type.minus_batch(
+                    self._values[1:], self._values[:-1], self._direction
+                )
+
+    def _supports_batch(self) -> bool:
+        state_type = self._state_type
+        if not _has_batch_methods(state_type, "plus", "minus"):
+            return False
+        if getattr(state_type, "_exp_batch", True) is None:
+            return False
+        return all(
+            type(x) is state_type
+            and getattr(x, "direction", None) == self._direction
+            and x.dof == self.states[0].dof
+            for x in self.states
+        )
+
+    def _locate(self, stamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the index of the state just before each query, and the
+        fraction of the way to the next state. The fraction is NaN where the
+        state before should be returned as is.
+        """
+        n = self.stamps.size
+        idx = np.searchsorted(self.stamps, stamps, side="right") - 1
+        idx = np.clip(idx, 0, n - 1)
+        idx_upper = np.minimum(idx + 1, n - 1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            alpha = (stamps - self.stamps[idx]) / (
+                self.stamps[idx_upper] - self.stamps[idx]
+            )
+        invalid = ~np.isfinite(alpha) | (alpha < 0.0) | (idx_upper == idx)
+        alpha[invalid] = np.nan
+        return idx, alpha
+
+    @staticmethod
+    def _as_stamps(stamps) -> Tuple[np.ndarray, bool]:
+        if isinstance(stamps, np.ndarray):
+            return stamps.astype(np.float64).ravel(), stamps.ndim == 0
+
+        single_query = not isinstance(stamps, (list, tuple))
+        if single_query:
+            stamps = [stamps]
+
+        out = np.empty(len(stamps))
+        for i, stamp in enumerate(stamps):
+            if hasattr(stamp, "stamp"):
+                stamp = stamp.stamp
+            elif not isinstance(stamp, (float, int, np.number)):
+                raise TypeError(
+                    "Stamps must be of type float or have a stamp attribute"
+                )
+            out[i] = stamp
+        return out, single_query
+
+    def values(
+        self, stamps: Union[float, List[float], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Interpolated state values at the query stamps, stacked in an array
+        with shape (K, ...), without creating any `State` object. Only
+        available when the trajectory supports batched operations.
+        """
+        if not self._batch:
+            raise NotImplementedError(
+                "Batched interpolation is not available for these states."
+            )
+
+        stamps, _ = self._as_stamps(stamps)
+        idx, alpha = self._locate(stamps)
+        out = self._values[idx].copy()
+        valid = np.isfinite(alpha)
+        if np.any(valid):
+            dx = alpha[valid, None] * self._increments[idx[valid]]
+            out[valid] = self._state_type.plus_batch(
+                self._values[idx[valid]], dx, self._direction
+            ).reshape(out[valid].shape)
+        return out
+
+    def __call__(
+        self, stamps: Union[float, List[float], Any]
+    ) -> Union[State, List[State]]:
+        """
+        Interpolates the trajectory.
+
+        Parameters
+        ----------
+        stamps : Union[float, List[float], Any]
+            Query stamps. Can either be a float, or an object containing a
+            `stamp` attribute. If a list or array is provided, it will be
+            treated as multiple query points and the return value will be a
+            list of `State` objects.
+
+        Returns
+        -------
+        `State` or List[`State`]
+            The interpolated state(s).
+
+        Raises
+        ------
+        TypeError
+            If query point is not a float or object with a `stamp` attribute.
+        """
+        stamps, single_query = self._as_stamps(stamps)
+        idx, alpha = self._locate(stamps)
+
+        if self._batch:
+            values = self.values(stamps)
+            out = []
+            for i, k in enumerate(idx):
+                x = self.states[k].copy()
+                x.value = values[i]
+                x.stamp = stamps[i]
+                out.append(x)
+        else:
+            out = []
+            for i, k in enumerate(idx):
+                x = self.states[k]
+                if np.isnan(alpha[i]):
+                    x = x.copy()
+                else:
+                    dx = self.states[k + 1].minus(x).ravel()
+                    x = x.plus(dx * alpha[i])
+                x.stamp = stamps[i]
+                out.append(x)
+
+        if single_query:
+            out = out[0]
+
+        return out
+
+
 def state_interp(
     stamps: Union[float, List[float], Any], state_list: List[State]
 ) -> Union[State, List[State]]:
@@ -686,6 +1666,9 @@ def state_interp(
     interpolations can be performed at once in a vectorized fashion. If the
     query point is out of bounds, the end points are returned.
 
+    To query the same trajectory many times, build a `TrajectoryInterpolator`
+    once instead.
+
     Parameters
     ----------
     stamps : Union[float, List[float], Any]
@@ -705,69 +1688,7 @@ def state_interp(
     TypeError
         If query point is not a float or object with a `stamp` attribute.
     """
-    # TODO: add tests
-    # Handle input
-    if not isinstance(stamps, list):
-        stamps = [stamps]
-        single_query = True
-    else:
-        single_query = False
-
-    stamps = stamps.copy()
-    for i, stamp in enumerate(stamps):
-        if not isinstance(stamp, float):
-            if hasattr(stamp, "stamp"):
-                stamp = stamp.stamp
-                stamps[i] = stamp
-            else:
-                raise TypeError(
-                    "Stamps must be of type float or have a stamp attribute"
-                )
-
-    # Get the indices of the states just before and just after.
-    state_list = np.array(state_list)
-    stamp_list = [state.stamp for state in state_list]
-    stamp_list.sort()
-    stamp_list = np.array(stamp_list)
-    idx_middle = np.interp(stamps, stamp_list, np.array(range(len(stamp_list))))
-    idx_lower = np.floor(idx_middle).astype(int)
-    idx_upper = idx_lower + 1
-
-    # Return endpoint if out of bounds
-    idx_upper[idx_upper == len(state_list)] = len(state_list) - 1
-
-    # Do the interpolation
-    stamp_lower = stamp_list[idx_lower]
-    stamp_upper = stamp_list[idx_upper]
-
-    # "Fraction" of the way between the two states
-    alpha = np.array(
-        (stamps - stamp_lower) / (stamp_upper - stamp_lower)
-    ).ravel()
-
-    # The two neighboring states around the query point
-    state_lower: List[State] = np.array(state_list[idx_lower]).ravel()
-    state_upper: List[State] = np.array(state_list[idx_upper]).ravel()
-
-    # Interpolate between the two states
-    dx = np.array(
-        [s.minus(state_lower[i]).ravel() for i, s in enumerate(state_upper)]
-    )
-
-    out = []
-    for i, state in enumerate(state_lower):
-        if np.isnan(alpha[i]) or np.isinf(alpha[i]) or alpha[i] < 0.0:
-            state_interp = state.copy()
-        else:
-            state_interp = state.plus(dx[i] * alpha[i])
-
-        state_interp.stamp = stamps[i]
-        out.append(state_interp)
-
-    if single_query:
-        out = out[0]
-
-    return out
+    return TrajectoryInterpolator(state_list)(stamps)
 
 
 def associate_stamps(
@@ -781,7 +1702,10 @@ def associate_stamps(
     Returns a sorted list of matches, of length of the smallest of
     first_stamps and second_stamps.
 
-    Function taken from rpg_trajectory_evaluation toolbox.
+    Function taken from rpg_trajectory_evaluation toolbox. Pairs closer than
+    `max_difference` are matched greedily, closest first. Candidate pairs
+    are found by binary search, so the cost is O((N + M) log M) when each
+    stamp only has a few candidates, rather than O(N M).
 
     Parameters
     ----------
@@ -800,21 +1724,41 @@ def associate_stamps(
     List[Tuple[int, int]]
         Sorted list of matches in the form (match_first_idx, match_second_idx).
     """
-    potential_matches = [
-        (abs(a - (b + offset)), idx_a, idx_b)
-        for idx_a, a in enumerate(first_stamps)
-        for idx_b, b in enumerate(second_stamps)
-        if abs(a - (b + offset)) < max_difference
-    ]
-    potential_matches.sort()  # prefer the closest
+    first = np.asarray(first_stamps, dtype=np.float64).ravel()
+    second = np.asarray(second_stamps, dtype=np.float64).ravel() + offset
+    if first.size == 0 or second.size == 0:
+        return []
+
+    # Candidate pairs are found with a binary search of each first stamp in
+    # the sorted second stamps. The windows are widened by one element on
+    # each side, and the exact original criterion is then applied, so that
+    # rounding at the window edges cannot change which pairs are candidates.
+    order = np.argsort(second, kind="stable")
+    second_sorted = second[order]
+    lo = np.searchsorted(second_sorted, first - max_difference, side="left")
+    hi = np.searchsorted(second_sorted, first + max_difference, side="right")
+    lo = np.maximum(lo - 1, 0)
+    hi = np.minimum(hi + 1, second.size)
+    counts = np.maximum(hi - lo, 0)
+
+    idx_a = np.repeat(np.arange(first.size), counts)
+    start = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    idx_b = order[start + np.arange(idx_a.size)]
+
+    diff = np.abs(first[idx_a] - second[idx_b])
+    keep = diff < max_difference
+    diff, idx_a, idx_b = diff[keep], idx_a[keep], idx_b[keep]
+
+    # Prefer the closest, breaking ties by index as a sort of tuples would.
+    ranked = np.lexsort((idx_b, idx_a, diff))
+    first_used = np.zeros(first.size, dtype=bool)
+    second_used = np.zeros(second.size, dtype=bool)
     matches = []
-    first_idxes = list(range(len(first_stamps)))
-    second_idxes = list(range(len(second_stamps)))
-    for diff, idx_a, idx_b in potential_matches:
-        if idx_a in first_idxes and idx_b in second_idxes:
-            first_idxes.remove(idx_a)
-            second_idxes.remove(idx_b)
-            matches.append((int(idx_a), int(idx_b)))
+    for a, b in zip(idx_a[ranked].tolist(), idx_b[ranked].tolist()):
+        if not first_used[a] and not second_used[b]:
+            first_used[a] = True
+            second_used[b] = True
+            matches.append((a, b))
 
     matches.sort()
     return matches
@@ -0,0 +1,70 @@
+"""
+Scaling benchmark of pynav.utils.associate_stamps, matching a 100 Hz log
+against a 200 Hz log of increasing duration. The previous all-pairs
+implementation is timed on the shorter logs for comparison. Run as a script:
+
+    python tests/benchmarks/bench_associate_stamps.py
+"""
+import time
+import numpy as np
+from pynav.utils import associate_stamps
+
+np.random.seed(0)
+
+
+def _associate_stamps_all_pairs(
+    first_stamps, second_stamps, offset=0.0, max_difference=0.02
+):
+    potential_matches = [
+        (abs(a - (b + offset)), idx_a, idx_b)
+        for idx_a, a in enumerate(first_stamps)
+        for idx_b, b in enumerate(second_stamps)
+        if abs(a - (b + offset)) < max_difference
+    ]
+    potential_matches.sort()
+    matches = []
+    first_idxes = list(range(len(first_stamps)))
+    second_idxes = list(range(len(second_stamps)))
+    for diff, idx_a, idx_b in potential_matches:
+        if idx_a in first_idxes and idx_b in second_idxes:
+            first_idxes.remove(idx_a)
+            second_idxes.remove(idx_b)
+            matches.append((int(idx_a), int(idx_b)))
+    matches.sort()
+    return matches
+
+
+def _make_stamps(duration: float, freq: float) -> list:
+    stamps = np.arange(0, duration, 1 / freq)
+    return list(stamps + np.random.uniform(-1e-3, 1e-3, stamps.size))
+
+
+def bench_scaling(max_all_pairs_duration: float = 20.0):
+    print(
+        f"{'duration':>10} {'N + M':>10} {'time':>10} "
+        f"{'us / stamp':>12} {'all pairs':>10}"
+    )
+    for duration in [10.0, 20.0, 60.0, 600.0, 3600.0]:
+        first = _make_stamps(duration, 100)
+        second = _make_stamps(duration, 200)
+        n = len(first) + len(second)
+
+        start = time.perf_counter()
+        matches = associate_stamps(first, second)
+        elapsed = time.perf_counter() - start
+
+        reference = ""
+        if duration <= max_all_pairs_duration:
+            start = time.perf_counter()
+            matches_ref = _associate_stamps_all_pairs(first, second)
+            reference = f"{time.perf_counter() - start:9.2f}s"
+            assert matches == matches_ref
+
+        print(
+            f"{duration:9.0f}s {n:10d} {elapsed:9.3f}s "
+            f"{1e6 * elapsed / n:12.2f} {reference:>10}"
+        )
+
+
+if __name__ == "__main__":
+    bench_scaling()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the fast mode of pynav.datagen.DataGenerator against the
+default step-by-step generation, for an SE(2) robot with body-frame velocity
+inputs at 100 Hz and range measurements to several anchors, over simulations
+of increasing duration. Run as a script:
+
+    python tests/benchmarks/bench_datagen.py
+"""
+import time
+import numpy as np
+from pylie import SE2
+from pynav.datagen import DataGenerator
+from pynav.lib.models import BodyFrameVelocity, RangePoseToAnchor
+from pynav.lib.states import SE2State
+
+np.random.seed(0)
+
+Q = np.diag([0.1**2, 0.1**2, 0.01**2])
+anchors = [[0, 4], [-2, 0], [2, 0], [0, 2]]
+
+
+def input_profile(t, x):
+    return np.array([np.sin(0.1 * t), 1, 0])
+
+
+def vectorized_input_profile(t, x):
+    return np.column_stack(
+        [np.sin(0.1 * t), np.ones_like(t), np.zeros_like(t)]
+    )
+
+
+def _make_generator(fast: bool, meas_freq: float) -> DataGenerator:
+    return DataGenerator(
+        BodyFrameVelocity(Q),
+        vectorized_input_profile if fast else input_profile,
+        Q,
+        100,
+        [RangePoseToAnchor(a, [0.17, 0.17], 0.1**2) for a in anchors],
+        meas_freq,
+        vectorized_input=fast,
+    )
+
+
+def bench_generate(meas_freq: float = 50):
+    x0 = SE2State(SE2.Exp([0, 0, 0]), stamp=0.0)
+    print(
+        f"{'duration':>10} {'inputs':>8} {'meas':>8} "
+        f"{'default':>10} {'fast':>10} {'speedup':>8}"
+    )
+    for duration in [10.0, 60.0, 300.0]:
+        start = time.perf_counter()
+        _, inputs, meas = _make_generator(False, meas_freq).generate(
+            x0, 0, duration, noise=True
+        )
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _make_generator(True, meas_freq).generate(
+            x0, 0, duration, noise=True, fast=True
+        )
+        elapsed_fast = time.perf_counter() - start
+
+        print(
+            f"{duration:9.0f}s {len(inputs):8d} {len(meas):8d} "
+            f"{elapsed:9.2f}s {elapsed_fast:9.2f}s "
+            f"{elapsed / elapsed_fast:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    bench_generate()
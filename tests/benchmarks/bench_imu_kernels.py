@@ -0,0 +1,111 @@
+"""
+Micro-benchmarks for the IMU kernels N_matrix, M_matrix and L_matrix in
+pynav.lib.imu, compared with direct evaluations of the series and of Barfoot
+2nd edition, equation 9.247 with pylie. Run as a script:
+
+    python tests/benchmarks/bench_imu_kernels.py
+"""
+import timeit
+from math import factorial
+import numpy as np
+from pylie import SO3, SE23
+from pynav.lib.imu import N_matrix, M_matrix, L_matrix
+
+np.random.seed(0)
+
+
+def _report(name: str, t_ref: float, t_new: float, n: int):
+    print(
+        f"{name:<32} reference: {1e6 * t_ref / n:8.2f} us   "
+        f"kernel: {1e6 * t_new / n:8.2f} us   "
+        f"speedup: {t_ref / t_new:6.1f}x"
+    )
+
+
+def M_matrix_series(phi):
+    phi_mat = SO3.wedge(phi)
+    return np.sum(
+        [
+            (2 / factorial(n + 2)) * np.linalg.matrix_power(phi_mat, n)
+            for n in range(100)
+        ],
+        axis=0,
+    )
+
+
+def N_matrix_reference(phi_vec):
+    phi = np.linalg.norm(phi_vec)
+    a = (phi_vec / phi).reshape((-1, 1))
+    c = (1 - np.cos(phi)) / phi**2
+    s = (phi - np.sin(phi)) / phi**2
+    return 2 * c * np.identity(3) + (1 - 2 * c) * (a @ a.T) + 2 * s * SO3.wedge(a)
+
+
+def L_matrix_reference(om, a, dt):
+    omdt = om * dt
+    J_att_inv_times_N = SO3.left_jacobian_inv(omdt) @ N_matrix_reference(omdt)
+    xi = np.zeros((9,))
+    xi[:3] = dt * om
+    xi[3:6] = dt * a
+    xi[6:9] = (dt**2 / 2) * J_att_inv_times_N @ a
+    J = SE23.left_jacobian(-xi)
+    Om = SO3.wedge(omdt)
+    OmOm = Om @ Om
+    A = SO3.wedge(a)
+    Up = dt * np.eye(9, 6)
+    Up[6:9, 0:3] = (
+        -0.5
+        * (dt**2 / 2)
+        * (
+            (1 / 360)
+            * (dt**3)
+            * (OmOm @ A + Om @ (SO3.wedge(Om @ a)) + SO3.wedge(OmOm @ a))
+            - (1 / 6) * dt * A
+        )
+    )
+    Up[6:9, 3:6] = (dt**2 / 2) * J_att_inv_times_N
+    return J @ Up
+
+
+def bench_single(number: int = 2000):
+    print(f"Single sample, per call ({number} calls)")
+    om = np.random.normal(size=3)
+    a = np.random.normal(size=3)
+    dt = 0.01
+    phi = om * dt
+    cases = [
+        ("N_matrix", lambda: N_matrix_reference(phi), lambda: N_matrix(phi)),
+        ("M_matrix", lambda: M_matrix_series(phi), lambda: M_matrix(phi)),
+        (
+            "L_matrix",
+            lambda: L_matrix_reference(om, a, dt),
+            lambda: L_matrix(om, a, dt),
+        ),
+    ]
+    for name, ref, new in cases:
+        t_ref = timeit.timeit(ref, number=number)
+        t_new = timeit.timeit(new, number=number)
+        _report(name, t_ref, t_new, number)
+
+
+def bench_batch(K: int = 10000):
+    print(f"\nStack of K={K} IMU samples, per sample")
+    om = np.random.normal(size=(K, 3))
+    a = np.random.normal(size=(K, 3))
+    dt = np.full(K, 0.01)
+    t_ref = timeit.timeit(
+        lambda: [N_matrix_reference(om[i] * dt[i]) for i in range(K)], number=1
+    )
+    t_new = timeit.timeit(lambda: N_matrix(om * dt[:, None]), number=1)
+    _report("N_matrix", t_ref, t_new, K)
+    t_ref = timeit.timeit(
+        lambda: [L_matrix_reference(om[i], a[i], dt[i]) for i in range(K)],
+        number=1,
+    )
+    t_new = timeit.timeit(lambda: L_matrix(om, a, dt), number=1)
+    _report("L_matrix", t_ref, t_new, K)
+
+
+if __name__ == "__main__":
+    bench_single()
+    bench_batch()
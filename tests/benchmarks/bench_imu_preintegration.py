@@ -0,0 +1,50 @@
+"""
+Benchmark of IMUIncrement.preintegrate, in sequential and tree-reduction
+modes, against repeated calls to IMUIncrement.increment, with and without
+bias estimation in the RMI. Run as a script:
+
+    python tests/benchmarks/bench_imu_preintegration.py
+"""
+import timeit
+import numpy as np
+from pynav.lib.imu import IMU
+from pynav.lib.preintegration import IMUIncrement
+
+np.random.seed(0)
+
+
+def _run_increment(gyro, accel, dt, Q):
+    rmi = IMUIncrement(Q, [0, 0, 0], [0, 0, 0])
+    for k in range(gyro.shape[0]):
+        rmi.increment(IMU(gyro[k], accel[k], k * dt), dt)
+    return rmi
+
+
+def _run_preintegrate(gyro, accel, dt, Q, tree):
+    rmi = IMUIncrement(Q, [0, 0, 0], [0, 0, 0])
+    rmi.preintegrate(gyro, accel, dt, stamp=0.0, tree=tree)
+    return rmi
+
+
+def bench(Q: np.ndarray, N: int = 2000, number: int = 3):
+    gyro = np.random.normal(size=(N, 3))
+    accel = np.random.normal(size=(N, 3))
+    dt = 0.005
+    t_ref = timeit.timeit(lambda: _run_increment(gyro, accel, dt, Q), number=number)
+    print(f"N={N} samples, {Q.shape[0]} x {Q.shape[0]} Q, per sample")
+    print(f"{'increment loop':<24} {1e6 * t_ref / (number * N):8.2f} us")
+    for tree in [False, True]:
+        t = timeit.timeit(
+            lambda: _run_preintegrate(gyro, accel, dt, Q, tree), number=number
+        )
+        name = "preintegrate (tree)" if tree else "preintegrate"
+        print(
+            f"{name:<24} {1e6 * t / (number * N):8.2f} us   "
+            f"speedup: {t_ref / t:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    bench(np.identity(12))
+    print()
+    bench(np.identity(6))
@@ -0,0 +1,69 @@
+"""
+Micro-benchmarks comparing the closed-form kernels in pynav.lib.lie_kernels
+with the generic pylie implementation. Run as a script:
+
+    python tests/benchmarks/bench_lie_kernels.py
+"""
+import timeit
+import numpy as np
+from pylie import SO3, SE3, SE23
+from pynav.lib import lie_kernels as lk
+
+np.random.seed(0)
+
+
+def _report(name: str, t_ref: float, t_new: float, n: int):
+    print(
+        f"{name:<32} pylie: {1e6 * t_ref / n:8.2f} us   "
+        f"kernel: {1e6 * t_new / n:8.2f} us   "
+        f"speedup: {t_ref / t_new:6.1f}x"
+    )
+
+
+def bench_single(number: int = 2000):
+    print(f"Single element, per call ({number} calls)")
+    cases = [
+        ("SO3 Exp", SO3.Exp, lk.so3_exp, 3),
+        ("SO3 right_jacobian", SO3.right_jacobian, lk.so3_right_jacobian, 3),
+        ("SE3 Exp", SE3.Exp, lk.se3_exp, 6),
+        ("SE3 right_jacobian", SE3.right_jacobian, lk.se3_right_jacobian, 6),
+        ("SE3 right_jacobian_inv", SE3.right_jacobian_inv, lk.se3_right_jacobian_inv, 6),
+        ("SE23 Exp", SE23.Exp, lk.se23_exp, 9),
+        ("SE23 right_jacobian", SE23.right_jacobian, lk.se23_right_jacobian, 9),
+        ("SE23 right_jacobian_inv", SE23.right_jacobian_inv, lk.se23_right_jacobian_inv, 9),
+    ]
+    for name, ref, new, dof in cases:
+        xi = np.random.normal(size=dof)
+        t_ref = timeit.timeit(lambda: ref(xi), number=number)
+        t_new = timeit.timeit(lambda: new(xi), number=number)
+        _report(name, t_ref, t_new, number)
+
+    for name, group, log, dof in [
+        ("SO3 Log", SO3, lk.so3_log, 3),
+        ("SE3 Log", SE3, lk.se3_log, 6),
+        ("SE23 Log", SE23, lk.se23_log, 9),
+    ]:
+        X = group.Exp(np.random.normal(size=dof))
+        t_ref = timeit.timeit(lambda: group.Log(X), number=number)
+        t_new = timeit.timeit(lambda: log(X), number=number)
+        _report(name, t_ref, t_new, number)
+
+
+def bench_batch(N: int = 10000):
+    print(f"\nStack of N={N} elements, per element")
+    for name, group, exp, jac, dof in [
+        ("SE3 Exp", SE3, lk.se3_exp, lk.se3_right_jacobian, 6),
+        ("SE23 Exp", SE23, lk.se23_exp, lk.se23_right_jacobian, 9),
+    ]:
+        xi = np.random.normal(size=(N, dof))
+        t_ref = timeit.timeit(lambda: [group.Exp(x) for x in xi], number=1)
+        t_new = timeit.timeit(lambda: exp(xi), number=1)
+        _report(name, t_ref, t_new, N)
+        t_ref = timeit.timeit(lambda: [group.right_jacobian(x) for x in xi], number=1)
+        t_new = timeit.timeit(lambda: jac(xi), number=1)
+        _report(name.replace("Exp", "right_jacobian"), t_ref, t_new, N)
+
+
+if __name__ == "__main__":
+    bench_single()
+    bench_batch()
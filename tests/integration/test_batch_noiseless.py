@@ -10,12 +10,15 @@ from pynav.lib.models import (
     Magnetometer,
     Gravitometer,
     SingleIntegrator,
+    PointRelativePosition,
 )
+from pynav.lib.imu import IMU, IMUState, IMUKinematics
+from pynav.lib.preintegration import IMUIncrement, PreintegratedIMUKinematics
 from pynav.datagen import DataGenerator
 from pynav.filters import ExtendedKalmanFilter, run_filter
 from pynav.utils import GaussianResult, GaussianResultList, plot_error, randvec
 from pynav.batch import BatchEstimator
-from pylie import SO3, SE3
+from pylie import SO3, SE3, SE23
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -122,3 +125,57 @@ def test_noiseless_batch(
     if plot_flag:
         fig, ax = plot_error(results)
         plt.show()
+
+
+def test_noiseless_batch_imu_keyframes():
+    Q = np.identity(12)
+    Q[0:3, 0:3] *= 0.01**2
+    Q[3:6, 3:6] *= 0.1**2
+    Q[6:9, 6:9] *= 0.0001**2
+    Q[9:12, 9:12] *= 0.001**2
+    R = 0.1**2 * np.identity(3)
+    landmarks = [[3, 0, 0], [0, 3, 0], [-3, 0, 1], [0, -3, 2], [1, 1, 3]]
+
+    def input_profile(t, x):
+        return IMU([0, 0, -1.0], [0.1 * np.sin(t), -1.0, 9.80665], t)
+
+    x0 = IMUState(
+        SE23.from_components(np.identity(3), [1, 0, 0], [0, 0, 0]),
+        np.zeros(3),
+        np.zeros(3),
+        stamp=0.0,
+    )
+    P0 = np.identity(15) * 0.01**2
+
+    # Measurements between the keyframes, at which states are also created.
+    dg = DataGenerator(
+        IMUKinematics(Q),
+        input_profile,
+        Q,
+        100,
+        [PointRelativePosition(l, R) for l in landmarks],
+        4,
+    )
+    state_true, input_list, meas_list = dg.generate(x0, 0, 5, False)
+    keyframe_stamps = list(np.arange(0.1, 4.75, 0.5))
+    meas_stamps = [meas.stamp for meas in meas_list]
+    stamps = np.unique(np.round([0.0] + keyframe_stamps + meas_stamps, 12))
+
+    estimator = BatchEstimator(max_iters=20)
+    estimate_list = estimator.solve(
+        x0,
+        P0,
+        input_list,
+        meas_list,
+        PreintegratedIMUKinematics(),
+        rmi=IMUIncrement(Q, np.zeros(3), np.zeros(3)),
+        keyframe_stamps=keyframe_stamps,
+    )
+
+    true_stamps = np.array([x.stamp for x in state_true])
+    assert len(estimate_list) == len(stamps)
+    for estimate in estimate_list:
+        idx = np.argmin(np.abs(true_stamps - estimate.state.stamp))
+        assert np.isclose(true_stamps[idx], estimate.state.stamp)
+        error = estimate.state.minus(state_true[idx])
+        assert np.allclose(error, 0, atol=1e-5)
@@ -1,6 +1,27 @@
 import numpy as np
+import pytest
 from pynav.utils import associate_stamps
 
+
+def _associate_stamps_brute_force(first, second, offset, max_difference):
+    potential_matches = [
+        (abs(a - (b + offset)), idx_a, idx_b)
+        for idx_a, a in enumerate(first)
+        for idx_b, b in enumerate(second)
+        if abs(a - (b + offset)) < max_difference
+    ]
+    potential_matches.sort()
+    matches = []
+    first_idxes = list(range(len(first)))
+    second_idxes = list(range(len(second)))
+    for diff, idx_a, idx_b in potential_matches:
+        if idx_a in first_idxes and idx_b in second_idxes:
+            first_idxes.remove(idx_a)
+            second_idxes.remove(idx_b)
+            matches.append((int(idx_a), int(idx_b)))
+    matches.sort()
+    return matches
+
 def test_associate_stamps():
     freq_stamps_1 = 180
     freq_stamps_2 = 50
@@ -13,5 +34,26 @@ def test_associate_stamps():
     assert len(matches) == len(stamps_2)
 
 
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("offset", [0.0, 0.013])
+def test_associate_stamps_matches_brute_force(seed, offset):
+    rng = np.random.default_rng(seed)
+    # Unsorted stamps on a coarse grid, so that there are duplicates and
+    # ties in the differences.
+    stamps_1 = list(np.round(rng.uniform(0, 2, 150), 2))
+    stamps_2 = list(np.round(rng.uniform(0, 2, 90), 2))
+    for max_difference in [0.005, 0.02, 0.1]:
+        assert associate_stamps(
+            stamps_1, stamps_2, offset, max_difference
+        ) == _associate_stamps_brute_force(
+            stamps_1, stamps_2, offset, max_difference
+        )
+
+
+def test_associate_stamps_empty():
+    assert associate_stamps([], [0.0, 1.0]) == []
+    assert associate_stamps([0.0], [5.0]) == []
+
+
 if __name__ == "__main__":
     test_associate_stamps()
\ No newline at end of file
@@ -1,6 +1,15 @@
-from pynav.lib.camera import Camera, PoseMatrix
+from pynav.lib.camera import (
+    Camera,
+    PoseMatrix,
+    PixelLandmark,
+    CameraLandmark,
+    CameraLandmarks,
+)
+from pynav.lib.imu import IMUState
+from pynav.lib.states import SE3State, SE23State, VectorState, CompositeState
 import numpy as np
-from pylie import SE3
+import pytest
+from pylie import SE3, SE23
 
 
 def test_valid_measurements():
@@ -78,5 +87,142 @@ def test_camera_intrinsics():
     assert K[1, 2] == cv
 
 
+def test_project_jacobian():
+    camera = Camera(385, 385, 323, 236, 480, 640, 0.1)
+    r_pc_c = np.array([0.3, -0.2, 2.0])
+    jac = camera.project_jacobian(r_pc_c)
+    jac_fd = np.zeros((2, 3))
+    for i in range(3):
+        dr = np.zeros(3)
+        dr[i] = 1e-6
+        jac_fd[:, i] = (camera.project(r_pc_c + dr) - camera.project(r_pc_c)) / 1e-6
+    assert np.allclose(jac, jac_fd, atol=1e-3)
+
+
+@pytest.mark.parametrize("direction", ["right", "left"])
+@pytest.mark.parametrize(
+    "pose",
+    [
+        SE3State(SE3.Exp([0.1, -0.2, 0.1, 0.3, 0.1, -0.5]), state_id="p"),
+        SE23State(
+            SE23.Exp([0.1, -0.2, 0.1, 1, 2, 3, 0.3, 0.1, -0.5]), state_id="p"
+        ),
+    ],
+)
+def test_pixel_landmark_jacobian(pose, direction):
+    C_bc = Camera.get_enu_to_cam()
+    T_bc = PoseMatrix(SE3.from_components(C_bc, np.array([0.1, 0, 0.05])))
+    camera = Camera(385, 385, 323, 236, 480, 640, 0.1, T_bc)
+    pose = pose.copy()
+    pose.direction = direction
+    x = CompositeState(
+        [pose, VectorState([5.0, 0.5, -0.3], state_id="l")]
+    )
+    model = PixelLandmark(camera, "p", "l")
+    jac = model.jacobian(x)
+    assert np.allclose(jac, model.jacobian_sparse(x).toarray())
+    assert np.allclose(jac, model.jacobian_fd(x), atol=1e-3)
+
+
+@pytest.mark.parametrize("direction", ["right", "left"])
+def test_batch_matches_single(direction):
+    C_bc = Camera.get_enu_to_cam()
+    T_bc = PoseMatrix(SE3.from_components(C_bc, np.array([0.1, 0, 0.05])))
+    camera = Camera(385, 385, 323, 236, 480, 640, 0.1, T_bc)
+    pose = SE3State(
+        SE3.Exp([0.1, -0.2, 0.1, 0.3, 0.1, -0.5]),
+        state_id="p",
+        direction=direction,
+    )
+    landmarks = np.random.normal(size=(50, 3)) * [5, 2, 2] + [3, 0, 0]
+
+    uv, valid, jac_pose, jac_landmark = camera.evaluate_batch_with_jacobians(
+        pose, landmarks
+    )
+    assert np.allclose(uv, camera.evaluate_batch(pose, landmarks))
+    for i, r_pw_a in enumerate(landmarks):
+        assert np.allclose(uv[i], camera.evaluate(pose, r_pw_a))
+        assert valid[i] == (
+            camera.is_landmark_in_front_of_cam(pose, r_pw_a)
+            and camera.is_measurement_valid(uv[i])
+        )
+        x = CompositeState([pose, VectorState(r_pw_a, state_id="l")])
+        jac = PixelLandmark(camera, "p", "l").jacobian(x)
+        assert np.allclose(jac_pose[i], jac[:, :6])
+        assert np.allclose(jac_landmark[i], jac[:, 6:])
+
+    in_front = camera.is_landmark_in_front_of_cam_batch(pose, landmarks)
+    assert not np.all(in_front) and np.any(in_front)
+
+
+def _distorted_camera():
+    C_bc = Camera.get_enu_to_cam()
+    T_bc = PoseMatrix(SE3.from_components(C_bc, np.array([0.1, 0, 0.05])))
+    return Camera(
+        385,
+        385,
+        323,
+        236,
+        480,
+        640,
+        0.1,
+        T_bc,
+        distortion=[-0.28, 0.07, 2e-4, -1e-4, 0.01],
+    )
+
+
+def test_distorted_project_jacobian():
+    camera = _distorted_camera()
+    r_pc_c = np.array([0.5, -0.4, 2.0])
+    jac = camera.project_jacobian(r_pc_c)
+    jac_fd = np.zeros((2, 3))
+    for i in range(3):
+        dr = np.zeros(3)
+        dr[i] = 1e-6
+        jac_fd[:, i] = (camera.project(r_pc_c + dr) - camera.project(r_pc_c)) / 1e-6
+    assert np.allclose(jac, jac_fd, atol=1e-3)
+
+    # Distortion only affects points away from the optical axis
+    assert np.allclose(camera.project(np.array([0, 0, 1.0])), [323, 236])
+    assert not np.allclose(
+        camera.project(r_pc_c),
+        Camera(385, 385, 323, 236, 480, 640, 0.1).project(r_pc_c),
+    )
+
+
+@pytest.mark.parametrize("direction", ["right", "left"])
+@pytest.mark.parametrize(
+    "x",
+    [
+        SE3State(SE3.Exp([0.1, -0.2, 0.1, 0.3, 0.1, -0.5])),
+        SE23State(SE23.Exp([0.1, -0.2, 0.1, 1, 2, 3, 0.3, 0.1, -0.5])),
+        IMUState(
+            SE23.Exp([0.1, -0.2, 0.1, 1, 2, 3, 0.3, 0.1, -0.5]),
+            [0.1, 0.2, 0.3],
+            [0.4, 0.5, 0.6],
+        ),
+    ],
+)
+def test_camera_landmark_jacobian(x, direction):
+    x = x.copy()
+    x.direction = direction
+    if isinstance(x, IMUState):
+        x.value[0].direction = direction
+    camera = _distorted_camera()
+    model = CameraLandmark(camera, [5.0, 0.5, -0.3])
+    jac = model.jacobian(x)
+    assert jac.shape == (2, x.dof)
+    assert np.allclose(jac, model.jacobian_fd(x), atol=1e-3)
+
+    landmarks = np.array([[5.0, 0.5, -0.3], [4.0, -0.5, 0.3], [6.0, 1, 1]])
+    model_multi = CameraLandmarks(camera, landmarks)
+    jac_multi = model_multi.jacobian(x)
+    assert jac_multi.shape == (6, x.dof)
+    assert np.allclose(jac_multi[0:2], jac)
+    assert np.allclose(jac_multi, model_multi.jacobian_fd(x), atol=1e-3)
+    assert np.allclose(model_multi.evaluate(x)[0:2], model.evaluate(x))
+    assert model_multi.covariance(x).shape == (6, 6)
+
+
 if __name__ == "__main__":
     test_camera_intrinsics()
@@ -1,15 +1,25 @@
 from pynav.lib.states import SE2State, CompositeState, VectorState
-from pynav.types import StampedValue
+from pynav.types import (
+    StampedValue,
+    Measurement,
+    StateWithCovariance,
+    BlockDiagonalMatrix,
+)
 from pynav.lib.models import (
     BodyFrameVelocity,
     CompositeProcessModel,
+    CompositeMeasurementModel,
+    RangePointToAnchor,
     RangeRelativePose,
     CompositeInput,
+    SingleIntegrator,
 )
+from pynav.filters import ExtendedKalmanFilter
 from pylie import SE2
 import numpy as np
 import pickle
 import os
+import pytest
 
 
 def test_composite_process_model():
@@ -111,5 +121,260 @@ def test_matrix_blocks_composite():
     assert np.allclose(cov_block_3, cov[3:6, 3:6])
 
 
+def test_composite_slice_cache():
+    state_list = [
+        SE2State(SE2.Exp([0.1, 0.2, 0.3]), stamp=0.0, state_id="p0"),
+        VectorState(np.array([0.1, 0.2, 0.3]), stamp=0.0, state_id="l1"),
+    ]
+    state = CompositeState(state_list, stamp=0.0)
+    assert state.dof == 6
+    assert state.get_slice_by_id("l1") == slice(3, 6)
+
+    state.add_state(VectorState(np.array([1, 2]), stamp=0.0, state_id="l2"))
+    assert state.dof == 8
+    assert state.get_slice_by_id("l2") == slice(6, 8)
+
+    state.remove_state_by_id("l1")
+    assert state.dof == 5
+    assert state.get_index_by_id("l2") == 1
+    assert state.get_slice_by_id("l2") == slice(3, 5)
+    assert state.get_slices() == [slice(0, 3), slice(3, 5)]
+
+    try:
+        state.get_index_by_id("l1")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_composite_contiguous_vectors():
+    state_list = [
+        VectorState(np.array([0.1, 0.2]), stamp=0.0, state_id="l1"),
+        SE2State(SE2.Exp([0.1, 0.2, 0.3]), stamp=0.0, state_id="p0"),
+        VectorState(np.array([0.3, 0.4, 0.5]), stamp=0.0, state_id="l2"),
+    ]
+    x = CompositeState([s.copy() for s in state_list], contiguous_vectors=True)
+    x_ref = CompositeState(state_list)
+    assert np.allclose(x.vector_buffer, [0.1, 0.2, 0.3, 0.4, 0.5])
+
+    dx = np.arange(x.dof) * 0.1
+    y = x.plus(dx)
+    y_ref = x_ref.plus(dx)
+    assert y.contiguous_vectors
+    for s, s_ref in zip(y.value, y_ref.value):
+        assert np.allclose(s.value, s_ref.value)
+    assert np.allclose(y.minus(x), y_ref.minus(x_ref))
+    assert np.allclose(y.minus(x).ravel(), dx)
+
+    # The original is unchanged, and in-place setting reaches the buffer.
+    assert np.allclose(x.get_value_by_id("l1"), [0.1, 0.2])
+    x.set_value_by_id(np.array([1.0, 2.0]), "l1")
+    assert np.allclose(x.vector_buffer[:2], [1.0, 2.0])
+
+    x.remove_state_by_id("l1")
+    assert np.allclose(x.vector_buffer, [0.3, 0.4, 0.5])
+    assert np.allclose(x.plus(np.ones(6)).get_value_by_id("l2"), [1.3, 1.4, 1.5])
+
+    y = pickle.loads(pickle.dumps(x))
+    assert y.contiguous_vectors
+    assert np.allclose(y.vector_buffer, x.vector_buffer)
+
+
+class _AngleState(VectorState):
+    """Scalar angle whose plus and minus wrap to [-pi, pi)."""
+
+    def plus(self, dx):
+        new = self.copy()
+        new.value = (self.value + np.ravel(dx) + np.pi) % (2 * np.pi) - np.pi
+        return new
+
+    def minus(self, x):
+        return (self.value - x.value + np.pi) % (2 * np.pi) - np.pi
+
+    def copy(self):
+        return _AngleState(self.value.copy(), self.stamp, self.state_id)
+
+
+def test_composite_contiguous_vectors_shape_and_subclass():
+    def make_states():
+        column = VectorState(np.array([0.1, 0.2]), stamp=0.0, state_id="l1")
+        column.value = column.value.reshape((-1, 1))
+        return [
+            column,
+            _AngleState(np.array([3.0]), stamp=0.0, state_id="theta"),
+            VectorState(np.array([0.3, 0.4]), stamp=0.0, state_id="l2"),
+        ]
+
+    x = CompositeState(make_states(), contiguous_vectors=True)
+    x_ref = CompositeState(make_states())
+
+    # Only the plain vector states are packed, keeping their shape.
+    assert np.allclose(x.vector_buffer, [0.1, 0.2, 0.3, 0.4])
+    assert x.get_value_by_id("l1").shape == (2, 1)
+    x.set_value_by_id(np.array([0.5, 0.6]), "l1")
+    assert x.get_value_by_id("l1").shape == (2, 1)
+    assert np.allclose(x.vector_buffer[:2], [0.5, 0.6])
+    x_ref.set_value_by_id(np.array([[0.5], [0.6]]), "l1")
+
+    dx = np.array([0.1, 0.2, 0.5, 0.3, 0.4])
+    y = x.plus(dx)
+    y_ref = x_ref.plus(dx)
+    assert np.allclose(y.get_value_by_id("theta"), 3.5 - 2 * np.pi)
+    for s, s_ref in zip(y.value, y_ref.value):
+        assert s.value.shape == s_ref.value.shape
+        assert np.allclose(s.value, s_ref.value)
+    assert np.allclose(y.minus(x), y_ref.minus(x_ref))
+    assert np.allclose(y.minus(x).ravel(), dx)
+
+
+def test_composite_sparse_jacobian():
+    state_list = [
+        VectorState(np.array([1.0, 2.0]), state_id="a"),
+        VectorState(np.array([3.0, 4.0, 5.0]), state_id="b"),
+        VectorState(np.array([-1.0, 2.0]), state_id="c"),
+    ]
+    x = CompositeState(state_list)
+    jac = x.jacobian_from_blocks(
+        {"c": np.array([[1.0, 2.0]]), "a": np.array([[3.0, 4.0]])},
+        sparse=True,
+    )
+    jac_dense = x.jacobian_from_blocks(
+        {"c": np.array([[1.0, 2.0]]), "a": np.array([[3.0, 4.0]])}
+    )
+    assert np.allclose(jac.toarray(), jac_dense)
+
+    P = np.random.rand(7, 7)
+    assert np.allclose(jac @ P, jac_dense @ P)
+    assert np.allclose(jac.rmatmul_transpose(P), P @ jac_dense.T)
+
+
+def test_ekf_correct_sparse_jacobian():
+    state_list = [
+        VectorState(np.random.normal(size=2), state_id=i) for i in range(10)
+    ]
+    x = StateWithCovariance(CompositeState(state_list), np.identity(20))
+    A = np.random.normal(size=(20, 20))
+    x.covariance = A @ A.T + np.identity(20)
+
+    model = CompositeMeasurementModel(RangePointToAnchor([1, 2], 0.1), 4)
+    y = Measurement(np.array(1.3), model=model)
+
+    class DenseModel(CompositeMeasurementModel):
+        def jacobian_sparse(self, x):
+            return super().jacobian_sparse(x).toarray()
+
+    y_dense = Measurement(np.array(1.3), model=DenseModel(model.model, 4))
+
+    kf = ExtendedKalmanFilter(None)
+    x_sparse = kf.correct(x, y, None)
+    x_dense = kf.correct(x, y_dense, None)
+    assert np.allclose(x_sparse.state.minus(x_dense.state), 0)
+    assert np.allclose(x_sparse.covariance, x_dense.covariance)
+
+    # Reference Kalman update
+    G = model.jacobian(x.state)
+    P = x.covariance
+    K = P @ G.T @ np.linalg.inv(G @ P @ G.T + 0.1)
+    assert np.allclose(x_sparse.covariance, (np.identity(20) - K @ G) @ P)
+
+
+def test_block_diagonal_matrix():
+    blocks = [np.random.rand(2, 2), np.random.rand(3, 3), np.random.rand(1, 1)]
+    A = BlockDiagonalMatrix(blocks)
+    A_dense = A.toarray()
+    assert A.shape == (6, 6)
+    assert np.allclose(A_dense[2:5, 2:5], blocks[1])
+    assert np.allclose(A_dense[0:2, 2:], 0)
+
+    P = np.random.rand(6, 6)
+    assert np.allclose(A @ P, A_dense @ P)
+    assert np.allclose(A.congruence(P), A_dense @ P @ A_dense.T)
+    assert np.allclose(A.add_to(P.copy()), P + A_dense)
+
+
+def test_ekf_predict_block_diagonal():
+    Q = np.diag([0.1**2, 0.1**2, 0.001**2])
+    n = 5
+    x = CompositeState(
+        [
+            SE2State(SE2.Exp(np.random.normal(size=3)), stamp=0.0, state_id=i)
+            for i in range(n)
+        ]
+    )
+    A = np.random.normal(size=(3 * n, 3 * n))
+    x = StateWithCovariance(x, A @ A.T)
+    process_model = CompositeProcessModel([BodyFrameVelocity(Q)] * n)
+    u = CompositeInput(
+        [StampedValue(np.random.normal(size=3), 0.1) for _ in range(n)]
+    )
+
+    x_new, A, Q = process_model.evaluate_with_jacobians(x.state, u, 0.1)
+    assert isinstance(A, BlockDiagonalMatrix)
+    assert np.allclose(A.toarray(), process_model.jacobian(x.state, u, 0.1))
+
+    kf = ExtendedKalmanFilter(process_model)
+    x_pred = kf.predict(x, u, 0.1)
+    x_ref = kf.predict(x, u, 0.1, x_jac=x.state.copy())
+    assert np.allclose(x_pred.state.minus(x_ref.state), 0)
+    assert np.allclose(x_pred.covariance, x_ref.covariance)
+
+    _, details = kf.predict(x, u, 0.1, output_details=True)
+    assert isinstance(details["A"], np.ndarray)
+    assert isinstance(details["Q"], np.ndarray)
+    assert np.allclose(details["A"], A.toarray())
+    assert np.allclose(details["Q"], Q.toarray())
+
+
+def test_ekf_predict_single_substate_input():
+    Q = np.diag([0.1**2, 0.1**2, 0.001**2])
+    n = 5
+    x = CompositeState(
+        [
+            SE2State(SE2.Exp(np.random.normal(size=3)), stamp=0.0, state_id=i)
+            for i in range(n)
+        ]
+    )
+    A = np.random.normal(size=(3 * n, 3 * n))
+    x = StateWithCovariance(x, A @ A.T)
+    process_model = CompositeProcessModel([BodyFrameVelocity(Q)] * n)
+    u = StampedValue(np.random.normal(size=3), 0.1, state_id=2)
+
+    # Dense equivalent: identity Jacobian and zero noise on other substates.
+    A_dense = np.identity(3 * n)
+    Q_dense = np.zeros((3 * n, 3 * n))
+    A_dense[6:9, 6:9] = BodyFrameVelocity(Q).jacobian(x.state.value[2], u, 0.1)
+    Q_dense[6:9, 6:9] = BodyFrameVelocity(Q).covariance(x.state.value[2], u, 0.1)
+    assert np.allclose(process_model.jacobian(x.state, u, 0.1), A_dense)
+    assert np.allclose(process_model.covariance(x.state, u, 0.1), Q_dense)
+    P_ref = A_dense @ x.covariance @ A_dense.T + Q_dense
+
+    kf = ExtendedKalmanFilter(process_model)
+    x_pred = kf.predict(x, u, 0.1)
+    assert np.allclose(x_pred.covariance, P_ref)
+    for i in range(n):
+        if i != 2:
+            assert np.allclose(x_pred.state.value[i].value, x.state.value[i].value)
+
+    x_ref = kf.predict(x, u, 0.1, x_jac=x.state.copy())
+    assert np.allclose(x_pred.state.minus(x_ref.state), 0)
+    assert np.allclose(x_ref.covariance, P_ref)
+
+    P_old = x.covariance
+    x_inplace = kf.predict(x, u, 0.1, inplace=True)
+    assert x_inplace is x
+    assert x.covariance is P_old
+    assert np.allclose(x.covariance, P_ref)
+    assert np.allclose(x.state.minus(x_pred.state), 0)
+
+
+def test_composite_process_model_invalid_input():
+    x = CompositeState(
+        [VectorState([1.0, 2.0], stamp=0.0, state_id="p")], stamp=0.0
+    )
+    model = CompositeProcessModel([SingleIntegrator(np.identity(2))])
+    with pytest.raises(ValueError):
+        model.evaluate(x, np.array([1.0, 2.0]), 0.1)
+
+
 if __name__ == "__main__":
     test_composite_minus_jacobian()
@@ -0,0 +1,117 @@
+from pynav.datagen import DataGenerator
+from pynav.lib.states import SE2State, VectorState
+from pynav.lib.models import (
+    BodyFrameVelocity,
+    RangePoseToAnchor,
+    RangePointToAnchor,
+)
+from pynav.types import ProcessModel
+from pylie import SE2
+import numpy as np
+import pytest
+
+np.random.seed(0)
+
+Q = np.diag([0.1**2, 0.1**2, 0.01**2])
+range_models = [
+    RangePoseToAnchor([1, 0], [0.17, 0.17], 0.1**2),
+    RangePoseToAnchor([3, 2], [0.17, 0.17], 0.1**2),
+]
+
+
+def input_profile(t, x):
+    return np.array([np.sin(t), 1, 0])
+
+
+def vectorized_input_profile(t, x):
+    return np.column_stack([np.sin(t), np.ones_like(t), np.zeros_like(t)])
+
+
+def _make_generator(vectorized_input=False):
+    return DataGenerator(
+        BodyFrameVelocity(Q),
+        vectorized_input_profile if vectorized_input else input_profile,
+        Q,
+        100,
+        range_models,
+        [7, 10],
+        vectorized_input=vectorized_input,
+    )
+
+
+@pytest.mark.parametrize("vectorized_input", [False, True])
+def test_fast_matches_slow_noiseless(vectorized_input):
+    x0 = SE2State(SE2.Exp([0.1, 1, 2]), stamp=0.0)
+    states, inputs, meas = _make_generator().generate(x0, 0, 3)
+    states_f, inputs_f, meas_f = _make_generator(vectorized_input).generate(
+        x0, 0, 3, fast=True
+    )
+
+    assert len(states_f) == len(states)
+    assert len(inputs_f) == len(inputs)
+    assert len(meas_f) == len(meas)
+    for x, x_f in zip(states, states_f):
+        assert x_f.stamp == x.stamp
+        assert np.allclose(x_f.value, x.value)
+    for u, u_f in zip(inputs, inputs_f):
+        assert u_f.stamp == u.stamp
+        assert np.allclose(u_f.value, u.value)
+    for y, y_f in zip(meas, meas_f):
+        assert y_f.stamp == y.stamp
+        assert y_f.model is y.model
+        assert np.allclose(y_f.value, y.value)
+
+
+def test_fast_noise_statistics():
+    x0 = SE2State(SE2.Exp([0.1, 1, 2]), stamp=0.0)
+    dg = _make_generator(vectorized_input=True)
+    _, inputs, meas = dg.generate(x0, 0, 100, noise=True, fast=True)
+    _, _, meas_true = dg.generate(x0, 0, 100, noise=False, fast=True)
+
+    W = np.array([u.value.ravel() - input_profile(u.stamp, None) for u in inputs])
+    W = np.linalg.solve(np.linalg.cholesky(Q), W.T)
+    assert np.allclose(np.cov(W), np.identity(3), atol=0.05)
+
+    V = np.array([y.value - y_true.value for y, y_true in zip(meas, meas_true)])
+    assert np.isclose(np.var(V), 0.1**2, rtol=0.1)
+
+
+
+class _EulerModel(ProcessModel):
+    """Euler step of x_dot = sin(x) + u, which is not composable in dt."""
+
+    def evaluate(self, x, u, dt):
+        x = x.copy()
+        x.value = x.value + dt * (np.sin(x.value) + u.value)
+        return x
+
+    def jacobian(self, x, u, dt):
+        return np.atleast_2d(1 + dt * np.cos(x.value))
+
+    def covariance(self, x, u, dt):
+        return dt**2 * np.identity(1)
+
+
+def test_fast_matches_slow_noiseless_split_steps():
+    # The truth only matches if the input steps are split at the measurement
+    # stamps in both modes.
+    model = RangePointToAnchor([3.0], 0.1**2)
+    dg = DataGenerator(
+        _EulerModel(),
+        lambda t, x: np.array([np.cos(t)]),
+        np.identity(1),
+        20,
+        [model, model],
+        [7, 3],
+    )
+    x0 = VectorState([0.5], stamp=0.0)
+    states, _, meas = dg.generate(x0, 0, 3)
+    states_f, _, meas_f = dg.generate(x0, 0, 3, fast=True)
+
+    assert len(states_f) == len(states)
+    assert len(meas_f) == len(meas)
+    for x, x_f in zip(states, states_f):
+        assert np.allclose(x_f.value, x.value)
+    for y, y_f in zip(meas, meas_f):
+        assert y_f.stamp == y.stamp
+        assert np.allclose(y_f.value, y.value)
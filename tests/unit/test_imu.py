@@ -4,6 +4,8 @@ from pynav.lib.imu import (
     IMU,
     IMUKinematics,
     N_matrix,
+    M_matrix,
+    L_matrix,
     U_matrix,
     U_matrix_inv,
     adjoint_IE3,
@@ -32,6 +34,72 @@ def test_N_matrix():
     assert np.allclose(N, N_test)
 
 
+@pytest.mark.parametrize("scale", [0.0, 1e-9, 1e-4, 1e-2, 0.5, 2.0])
+def test_N_matrix_small_angle(scale):
+    phi = scale * np.array([1, -2, 0.5])
+    N_test = np.sum(
+        [
+            (2 / factorial(n + 2)) * np.linalg.matrix_power(SO3.wedge(phi), n)
+            for n in range(30)
+        ],
+        axis=0,
+    )
+    assert np.allclose(N_matrix(phi), N_test, atol=1e-14)
+    assert np.allclose(M_matrix(phi), N_test, atol=1e-14)
+
+
+def _L_matrix_reference(om, a, dt):
+    # Direct evaluation of Barfoot 2nd edition, equation 9.247
+    omdt = om * dt
+    J_att_inv_times_N = SO3.left_jacobian_inv(omdt) @ N_matrix(omdt)
+    xi = np.zeros((9,))
+    xi[:3] = dt * om
+    xi[3:6] = dt * a
+    xi[6:9] = (dt**2 / 2) * J_att_inv_times_N @ a
+    J = SE23.left_jacobian(-xi)
+    Om = SO3.wedge(omdt)
+    OmOm = Om @ Om
+    A = SO3.wedge(a)
+    Up = dt * np.eye(9, 6)
+    Up[6:9, 0:3] = (
+        -0.5
+        * (dt**2 / 2)
+        * (
+            (1 / 360)
+            * (dt**3)
+            * (OmOm @ A + Om @ (SO3.wedge(Om @ a)) + SO3.wedge(OmOm @ a))
+            - (1 / 6) * dt * A
+        )
+    )
+    Up[6:9, 3:6] = (dt**2 / 2) * J_att_inv_times_N
+    return J @ Up
+
+
+def test_L_matrix():
+    om = np.array([1, 2, 3])
+    a = np.array([4, -5, 6])
+    L = L_matrix(om, a, 0.1)
+    assert L.shape == (9, 6)
+    assert np.allclose(L, _L_matrix_reference(om, a, 0.1))
+
+
+def test_L_N_matrix_batch():
+    om = np.random.normal(size=(10, 3))
+    a = np.random.normal(size=(10, 3))
+    dt = np.random.uniform(0.001, 0.1, size=10)
+    L = L_matrix(om, a, dt)
+    N = N_matrix(om * dt[:, None])
+    assert L.shape == (10, 9, 6)
+    assert N.shape == (10, 3, 3)
+    for i in range(10):
+        assert np.allclose(L[i], L_matrix(om[i], a[i], dt[i]))
+        assert np.allclose(N[i], N_matrix(om[i] * dt[i]))
+
+    # Scalar dt
+    L = L_matrix(om, a, 0.01)
+    assert np.allclose(L[3], L_matrix(om[3], a[3], 0.01))
+
+
 def test_U_matrix_inverse_se23():
     dt = 0.1
     u = IMU([1, 2, 3], [4, 5, 6], 0)
@@ -144,6 +212,32 @@ def test_imu_group_jacobian(direction):
     jac_fd = x.plus_jacobian_fd(dx)
     assert np.allclose(jac, jac_fd, atol=1e-6)
 
+@pytest.mark.parametrize("direction", ["right", "left"])
+def test_imu_kinematics_evaluate_with_jacobians(direction):
+    model = IMUKinematics(np.identity(12))
+    dt = 0.1
+    u = IMU([1, 2, 3], [2, 3, 1], 0, [0.1, 0.2, 0.3], [0.3, 0.2, 0.1])
+    x = IMUState(
+        SE23.Exp([1, 2, 3, 4, 5, 6, 7, 8, 9]),
+        [0.1, 0.2, 0.3],
+        [4, 5, 6],
+        0,
+        direction=direction,
+    )
+    x_new, A, Q = model.evaluate_with_jacobians(x, u, dt)
+    assert np.allclose(x_new.value[0].value, model.evaluate(x, u, dt).value[0].value)
+    assert np.allclose(x_new.bias, model.evaluate(x, u, dt).bias)
+    assert np.allclose(A, model.jacobian(x, u, dt))
+    assert np.allclose(Q, model.covariance(x, u, dt))
+
+    x = SE23State(SE23.Exp([1, 2, 3, 4, 5, 6, 7, 8, 9]), direction=direction)
+    model = IMUKinematics(np.identity(6))
+    x_new, A, Q = model.evaluate_with_jacobians(x, u, dt)
+    assert np.allclose(x_new.value, model.evaluate(x, u, dt).value)
+    assert np.allclose(A, model.jacobian(x, u, dt))
+    assert Q.shape == (9, 9)
+
+
 if __name__ == "__main__":
     test_imu_kinematics_jacobian_imu("left")
     print("All tests passed!")
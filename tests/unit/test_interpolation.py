@@ -1,5 +1,6 @@
-from pynav.utils import state_interp
-from pynav.lib.states import SE3State, SE3, SO3
+from pynav.utils import state_interp, TrajectoryInterpolator
+from pynav.lib.states import SE3State, SE3, SO3, SE2State, VectorState
+from pylie import SE2
 import numpy as np 
 import pytest 
 
@@ -44,5 +45,71 @@ def test_state_interp_multiple():
         assert np.allclose(x_interp[i].stamp, x_query[i].stamp)
         assert np.allclose(x_interp[i].value, x_query[i].value)
 
+
+def test_state_interp_unsorted():
+    x_data = [SE3State(SE3.random(), i) for i in range(10)]
+    shuffled = [x_data[i] for i in np.random.permutation(10)]
+    x = state_interp([2.0, 6.5], shuffled)
+    assert np.allclose(x[0].value, x_data[2].value)
+    x_ref = state_interp(6.5, x_data[6:8])
+    assert np.allclose(x[1].value, x_ref.value)
+
+
+@pytest.mark.parametrize("direction", ["left", "right"])
+@pytest.mark.parametrize(
+    "make_state",
+    [
+        lambda k, d: VectorState(np.random.normal(size=3), k),
+        lambda k, d: SE2State(SE2.random(), k, direction=d),
+        lambda k, d: SE3State(SE3.random(), k, direction=d),
+    ],
+)
+def test_trajectory_interpolator(make_state, direction):
+    x_data = [make_state(0.1 * k, direction) for k in range(50)]
+    interp = TrajectoryInterpolator(x_data)
+    stamps = np.random.uniform(-0.5, 5.5, size=30)
+    x = interp(stamps)
+    assert len(x) == 30
+    for i, stamp in enumerate(stamps):
+        k = int(np.clip(np.floor(stamp / 0.1 + 1e-9), 0, 49))
+        if stamp < 0 or k == 49:
+            x_ref = x_data[k]
+        else:
+            alpha = (stamp - x_data[k].stamp) / 0.1
+            x_ref = x_data[k].plus(alpha * x_data[k + 1].minus(x_data[k]))
+        assert np.isclose(x[i].stamp, stamp)
+        assert np.allclose(x[i].value, x_ref.value)
+
+    if not isinstance(x_data[0], SE2State):
+        values = interp.values(stamps)
+        assert np.allclose(values, np.array([xi.value for xi in x]))
+
+
+class _AngleState(VectorState):
+    """Scalar angle whose plus and minus wrap to [-pi, pi)."""
+
+    def plus(self, dx):
+        new = self.copy()
+        new.value = (self.value + np.ravel(dx) + np.pi) % (2 * np.pi) - np.pi
+        return new
+
+    def minus(self, x):
+        return (self.value - x.value + np.pi) % (2 * np.pi) - np.pi
+
+    def copy(self):
+        return _AngleState(self.value.copy(), self.stamp, self.state_id)
+
+
+def test_trajectory_interpolator_vector_subclass():
+    # The batched VectorState arithmetic must not replace the overrides.
+    x_data = [_AngleState([3.0], 0.0), _AngleState([-3.0], 1.0)]
+    interp = TrajectoryInterpolator(x_data)
+    x = interp([0.5])[0]
+    assert isinstance(x, _AngleState)
+    assert np.allclose(np.abs(x.value), np.pi)
+    with pytest.raises(NotImplementedError):
+        interp.values([0.5])
+
+
 if __name__ == "__main__":
     test_state_interp_out_of_bounds()
\ No newline at end of file
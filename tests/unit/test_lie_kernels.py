@@ -0,0 +1,140 @@
+from pynav.lib import lie_kernels as lk
+from pynav.lib.states import SO3State, SE3State, SE23State
+from pylie import SO3, SE3, SE23
+import numpy as np
+import pytest
+
+np.random.seed(0)
+
+
+@pytest.mark.parametrize(
+    "group, exp, log, dof",
+    [
+        (SO3, lk.so3_exp, lk.so3_log, 3),
+        (SE3, lk.se3_exp, lk.se3_log, 6),
+        (SE23, lk.se23_exp, lk.se23_log, 9),
+    ],
+)
+def test_exp_log_against_pylie(group, exp, log, dof):
+    xi = np.random.normal(size=dof)
+    assert np.allclose(exp(xi), group.Exp(xi))
+    assert np.allclose(log(group.Exp(xi)), group.Log(group.Exp(xi)).ravel())
+
+
+@pytest.mark.parametrize(
+    "group, left, left_inv, right, right_inv, dof",
+    [
+        (
+            SO3,
+            lk.so3_left_jacobian,
+            lk.so3_left_jacobian_inv,
+            lk.so3_right_jacobian,
+            lk.so3_right_jacobian_inv,
+            3,
+        ),
+        (
+            SE3,
+            lk.se3_left_jacobian,
+            lk.se3_left_jacobian_inv,
+            lk.se3_right_jacobian,
+            lk.se3_right_jacobian_inv,
+            6,
+        ),
+        (
+            SE23,
+            lk.se23_left_jacobian,
+            lk.se23_left_jacobian_inv,
+            lk.se23_right_jacobian,
+            lk.se23_right_jacobian_inv,
+            9,
+        ),
+    ],
+)
+def test_jacobians_against_pylie(group, left, left_inv, right, right_inv, dof):
+    xi = np.random.normal(size=dof)
+    assert np.allclose(left(xi), group.left_jacobian(xi))
+    assert np.allclose(left_inv(xi), group.left_jacobian_inv(xi))
+    assert np.allclose(right(xi), group.right_jacobian(xi))
+    assert np.allclose(right_inv(xi), group.right_jacobian_inv(xi))
+
+
+@pytest.mark.parametrize("angle", [0.0, 1e-9, 1e-5, 1e-2, 0.1, np.pi - 1e-6])
+def test_so3_log_small_and_large_angles(angle):
+    axis = np.random.normal(size=3)
+    phi = angle * axis / np.linalg.norm(axis)
+    C = lk.so3_exp(phi)
+    assert np.allclose(lk.so3_exp(lk.so3_log(C)), C, atol=1e-12)
+    assert np.allclose(lk.so3_left_jacobian(phi) @ lk.so3_left_jacobian_inv(phi), np.identity(3))
+
+
+def test_se23_jacobian_small_angle_fd():
+    xi = np.array([1e-3, -2e-3, 5e-4, 1, 2, 3, -1, 0.5, 2])
+    J = lk.se23_left_jacobian(xi)
+    X = lk.se23_exp(xi)
+    step = 1e-6
+    J_fd = np.zeros((9, 9))
+    for i in range(9):
+        dxi = np.zeros(9)
+        dxi[i] = step
+        J_fd[:, i] = lk.se23_log(lk.se23_exp(xi + dxi) @ lk.se23_inverse(X)) / step
+    assert np.allclose(J, J_fd, atol=1e-5)
+
+
+def test_batch_matches_single():
+    xi = 0.5 * np.random.normal(size=(20, 6))
+    T = lk.se3_exp(xi)
+    J = lk.se3_right_jacobian(xi)
+    assert T.shape == (20, 4, 4)
+    assert J.shape == (20, 6, 6)
+    for i in range(20):
+        assert np.allclose(T[i], lk.se3_exp(xi[i]))
+        assert np.allclose(J[i], lk.se3_right_jacobian(xi[i]))
+    assert np.allclose(lk.se3_log(T), xi)
+
+
+@pytest.mark.parametrize("direction", ["left", "right"])
+@pytest.mark.parametrize("state_type", [SO3State, SE3State, SE23State])
+def test_states_with_fast_kernels(state_type, direction):
+    dof = state_type._group.dof
+    x_value = state_type._group.Exp(0.3 * np.random.normal(size=dof))
+    dx = 0.3 * np.random.normal(size=dof)
+    x1_slow = state_type(x_value, direction=direction)
+    with state_type.fast_kernels():
+        x1 = state_type(x_value, direction=direction)
+        assert x1.group is state_type._fast_group
+        x2 = x1.plus(dx)
+        assert np.allclose(x2.value, x1_slow.plus(dx).value)
+        assert np.allclose(x2.minus(x1), dx)
+        assert np.allclose(x1.plus_jacobian(dx), x1_slow.plus_jacobian(dx))
+        assert np.allclose(x2.minus_jacobian(x1), x2.minus_jacobian_fd(x1), atol=1e-5)
+        assert x1.copy().group is state_type._fast_group
+
+    assert state_type(x_value).group is not state_type._fast_group
+
+
+@pytest.mark.parametrize("state_type", [SO3State, SE3State, SE23State])
+def test_fast_kernels_restored(state_type):
+    slow_group = state_type._group
+    with pytest.raises(RuntimeError):
+        with state_type.fast_kernels():
+            assert state_type._group is state_type._fast_group
+            raise RuntimeError()
+    assert state_type._group is slow_group
+
+    # The global switch is restored to its previous setting, whatever it was.
+    state_type.use_fast_kernels()
+    try:
+        with state_type.fast_kernels(False):
+            assert state_type._group is slow_group
+        assert state_type._group is state_type._fast_group
+    finally:
+        state_type.use_fast_kernels(False)
+    assert state_type._group is slow_group
+
+    # Other state types are not affected.
+    with SO3State.fast_kernels():
+        assert SE3State._group is not SE3State._fast_group
+
+
+if __name__ == "__main__":
+    test_batch_matches_single()
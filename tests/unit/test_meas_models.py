@@ -5,6 +5,7 @@ from pynav.lib.states import (
     SE3State,
     SE23State,
     CompositeState,
+    VectorState,
 )
 from pynav.lib.models import (
     Altitude,
@@ -13,6 +14,7 @@ from pynav.lib.models import (
     Magnetometer,
     PointRelativePosition,
     RangePoseToAnchor,
+    RangePointToAnchor,
     RangePoseToPose,
     Gravitometer,
 )
@@ -285,5 +287,62 @@ def test_landmark_relative_position_se23(direction):
     _jacobian_test(x, model)
 
 
+def test_range_pose_to_pose_sparse():
+    x = CompositeState(
+        [
+            SE3State(SE3.Exp([0, 0, 0, 0, 0, 0]), stamp=0.0, state_id=1),
+            SE3State(SE3.Exp([0, 1, 0, 1, 1, 1]), stamp=0.0, state_id=2),
+            SE3State(SE3.Exp([1, 0, 0, 2, 1, 1]), stamp=0.0, state_id=3),
+        ]
+    )
+    model = RangePoseToPose([0.17, 0.17, 0], [-0.17, 0.17, 0], 3, 1, 1)
+    jac = model.jacobian_sparse(x)
+    assert jac.shape == (1, 18)
+    assert [slc for slc, _ in jac.blocks] == [slice(12, 18), slice(0, 6)]
+    assert np.allclose(jac.toarray(), model.jacobian(x))
+    assert np.allclose(jac.toarray(), model.jacobian_fd(x), atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "model, make_state",
+    [
+        (
+            RangePointToAnchor([1, 2, 0], 1),
+            lambda: VectorState(np.random.normal(size=6)),
+        ),
+        (
+            RangePoseToAnchor([1, 2], [0.3, 0.1], 1),
+            lambda: SE2State(SE2.random()),
+        ),
+        (
+            RangePoseToAnchor([1, 2, 0], [0.3, 0.1, 0], 1),
+            lambda: SE3State(SE3.random()),
+        ),
+        (
+            RangePoseToAnchor([1, 2, 0], [0.3, 0.1, 0], 1),
+            lambda: SE23State(SE23.random()),
+        ),
+        (
+            PointRelativePosition([1, 2, 3], np.identity(3)),
+            lambda: SE3State(SE3.random()),
+        ),
+        (
+            PointRelativePosition([1, 2, 3], np.identity(3)),
+            lambda: SE23State(SE23.random()),
+        ),
+        (GlobalPosition(np.identity(3)), lambda: SE3State(SE3.random())),
+    ],
+)
+def test_evaluate_batch(model: MeasurementModel, make_state):
+    states = [make_state() for _ in range(5)]
+    y_list = model.evaluate_batch(states)
+    assert len(y_list) == len(states)
+    for x, y in zip(states, y_list):
+        y_ref = model.evaluate(x)
+        assert np.shape(y) == np.shape(y_ref)
+        assert np.allclose(y, y_ref)
+    assert model.evaluate_batch([]) == []
+
+
 if __name__ == "__main__":
     test_range_pose_to_pose_se3()
@@ -6,6 +6,8 @@ from pynav.lib.preintegration import (
     PreintegratedIMUKinematics,
     LinearIncrement,
     PreintegratedLinearModel,
+    IncrementPool,
+    preintegrate_between_stamps,
 )
 from pynav.lib.models import BodyFrameVelocity, DoubleIntegrator, DoubleIntegratorWithBias
 from pynav.filters import ExtendedKalmanFilter
@@ -333,5 +335,249 @@ def test_double_integrator_bias_equivalence():
     assert np.allclose(rmi1.covariance, rmi2.covariance)
 
 
+@pytest.mark.parametrize("tree", [False, True])
+def test_imu_preintegrate_matches_increment(tree):
+    Q = np.identity(12)
+    gyro_bias = [0.1, 0.2, 0.3]
+    accel_bias = [1, 2, 3]
+    N = 37
+    gyro = np.random.normal(size=(N, 3))
+    accel = np.random.normal(size=(N, 3))
+    dt = np.random.uniform(0.005, 0.015, size=N)
+
+    rmi1 = IMUIncrement(Q, gyro_bias, accel_bias)
+    rmi2 = IMUIncrement(Q, gyro_bias, accel_bias)
+    t = 0.0
+    for k in range(N):
+        rmi1.increment(IMU(gyro[k], accel[k], t), dt[k])
+        t += dt[k]
+    rmi2.preintegrate(gyro, accel, dt, stamp=0.0, tree=tree)
+
+    assert np.allclose(rmi1.stamps, rmi2.stamps)
+    assert np.allclose(rmi1.original_value, rmi2.original_value)
+    assert np.allclose(rmi1.bias_jacobian, rmi2.bias_jacobian)
+    assert np.allclose(rmi1.covariance, rmi2.covariance)
+
+
+def test_imu_increment_without_bias():
+    Q = np.identity(12)
+    Q[6:, 6:] = 0.0
+    rmi_full = IMUIncrement(Q, [0.1, 0.2, 0.3], [1, 2, 3])
+    rmi = IMUIncrement(Q[:6, :6], [0.1, 0.2, 0.3], [1, 2, 3])
+    for i in range(50):
+        u = IMU(np.random.normal(size=3), np.random.normal(size=3), i * 0.01)
+        rmi_full.increment(u, 0.01)
+        rmi.increment(u, 0.01)
+
+    assert rmi.covariance.shape == (9, 9)
+    assert np.allclose(rmi.original_value, rmi_full.original_value)
+    assert np.allclose(rmi.bias_jacobian, rmi_full.bias_jacobian)
+    assert np.allclose(rmi.covariance, rmi_full.covariance[:9, :9])
+    assert np.allclose(rmi.copy().covariance, rmi.covariance)
+
+    x = IMUState(SE23.Exp(np.arange(9) / 10), [0.1, 0.2, 0.3], [1, 2, 3], 0)
+    model = PreintegratedIMUKinematics()
+    assert np.allclose(
+        model.covariance(x, rmi), model.covariance(x, rmi_full)
+    )
+
+
+@pytest.mark.parametrize("tree", [False, True])
+def test_imu_preintegrate_without_bias(tree):
+    Q = np.identity(12)
+    Q[6:, 6:] = 0.0
+    N = 20
+    gyro = np.random.normal(size=(N, 3))
+    accel = np.random.normal(size=(N, 3))
+
+    rmi_full = IMUIncrement(Q, [0, 0, 0], [0, 0, 0])
+    rmi = IMUIncrement(Q[:6, :6], [0, 0, 0], [0, 0, 0])
+    rmi_full.preintegrate(gyro, accel, 0.01, stamp=0.0)
+    rmi.preintegrate(gyro[:10], accel[:10], 0.01, stamp=0.0, tree=tree)
+    rmi.preintegrate(gyro[10:], accel[10:], 0.01, tree=tree)
+
+    assert rmi.covariance.shape == (9, 9)
+    assert np.allclose(rmi.stamps, [0.0, 0.2])
+    assert np.allclose(rmi.original_value, rmi_full.original_value)
+    assert np.allclose(rmi.covariance, rmi_full.covariance[:9, :9])
+    assert np.allclose(rmi.bias_jacobian, rmi_full.bias_jacobian)
+
+
+def test_preintegrate_between_stamps_imu():
+    Q = np.identity(12)
+    gyro_bias = [0.1, 0.2, 0.3]
+    accel_bias = [1, 2, 3]
+    x = IMUState(SE23.Exp(np.arange(9) / 10), gyro_bias, accel_bias, 0.0)
+    model = IMUKinematics(Q)
+    input_data = [
+        IMU(np.random.normal(size=3), np.random.normal(size=3), 0.01 * k)
+        for k in range(100)
+    ]
+    stamps = [0.0, 0.234, 0.5, 0.77, 1.1]
+    rmi_list = preintegrate_between_stamps(
+        input_data, stamps, IMUIncrement(Q, gyro_bias, accel_bias)
+    )
+    assert len(rmi_list) == 4
+
+    # Dead reckon to every stamp, holding each input until the next one.
+    events = sorted(
+        [(u.stamp, u) for u in input_data] + [(t, None) for t in stamps],
+        key=lambda e: e[0],
+    )
+    x_dr = {0.0: x.copy()}
+    x_k = x.copy()
+    u_k = input_data[0]
+    t = 0.0
+    for t_next, u in events:
+        x_k = model.evaluate(x_k, u_k, t_next - t)
+        t = t_next
+        if u is None:
+            x_dr[t] = x_k.copy()
+        else:
+            u_k = u
+
+    preint_model = PreintegratedIMUKinematics()
+    for i, rmi in enumerate(rmi_list):
+        assert np.allclose(rmi.stamps, stamps[i : i + 2])
+        x_pre = preint_model.evaluate(x_dr[stamps[i]], rmi)
+        assert np.allclose(x_pre.pose, x_dr[stamps[i + 1]].pose)
+
+
+def test_preintegrate_between_stamps_generic():
+    Q = np.identity(6)
+    input_data = [
+        StampedValue(np.random.normal(size=6), 0.1 * k) for k in range(10)
+    ]
+    stamps = [0.05, 0.55, 1.2]
+    rmi_list = preintegrate_between_stamps(
+        input_data, stamps, BodyVelocityIncrement(SE3, Q, np.zeros(6))
+    )
+    expected = SE3.Exp(input_data[0].value * 0.05)
+    for u in input_data[1:5]:
+        expected = expected @ SE3.Exp(u.value * 0.1)
+    expected = expected @ SE3.Exp(input_data[5].value * 0.05)
+    assert np.allclose(rmi_list[0].stamps, [0.05, 0.55])
+    assert np.allclose(rmi_list[0].value, expected)
+    assert np.allclose(rmi_list[1].stamps, [0.55, 1.2])
+
+
+def test_imu_rmi_value_at_bias_does_not_mutate():
+    Q = np.identity(12)
+    rmi = IMUIncrement(Q, [0.1, 0.2, 0.3], [1, 2, 3])
+    for i in range(10):
+        rmi.increment(IMU([1, 2, 3], [2, 3, 1], i * 0.01), 0.01)
+    new_bias = np.array([0.2, 0.1, 0.3, 1.1, 2.0, 2.9])
+
+    value = rmi.value_at_bias(new_bias)
+    assert np.allclose(rmi.new_bias, rmi.original_bias)
+    rmi_copy = rmi.copy()
+    rmi_copy.update_bias(new_bias)
+    assert np.allclose(value, rmi_copy.value)
+
+    x = IMUState(SE23.Exp(np.arange(9) / 10), new_bias[:3], new_bias[3:], 0)
+    model = PreintegratedIMUKinematics()
+    x_new, A, Q_pre = model.evaluate_with_jacobians(x, rmi)
+    assert np.allclose(x_new.pose, model.evaluate(x, rmi).pose)
+    assert np.allclose(A, model.jacobian(x, rmi))
+    assert np.allclose(Q_pre, model.covariance(x, rmi))
+    assert np.allclose(rmi.new_bias, rmi.original_bias)
+
+
+def test_imu_rmi_reset_and_pool():
+    Q = np.identity(12)
+    pool = IncrementPool(IMUIncrement(Q, [0.1, 0.2, 0.3], [1, 2, 3]), size=1)
+    rmi = pool.acquire()
+    assert len(pool) == 0
+    for i in range(10):
+        rmi.increment(IMU([1, 2, 3], [2, 3, 1], i * 0.01), 0.01)
+    pool.release(rmi)
+
+    rmi2 = pool.acquire()
+    assert rmi2 is rmi
+    assert rmi2.stamps == [None, None]
+    assert np.allclose(rmi2.original_value, np.identity(5))
+    assert np.allclose(rmi2.covariance, 0)
+    assert np.allclose(rmi2.bias_jacobian, 0)
+
+    rmi2.reset(new_bias=np.zeros(6))
+    assert np.allclose(rmi2.gyro_bias, 0)
+    assert pool.acquire() is not rmi2
+
+
+def test_linear_rmi_value_is_not_cumulative():
+    model = DoubleIntegrator(np.identity(2))
+    rmi = LinearIncrement(
+        input_covariance=np.identity(4),
+        state_matrix=lambda u, dt: model.jacobian(None, None, dt),
+        input_matrix=lambda u, dt: model.input_jacobian(dt),
+        dof=4,
+        bias=[0, 0],
+    )
+    for i in range(10):
+        rmi.increment(StampedValue([1, 2], i * 0.1), 0.1)
+    rmi.update_bias(np.array([0.1, 0.2]))
+    assert np.allclose(rmi.value[1], rmi.value[1])
+    assert np.allclose(rmi.value[1], rmi.value_at_bias([0.1, 0.2])[1])
+    assert not np.allclose(rmi.value[1], rmi.original_value[1])
+
+
+@pytest.mark.parametrize("bias", [None, [0.1, -0.2]])
+@pytest.mark.parametrize("constant_matrices", [False, True])
+@pytest.mark.parametrize("uniform_dt", [False, True])
+def test_linear_preintegrate_matches_increment(
+    bias, constant_matrices, uniform_dt
+):
+    model = DoubleIntegrator(np.identity(2))
+    Q = np.identity(2) if bias is None else np.identity(4)
+    kwargs = dict(
+        input_covariance=Q,
+        state_matrix=lambda u, dt: model.jacobian(None, None, dt),
+        input_matrix=lambda u, dt: model.input_jacobian(dt),
+        dof=4,
+        bias=bias,
+        constant_matrices=constant_matrices,
+    )
+    rmi1 = LinearIncrement(**kwargs)
+    rmi2 = LinearIncrement(**kwargs)
+    N = 25
+    values = np.random.normal(size=(N, 2))
+    if uniform_dt:
+        dt = np.full(N, 0.01)
+    else:
+        dt = np.random.choice([0.01, 0.02], size=N)
+
+    t = 0.0
+    for k in range(N):
+        rmi1.increment(StampedValue(values[k], t), dt[k])
+        t += dt[k]
+    rmi2.preintegrate(values[:10], dt[:10], stamp=0.0)
+    rmi2.preintegrate(values[10:], dt[10:])
+
+    assert np.allclose(rmi1.stamps, rmi2.stamps)
+    assert np.allclose(rmi1.original_value[0], rmi2.original_value[0])
+    assert np.allclose(rmi1.original_value[1], rmi2.original_value[1])
+    assert np.allclose(rmi1.covariance, rmi2.covariance)
+    assert np.allclose(rmi1.bias_jacobian, rmi2.bias_jacobian)
+
+
+def test_linear_rmi_matrix_cache_bounded():
+    model = DoubleIntegrator(np.identity(2))
+    rmi = LinearIncrement(
+        input_covariance=np.identity(2),
+        state_matrix=lambda u, dt: model.jacobian(None, None, dt),
+        input_matrix=lambda u, dt: model.input_jacobian(dt),
+        dof=4,
+        constant_matrices=True,
+    )
+    # Jittered timesteps, each of which is a new cache entry.
+    t = 0.0
+    for dt in 0.01 + 1e-5 * np.random.uniform(size=200):
+        rmi.increment(StampedValue([1, 2], t), dt)
+        rmi.preintegrate(np.ones((4, 2)), dt)
+        t += 5 * dt
+    assert len(rmi._matrix_cache._entries) <= rmi._matrix_cache.maxsize
+    assert rmi.new()._matrix_cache is rmi._matrix_cache
+
+
 if __name__ == "__main__":
     test_odometry_preintegration_se3_equivalence("left")
@@ -1,7 +1,20 @@
-from pynav.lib.models import SingleIntegrator, DoubleIntegrator, DoubleIntegratorWithBias
+from pynav.lib.models import (
+    SingleIntegrator,
+    DoubleIntegrator,
+    DoubleIntegratorWithBias,
+    MultiAgentDoubleIntegrator,
+)
 from pynav.lib.states import VectorState
-from pynav.types import StampedValue
+from pynav.types import (
+    StampedValue,
+    StateWithCovariance,
+    ProcessModel,
+    BlockDiagonalMatrix,
+)
+from pynav.filters import ExtendedKalmanFilter
 import numpy as np
+from scipy.linalg import block_diag
+import pytest
 
 def test_single_integrator_jacobian():
     u = StampedValue([1, 2, 3], 0)
@@ -55,5 +68,99 @@ def test_double_integrator_with_bias_covariance():
     cov_test = L @ (Q) @ L.T
     assert np.allclose(cov, cov_test)
 
+def test_double_integrator_cached_matrices():
+    model = DoubleIntegratorWithBias(np.identity(6))
+    A1 = model.jacobian(None, None, 0.1)
+    assert np.allclose(model.jacobian(None, None, 0.1), A1)
+    assert not np.allclose(model.jacobian(None, None, 0.2), A1)
+
+    # Returned matrices are copies, which can be modified.
+    A1[0, 0] = 10.0
+    assert model.jacobian(None, None, 0.1)[0, 0] == 1.0
+
+    # Setting Q clears the cached covariance.
+    Q1 = model.covariance(None, None, 0.1)
+    model.Q = 2 * np.identity(6)
+    assert np.allclose(model.covariance(None, None, 0.1), 2 * Q1)
+
+@pytest.mark.parametrize("per_agent_Q", [False, True])
+def test_multi_agent_double_integrator(per_agent_Q):
+    K, d, dt = 4, 3, 0.1
+    if per_agent_Q:
+        Q = np.array([(k + 1) * np.identity(d) for k in range(K)])
+    else:
+        Q = np.identity(d)
+    model = MultiAgentDoubleIntegrator(Q, K)
+    agent_models = [
+        DoubleIntegrator(Q[k] if per_agent_Q else Q) for k in range(K)
+    ]
+    x = VectorState(np.random.normal(size=2 * d * K))
+    u = StampedValue(np.random.normal(size=d * K), 0)
+
+    x_new = model.evaluate(x, u, dt)
+    for k in range(K):
+        x_k = VectorState(x.value[2 * d * k : 2 * d * (k + 1)])
+        u_k = StampedValue(u.value[d * k : d * (k + 1)], 0)
+        x_k_new = agent_models[k].evaluate(x_k, u_k, dt)
+        assert np.allclose(x_new.value[2 * d * k : 2 * d * (k + 1)], x_k_new.value)
+
+    A = model.jacobian(x, u, dt)
+    Q_d = model.covariance(x, u, dt)
+    assert np.allclose(A, model.jacobian_fd(x, u, dt))
+    assert np.allclose(
+        Q_d, block_diag(*[m.covariance(None, None, dt) for m in agent_models])
+    )
+    assert np.allclose(
+        model.input_jacobian(dt),
+        block_diag(*[m.input_jacobian(dt) for m in agent_models]),
+    )
+    A_blocks = model.jacobian_blocks(x, u, dt)
+    Q_blocks = model.covariance_blocks(x, u, dt)
+    assert isinstance(A_blocks, BlockDiagonalMatrix)
+    assert isinstance(Q_blocks, BlockDiagonalMatrix)
+    assert np.allclose(A_blocks.toarray(), A)
+    assert np.allclose(Q_blocks.toarray(), Q_d)
+
+    P = np.random.normal(size=(2 * d * K, 2 * d * K))
+    P = P @ P.T
+    assert np.allclose(model.predict_covariance(P, dt), A @ P @ A.T + Q_d)
+
+    x_pred = ExtendedKalmanFilter(model).predict(
+        StateWithCovariance(x, P), u, dt
+    )
+    assert np.allclose(x_pred.covariance, A @ P @ A.T + Q_d)
+
+    with pytest.raises(ValueError):
+        model.evaluate(x, StampedValue(np.zeros(2 * d * K), 0), dt)
+
+    model.Q = 2 * Q
+    assert np.allclose(model.covariance(x, u, dt), 2 * Q_d)
+
+class _SineModel(ProcessModel):
+    """Scalar model x_k = x_{k-1} + dt sin(x_{k-1}), updating x in place."""
+
+    def evaluate(self, x, u, dt):
+        x.value = x.value + dt * np.sin(x.value)
+        return x
+
+    def jacobian(self, x, u, dt):
+        return np.atleast_2d(1 + dt * np.cos(x.value))
+
+    def covariance(self, x, u, dt):
+        return np.zeros((1, 1))
+
+
+def test_evaluate_with_jacobians_uses_input_state():
+    model = _SineModel()
+    x = StateWithCovariance(VectorState([1.0], stamp=0.0), np.identity(1))
+    u = StampedValue([0.0], 1.0)
+
+    _, A, _ = model.evaluate_with_jacobians(x.state.copy(), u, 1.0)
+    assert np.allclose(A, 1 + np.cos(1.0))
+
+    x_pred = ExtendedKalmanFilter(model).predict(x, u, 1.0)
+    assert np.allclose(x_pred.covariance, (1 + np.cos(1.0)) ** 2)
+
+
 if __name__ == "__main__":
-    test_double_integrator_with_bias_covariance()
\ No newline at end of file
+    test_double_integrator_with_bias_covariance()
@@ -0,0 +1,101 @@
+from pynav.lib.slam import SLAMStateWithCovariance
+from pynav.lib.states import SE3State, VectorState, CompositeState
+from pynav.lib.camera import Camera, PixelLandmark
+from pynav.types import StateWithCovariance, Measurement
+from pynav.filters import ExtendedKalmanFilter
+from pylie import SE3
+import numpy as np
+import pytest
+
+np.random.seed(0)
+
+
+def _random_covariance(n):
+    A = np.random.normal(size=(n, n))
+    return A @ A.T + np.identity(n)
+
+
+def _make_slam_state(num_landmarks=4):
+    pose = SE3State(SE3.Exp([0.1, 0.2, 0.3, 0, 0, 0]), state_id="pose")
+    landmarks = [
+        VectorState(np.random.normal(size=3) + [0, 0, 5], state_id=i)
+        for i in range(num_landmarks)
+    ]
+    x = CompositeState([pose] + landmarks)
+    return SLAMStateWithCovariance(x, _random_covariance(x.dof))
+
+
+def test_add_state():
+    x = _make_slam_state(2)
+    P_ref = x.covariance.copy()
+    for i in range(10):
+        n = x.state.dof
+        P_new = _random_covariance(3)
+        cross = np.random.normal(size=(3, n))
+        x.add_state(VectorState(np.zeros(3), state_id=f"l{i}"), P_new, cross)
+        P_ref = np.block([[P_ref, cross.T], [cross, P_new]])
+
+    assert x.covariance.shape == (42, 42)
+    assert np.allclose(x.covariance, P_ref)
+    assert x.capacity < 2 * 42
+
+
+def test_augment_sparse():
+    x = _make_slam_state(3)
+    H = x.state.jacobian_from_blocks(
+        {"pose": np.random.normal(size=(3, 6))}, sparse=True
+    )
+    R = np.identity(3)
+    P = x.covariance.copy()
+    x.augment(VectorState(np.zeros(3), state_id="new"), H, R)
+
+    H = H.toarray()
+    P_ref = np.block([[P, P @ H.T], [H @ P, H @ P @ H.T + R]])
+    assert np.allclose(x.covariance, P_ref)
+
+
+@pytest.mark.parametrize("preserve_order", [True, False])
+@pytest.mark.parametrize("state_id", [0, 2, 3])
+def test_marginalize_state(state_id, preserve_order):
+    x = _make_slam_state(4)
+    P = x.covariance.copy()
+    x_ref = x.state.copy()
+    x.marginalize_state(state_id, preserve_order)
+
+    assert x.state.dof == x_ref.dof - 3
+    for sub in x.state.value:
+        ref_slc = x_ref.get_slice_by_id(sub.state_id)
+        assert np.allclose(sub.value, x_ref.get_value_by_id(sub.state_id))
+        for sub2 in x.state.value:
+            ref_slc2 = x_ref.get_slice_by_id(sub2.state_id)
+            assert np.allclose(
+                x.state.get_matrix_block_by_ids(
+                    x.covariance, sub.state_id, sub2.state_id
+                ),
+                P[ref_slc, ref_slc2],
+            )
+
+    if preserve_order:
+        ids = [s.state_id for s in x.state.value]
+        assert ids == [s.state_id for s in x_ref.value if s.state_id != state_id]
+
+
+def test_ekf_slam_correction():
+    camera = Camera(385, 385, 323, 236, 640, 480, 0.1)
+    x = _make_slam_state(20)
+    x_dense = StateWithCovariance(x.state.copy(), x.covariance.copy())
+    model = PixelLandmark(camera, "pose", 7)
+    y = Measurement(model.evaluate(x.state) + 1.0, model=model)
+
+    kf = ExtendedKalmanFilter(None)
+    x_new = kf.correct(x, y, None)
+    assert isinstance(x_new, SLAMStateWithCovariance)
+
+    # Reference with a dense jacobian
+    G = model.jacobian(x_dense.state)
+    P = x_dense.covariance
+    S = G @ P @ G.T + model.covariance(x_dense.state)
+    K = P @ G.T @ np.linalg.inv(S)
+    z = (y.value - model.evaluate(x_dense.state)).reshape((-1, 1))
+    assert np.allclose(x_new.state.minus(x_dense.state.plus(K @ z)), 0)
+    assert np.allclose(x_new.covariance, (np.identity(P.shape[0]) - K @ G) @ P)
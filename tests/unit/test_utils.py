@@ -1,8 +1,19 @@
-from pynav.utils import jacobian
+from pynav.utils import (
+    jacobian,
+    randvec,
+    monte_carlo,
+    chi2_quantile,
+    MonteCarloAccumulator,
+    MonteCarloResult,
+    NoiseSource,
+    GaussianResult,
+    GaussianResultList,
+)
 import numpy as np
 import pytest
-from pylie import SO3
-from pynav.lib.states import SO3State
+from pylie import SO3, SE2, SE3, SE23
+from pynav.lib.states import SO3State, SE2State, SE3State, SE23State, VectorState
+from pynav.types import StateWithCovariance
 
 
 
@@ -50,6 +61,153 @@ def test_jacobian_so3():
     J_true = SO3.left_jacobian(x)
     assert np.allclose(J_test, J_true, atol=1e-6)
 
+def test_noise_source_reproducible_and_cached():
+    cov = np.array([[2.0, 0.5], [0.5, 1.0]])
+    a = NoiseSource(seed=3)
+    b = NoiseSource(seed=3)
+    samples_a = np.hstack([a.randvec(cov) for _ in range(5000)])
+    samples_b = np.hstack([randvec(cov, noise_source=b) for _ in range(5000)])
+    assert np.array_equal(samples_a, samples_b)
+    assert np.allclose(np.cov(samples_a), cov, atol=0.1)
+    assert a.cholesky(cov) is a.cholesky(cov.copy())
+
+    # Spawned streams are independent but reproducible.
+    s1, s2 = NoiseSource(seed=3).spawn(2)
+    s1_again = NoiseSource(seed=3).spawn(2)[0]
+    assert np.array_equal(s1.randvec(cov, 10), s1_again.randvec(cov, 10))
+    assert not np.allclose(s1.randvec(cov, 10), s2.randvec(cov, 10))
+
+
+def _random_trial(k, noise):
+    results = []
+    for t in range(5):
+        x_true = VectorState(np.zeros(2), stamp=t)
+        x = VectorState(noise.randvec(np.identity(2)).ravel(), stamp=t)
+        P = (t + 1) * np.identity(2)
+        results.append(GaussianResult(StateWithCovariance(x, P), x_true))
+    return GaussianResultList(results)
+
+
+def test_monte_carlo_seeded_trials():
+    trial = _random_trial
+
+    serial = monte_carlo(trial, 4, n_jobs=1, verbose=0, seed=7)
+    parallel = monte_carlo(trial, 4, n_jobs=2, verbose=0, seed=7)
+    for r1, r2 in zip(serial.trial_results, parallel.trial_results):
+        assert np.array_equal(r1.error, r2.error)
+    assert not np.allclose(
+        serial.trial_results[0].error, serial.trial_results[1].error
+    )
+
+
+def test_monte_carlo_shared_memory():
+    ref = monte_carlo(_random_trial, 6, n_jobs=1, verbose=0, seed=1)
+    res = monte_carlo(
+        _random_trial, 6, n_jobs=2, verbose=0, seed=1, shared_memory=True
+    )
+    assert res.trial_results is None
+    assert res.num_trials == 6
+    assert np.allclose(res.stamp, ref.stamp)
+    assert np.allclose(res.dof, ref.dof)
+    assert np.allclose(res.average_nees, ref.average_nees)
+    assert np.allclose(res.average_ees, ref.average_ees)
+    assert np.allclose(res.rmse, ref.rmse)
+    assert np.allclose(res.nees[3], ref.trial_results[3].nees)
+    assert np.allclose(res.three_sigma[5], ref.trial_results[5].three_sigma)
+    assert np.allclose(res.nees_upper_bound(0.99), ref.nees_upper_bound(0.99))
+
+
+def test_monte_carlo_accumulator():
+    sources = NoiseSource(2).spawn(20)
+    trials = [_random_trial(k, sources[k]) for k in range(20)]
+    ref = MonteCarloResult(trials)
+
+    acc = MonteCarloAccumulator()
+    for t in trials[:12]:
+        acc.add(t)
+    other = MonteCarloAccumulator()
+    for t in trials[12:]:
+        other.add(t)
+    acc.merge(other)
+
+    assert acc.num_trials == 20
+    assert np.allclose(acc.average_nees, ref.average_nees)
+    assert np.allclose(acc.average_ees, ref.average_ees)
+    assert np.allclose(acc.rmse, ref.rmse)
+    nees = np.array([t.nees for t in trials])
+    assert np.allclose(acc.nees_variance, np.var(nees, axis=0, ddof=1))
+
+    res = acc.result()
+    assert np.allclose(res.total_rmse, ref.total_rmse)
+    assert np.allclose(res.nees_lower_bound(0.99), ref.nees_lower_bound(0.99))
+
+    progress = []
+    streamed = monte_carlo(
+        _random_trial,
+        20,
+        n_jobs=1,
+        verbose=0,
+        seed=2,
+        streaming=True,
+        callback=lambda a: progress.append(a.num_trials),
+    )
+    assert progress == list(range(1, 21))
+    assert np.allclose(streamed.average_nees, ref.average_nees)
+
+
+class _AngleState(VectorState):
+    """Scalar angle whose minus wraps to [-pi, pi)."""
+
+    def minus(self, x):
+        return (self.value - x.value + np.pi) % (2 * np.pi) - np.pi
+
+    def copy(self):
+        return _AngleState(self.value.copy(), self.stamp, self.state_id)
+
+
+@pytest.mark.parametrize("direction", ["left", "right"])
+@pytest.mark.parametrize(
+    "make_state",
+    [
+        lambda xi, d: VectorState(xi),
+        lambda xi, d: _AngleState(3 * xi[:1]),
+        lambda xi, d: SO3State(SO3.Exp(xi[:3]), direction=d),
+        lambda xi, d: SE2State(SE2.Exp(xi[:3]), direction=d),
+        lambda xi, d: SE3State(SE3.Exp(xi[:6]), direction=d),
+        lambda xi, d: SE23State(SE23.Exp(xi), direction=d),
+    ],
+)
+def test_gaussian_result_list_from_states(make_state, direction):
+    estimates = []
+    states_true = []
+    for k in range(20):
+        x = make_state(np.random.normal(size=9), direction)
+        x_true = make_state(np.random.normal(size=9), direction)
+        x.stamp = x_true.stamp = 0.1 * k
+        A = np.random.normal(size=(x.dof, x.dof))
+        estimates.append(StateWithCovariance(x, A @ A.T + np.identity(x.dof)))
+        states_true.append(x_true)
+
+    ref = GaussianResultList(
+        [GaussianResult(x, x_true) for x, x_true in zip(estimates, states_true)]
+    )
+    res = GaussianResultList.from_states(estimates, states_true)
+    for name in ["stamp", "error", "ees", "nees", "md", "three_sigma", "dof"]:
+        assert np.allclose(getattr(res, name), getattr(ref, name))
+    assert np.allclose(res.value, ref.value)
+    assert res.state[3] is estimates[3].state
+
+
+def test_chi2_quantile():
+    from scipy.stats.distributions import chi2
+
+    dof = np.array([3, 3, 6, 3, 15, 6])
+    assert np.allclose(chi2_quantile(0.99, dof), chi2.ppf(0.99, df=dof))
+    assert np.allclose(chi2_quantile(0.005, dof), chi2.ppf(0.005, df=dof))
+    assert np.isclose(chi2_quantile(0.5, 4), chi2.ppf(0.5, df=4))
+    assert chi2_quantile(0.5, dof.reshape((2, 3))).shape == (2, 3)
+
+
 if __name__=="__main__":
     # just for debugging purposes
     test_jacobian_so3()
\ No newline at end of file
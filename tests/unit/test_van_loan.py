@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 import pynav.utils as utils
 
 from scipy.linalg import expm
@@ -36,5 +37,48 @@ def test_van_loan_double_integrator():
     assert np.allclose(Q_d, Q_d_test)
 
 
+def test_van_loan_discretizer_cache():
+    N = 3
+    A_c = np.random.rand(N, N)
+    L_c = np.random.rand(N, 2)
+    Q_c = np.identity(2)
+    discretizer = utils.VanLoanDiscretizer(maxsize=2)
+
+    A_d, Q_d = discretizer(A_c, L_c, Q_c, 0.1)
+    A_d_test, Q_d_test = utils.van_loans(A_c, L_c, Q_c, 0.1)
+    assert np.allclose(A_d, A_d_test)
+    assert np.allclose(Q_d, Q_d_test)
+
+    A_d2, _ = discretizer(A_c.copy(), L_c, Q_c, 0.1)
+    assert A_d2 is A_d
+    assert discretizer.hits == 1
+
+    discretizer(A_c, L_c, Q_c, 0.2)
+    discretizer(A_c, L_c, Q_c, 0.3)
+    assert len(discretizer._cache) == 2
+    assert discretizer(A_c, L_c, Q_c, 0.1)[0] is not A_d
+
+
+@pytest.mark.parametrize(
+    "A_c, L_c, Q_c",
+    [
+        (np.array([[0, 1], [0, 0]]), np.array([[0], [1]]), np.array([1])),
+        (np.array([[-1, 1], [0, -2]]), np.array([[0], [1]]), np.array([2])),
+    ],
+)
+def test_van_loan_discretizer_batch(A_c, L_c, Q_c):
+    discretizer = utils.VanLoanDiscretizer()
+    discretizer(A_c, L_c, Q_c, 0.2)
+
+    dt = np.array([0.1, 0.2, 0.1, 0.3])
+    A_d, Q_d = discretizer.batch(A_c, L_c, Q_c, dt)
+    assert A_d.shape == (4, 2, 2)
+    assert discretizer.hits == 1
+    for i in range(dt.size):
+        A_d_test, Q_d_test = utils.van_loans(A_c, L_c, Q_c, dt[i])
+        assert np.allclose(A_d[i], A_d_test)
+        assert np.allclose(Q_d[i], Q_d_test)
+
+
 if __name__ == "__main__":
     test_van_loan_double_integrator()